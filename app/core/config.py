@@ -32,6 +32,11 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "dev-secret-key-change-in-production"  # Change in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30 * 24 * 60  # 30 days
+    AUTH_PRINCIPAL_CACHE_TTL_SECONDS: int = 300  # Also capped by each token's exp
+    AUTH_PRINCIPAL_CACHE_MAX_ENTRIES: int = 50000
+    BCRYPT_ROUNDS: int = 12  # Existing hashes are upgraded to this cost on the next login
+    PASSWORD_HASH_WORKERS: int = 4  # Threads for bcrypt work, off the event loop
+    PASSWORD_HASH_MAX_QUEUE: int = 32  # Waiting jobs beyond this get a 503
     
     # CORS - Can be JSON array string or comma-separated string
     CORS_ORIGINS: Union[str, list[str]] = "http://localhost:5173,http://localhost:3000"
@@ -43,6 +48,16 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "meghan"
     POSTGRES_USER: str = "meghan_user"
     POSTGRES_PASSWORD: str = "meghan_password"
+
+    # Connection pools (sync_engine and async_engine each get their own; ignored for SQLite)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0  # Wait for a free connection before erroring
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this (poolers drop idle ones)
+    DB_POOL_PRE_PING: bool = True  # Validate connections on checkout to avoid stale-connection errors
+    # PgBouncer/Supabase transaction pooler: disable asyncpg prepared statement caches.
+    # None = auto-detect (Supabase pooler host on port 6543)
+    DB_TRANSACTION_POOLER: Optional[bool] = None
     
     # MongoDB (for chat sessions and wellbeing data)
     MONGODB_URL: str = "mongodb://localhost:27017"
@@ -58,7 +73,45 @@ class Settings(BaseSettings):
     GEMINI_TOP_P: float = 0.95
     GEMINI_MAX_OUTPUT_TOKENS: int = 500
     GEMINI_THINKING_BUDGET: int = 200  # Note: May need special handling depending on model support
-    
+    LLM_MAX_CONCURRENT_CALLS: int = 256  # Upper bound on in-flight LLM calls per process
+    LLM_SYNC_EXECUTOR_WORKERS: int = 32  # Threads used for providers that only expose a sync API
+    LLM_CLIENT_POOL_SIZE: int = 8  # Distinct (model, temperature, top_p, max tokens) clients kept alive
+    LLM_HTTP_MAX_CONNECTIONS: int = 100  # Per pooled client
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20  # Per pooled client
+    
+    # Chat context budget (recent turns verbatim + rolling summary of older turns)
+    CHAT_HISTORY_TOKEN_BUDGET: int = 1500  # Estimated tokens of recent turns sent verbatim
+    CHAT_HISTORY_MAX_MESSAGES: int = 60  # Hard cap on unsummarized messages loaded per turn
+    CHAT_SUMMARY_FOLD_MIN_MESSAGES: int = 6  # Batch size before older turns are folded into the summary
+    CHAT_SUMMARY_MAX_TOKENS: int = 300
+    
+    # Safety gate LLM risk assessment (medium-risk keyword matches)
+    SAFETY_LLM_TIMEOUT_SECONDS: float = 3.0  # Verdict falls back to keyword result on timeout
+    SAFETY_LLM_CACHE_TTL_SECONDS: int = 3600  # Verdicts memoized per normalized message text
+    SAFETY_LLM_CACHE_MAX_ENTRIES: int = 10000
+    SAFETY_LLM_CONCURRENT_WITH_CHAT: bool = True  # Start the chat reply while the assessment runs
+    
+    # Hot per-conversation history cache
+    CHAT_HISTORY_CACHE_BACKEND: str = "memory"  # 'memory' (per process) or 'redis' (shared, uses REDIS_URL)
+    CHAT_HISTORY_CACHE_MAX_CONVERSATIONS: int = 5000
+    CHAT_HISTORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CHAT_HISTORY_CACHE_TTL_SECONDS: int = 3600  # Redis backend only
+
+    # Community WebSocket broadcast backplane
+    COMMUNITY_WS_BACKPLANE: str = "memory"  # 'memory' (single worker) or 'redis' (pub/sub across workers, uses REDIS_URL)
+    COMMUNITY_WS_CHANNEL_PREFIX: str = "community:ws"
+    COMMUNITY_WS_SEND_QUEUE_SIZE: int = 64  # Broadcasts buffered per connection before it is dropped as a slow consumer
+    COMMUNITY_WS_SEND_TIMEOUT_SECONDS: float = 10.0  # A single send stalled this long also drops the connection
+
+    # XP awards
+    XP_FLUSH_INTERVAL_SECONDS: float = 0.0  # >0 buffers per-message chat XP and flushes it on this interval
+
+    # Weekly insights batch job
+    WEEKLY_INSIGHTS_CHUNK_SIZE: int = 500  # Users per chunk (one session and one checkpoint per chunk)
+    WEEKLY_INSIGHTS_WORKERS: int = 4  # Chunks processed concurrently
+    WEEKLY_INSIGHTS_TIME_MARGIN_SECONDS: float = 30.0  # Stop starting chunks this close to the Lambda timeout
+    WEEKLY_INSIGHTS_UPSERT_BATCH_SIZE: int = 1000  # Rows per INSERT ... ON CONFLICT statement
+
     # === AWS (only if you use AWS services like S3) ===
     # If you are not using AWS at all, you can ignore these.
     AWS_REGION: str = "us-east-1"
@@ -3,7 +3,14 @@ Database session management for FastAPI.
 Handles SQLAlchemy (PostgreSQL) connections.
 MongoDB and Redis have been removed — app uses Aurora PostgreSQL + S3 + Bedrock.
 """
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+from uuid import uuid4
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
@@ -40,7 +47,9 @@ def _ensure_supabase_sslmode(database_url: str) -> str:
 
 
 def _to_asyncpg_url(database_url: str) -> str:
-    """Convert a Postgres SQLAlchemy URL into an asyncpg URL."""
+    """Convert a Postgres SQLAlchemy URL into an asyncpg URL (SQLite URLs use aiosqlite)."""
+    if database_url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + database_url[len("sqlite://") :]
     if database_url.startswith("postgres://"):
         database_url = "postgresql://" + database_url[len("postgres://") :]
     if database_url.startswith("postgresql+asyncpg://"):
@@ -52,12 +61,115 @@ def _to_asyncpg_url(database_url: str) -> str:
     return database_url
 
 
+def _uses_transaction_pooler(database_url: str) -> bool:
+    """
+    True when connections go through PgBouncer in transaction mode.
+
+    DB_TRANSACTION_POOLER wins when set; otherwise the Supabase transaction
+    pooler (pooler host, port 6543) is detected from the URL.
+    """
+    if settings.DB_TRANSACTION_POOLER is not None:
+        return settings.DB_TRANSACTION_POOLER
+    try:
+        parsed = urlparse(database_url)
+        return (parsed.hostname or "").endswith(".pooler.supabase.com") and parsed.port == 6543
+    except Exception:
+        return False
+
+
+class PoolWaitStats:
+    """Time spent waiting for a connection at checkout, per pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_seconds_total / waits * 1000, 3) if waits else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class _TimedPoolMixin:
+    """Records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_options(database_url: str, poolclass: type) -> dict:
+    """Pool sizing from settings; SQLite keeps SQLAlchemy's default pool."""
+    if database_url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _async_connect_args(database_url: str) -> dict:
+    connect_args: dict = {}
+    if _is_supabase_host(database_url):
+        # asyncpg expects an SSLContext (not "require").
+        connect_args["ssl"] = ssl.create_default_context()
+    if _uses_transaction_pooler(database_url):
+        # PgBouncer may hand each transaction a different server connection, so
+        # asyncpg must not cache prepared statements or reuse their names.
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+    return connect_args
+
+
 # PostgreSQL - SQLAlchemy setup
 # Sync engine for migrations and sync operations
 _sync_db_url = _ensure_supabase_sslmode(settings.DATABASE_URL)
 sync_engine = create_engine(
     _sync_db_url,
     connect_args={"check_same_thread": False} if "sqlite" in _sync_db_url else {},
+    **_pool_options(_sync_db_url, TimedQueuePool),
 )
 
 # Async engine for FastAPI operations
@@ -65,10 +177,37 @@ _async_db_url = _to_asyncpg_url(_sync_db_url)
 async_engine = create_async_engine(
     _async_db_url,
     echo=settings.DEBUG,
-    # asyncpg expects an SSLContext (not "require").
-    connect_args={"ssl": ssl.create_default_context()} if _is_supabase_host(_sync_db_url) else {},
+    connect_args=_async_connect_args(_sync_db_url),
+    **_pool_options(_async_db_url, TimedAsyncAdaptedQueuePool),
 )
 
+
+def _pool_status(pool) -> dict:
+    status = {"class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+        )
+    else:
+        status["status"] = pool.status()
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        status["wait"] = wait_stats.snapshot()
+    return status
+
+
+def get_pool_status() -> dict:
+    """Live connection pool metrics for both engines."""
+    return {
+        "transaction_pooler": _uses_transaction_pooler(_sync_db_url),
+        "sync": _pool_status(sync_engine.pool),
+        "async": _pool_status(async_engine.pool),
+    }
+
 # Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
 AsyncSessionLocal = async_sessionmaker(
@@ -90,6 +229,47 @@ def get_db() -> Session:
         db.close()
 
 
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Persist a group of staged writes in a single transaction.
+
+    Commits once when the block exits cleanly and rolls back on error.
+    Instances are not expired by this commit, so callers can return them
+    without a refresh round trip; generated primary keys are populated by
+    the flush that precedes the commit.
+    """
+    try:
+        yield db
+        db.flush()
+        expire_on_commit = db.expire_on_commit
+        db.expire_on_commit = False
+        try:
+            db.commit()
+        finally:
+            db.expire_on_commit = expire_on_commit
+    except Exception:
+        db.rollback()
+        raise
+
+
+@asynccontextmanager
+async def async_unit_of_work(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    Async counterpart of `unit_of_work` for AsyncSession handlers.
+
+    AsyncSessionLocal does not expire on commit, so staged instances stay
+    readable after the block without another round trip.
+    """
+    try:
+        yield db
+        await db.flush()
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
 async def get_async_db() -> AsyncSession:
     """
     Dependency function to get async database session.
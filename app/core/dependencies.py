@@ -4,20 +4,23 @@ Exports reusable dependencies like get_current_user.
 """
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.routers.auth import get_current_user
-from app.models.user import User
+from app.core.principal import AuthenticatedPrincipal
 
 # Re-export get_current_user for convenience
-__all__ = ["get_current_user", "CurrentUser", "DatabaseSession", "TherapistUser"]
+__all__ = ["get_current_user", "CurrentUser", "DatabaseSession", "AsyncDatabaseSession", "TherapistUser"]
 
 # Type aliases for dependency injection
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentUser = Annotated[AuthenticatedPrincipal, Depends(get_current_user)]
 DatabaseSession = Annotated[Session, Depends(get_db)]
+# Async handlers should use this so DB I/O awaits instead of blocking the event loop
+AsyncDatabaseSession = Annotated[AsyncSession, Depends(get_async_db)]
 
 
-def get_current_therapist_user(current_user: CurrentUser) -> User:
+def get_current_therapist_user(current_user: CurrentUser) -> AuthenticatedPrincipal:
     """
     Restrict access to therapist/admin users.
     """
@@ -30,5 +33,5 @@ def get_current_therapist_user(current_user: CurrentUser) -> User:
     return current_user
 
 
-TherapistUser = Annotated[User, Depends(get_current_therapist_user)]
+TherapistUser = Annotated[AuthenticatedPrincipal, Depends(get_current_therapist_user)]
 
@@ -0,0 +1,78 @@
+"""
+Authenticated principal and its per-process cache.
+
+Access tokens carry `uid` and `role` claims next to `sub` (email), so
+`get_current_user` can resolve the caller from a cache keyed by user id and
+only reads the `users` table on a miss. Entries never outlive the token they
+were cached for (TTL bounded by `exp`), and any ORM change to a User
+(role update, email change, delete) evicts that user's entry.
+"""
+import time
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+
+@dataclass(frozen=True)
+class AuthenticatedPrincipal:
+    """The authenticated caller, as needed by route handlers."""
+    id: int
+    email: str
+    role: str = "user"
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedPrincipal":
+        return cls(id=user.id, email=user.email, role=user.role or "user")
+
+
+principal_cache: TTLCache[AuthenticatedPrincipal] = TTLCache(
+    maxsize=settings.AUTH_PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def token_claims(user: User) -> dict:
+    """Claims to embed in an access token for this user."""
+    return {"sub": user.email, "uid": user.id, "role": user.role or "user"}
+
+
+def cached_principal(payload: dict) -> Optional[AuthenticatedPrincipal]:
+    """
+    Return the cached principal for a decoded token, or None on a miss.
+
+    Tokens without a `uid` claim (issued before it existed) always miss.
+    """
+    user_id = payload.get("uid")
+    if user_id is None:
+        return None
+    principal = principal_cache.get(user_id)
+    if principal is None or principal.email != payload.get("sub"):
+        return None
+    return principal
+
+
+def remember_principal(principal: AuthenticatedPrincipal, payload: dict) -> None:
+    """Cache a principal until the token expires (or the cache TTL, if sooner)."""
+    expires_at = payload.get("exp")
+    ttl_seconds = expires_at - time.time() if expires_at is not None else None
+    principal_cache.set(principal.id, principal, ttl_seconds=ttl_seconds)
+
+
+def invalidate_principal(user_id: int) -> None:
+    """Forget a cached principal, e.g. after changing the user's role."""
+    principal_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_changed_users(session: Session, flush_context: Any) -> None:
+    """Evict principals for users updated or deleted through the ORM."""
+    for obj in chain(session.dirty, session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            invalidate_principal(obj.id)
@@ -2,10 +2,14 @@
 Security utilities for authentication.
 Handles password hashing and JWT token operations.
 """
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Callable, Optional, TypeVar
+import asyncio
 import hashlib
 import base64
+import threading
+import time
 import bcrypt
 from jose import JWTError, jwt
 from app.core.config import settings
@@ -13,6 +17,12 @@ from app.core.config import settings
 # Note: Using bcrypt directly instead of passlib to avoid initialization issues
 # and to have better control over password length handling
 
+T = TypeVar("T")
+
+
+class PasswordPoolSaturated(Exception):
+    """Raised when the password hashing pool has no capacity left for another job."""
+
 
 def _prehash_password(password: str) -> str:
     """
@@ -65,10 +75,114 @@ def get_password_hash(password: str) -> str:
     # Pre-hash with SHA-256 and encode as base64 (produces 44-char string, ~44 bytes UTF-8, under bcrypt's 72-byte limit)
     prehashed = _prehash_password(password)
     # Hash with bcrypt directly (returns bytes, convert to string for storage)
-    hashed = bcrypt.hashpw(prehashed.encode('utf-8'), bcrypt.gensalt())
+    hashed = bcrypt.hashpw(prehashed.encode('utf-8'), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS))
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    True when a stored hash was made with a different bcrypt cost than BCRYPT_ROUNDS.
+    
+    Args:
+        hashed_password: Stored bcrypt hash ("$2b$<cost>$...")
+    
+    Returns:
+        True if the hash should be regenerated on the next successful login
+    """
+    try:
+        return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+
+class PasswordHasherPool:
+    """
+    Bounded thread pool for bcrypt work.
+    
+    bcrypt releases the GIL while hashing, so worker threads keep the event
+    loop free. At most `max_workers` jobs run and `max_queue` more may wait;
+    beyond that `run` raises PasswordPoolSaturated so callers can shed load
+    instead of queueing requests behind seconds of hashing.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {
+            "completed": 0,
+            "rejected": 0,
+            "wait_seconds_total": 0.0,
+            "run_seconds_total": 0.0,
+        }
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Run func(*args) on a worker thread and await the result.
+        
+        Raises:
+            PasswordPoolSaturated: If max_workers + max_queue jobs are already pending
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._stats["rejected"] += 1
+                raise PasswordPoolSaturated()
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def job() -> T:
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._stats["completed"] += 1
+                    self._stats["wait_seconds_total"] += started - submitted
+                    self._stats["run_seconds_total"] += time.perf_counter() - started
+
+        future = self._executor.submit(job)
+        # Runs on completion or cancellation, so slots are never leaked
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def get_stats(self) -> dict[str, Any]:
+        with self._lock:
+            completed = self._stats["completed"]
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": min(self._pending, self.max_workers),
+                "queue_depth": max(self._pending - self.max_workers, 0),
+                "completed": completed,
+                "rejected": self._stats["rejected"],
+                "avg_wait_ms": round(self._stats["wait_seconds_total"] / completed * 1000, 1) if completed else 0.0,
+                "avg_run_ms": round(self._stats["run_seconds_total"] / completed * 1000, 1) if completed else 0.0,
+            }
+
+
+password_pool = PasswordHasherPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the password pool (raises PasswordPoolSaturated when full)."""
+    return await password_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """get_password_hash on the password pool (raises PasswordPoolSaturated when full)."""
+    return await password_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -3,18 +3,45 @@ Weekly wellbeing insights Lambda orchestration.
 
 This module keeps the scheduling/looping logic lightweight and dependency-
 injectable so we can test behavior without real AWS or database calls.
+
+Target users are split into id-ordered chunks that run concurrently on a
+thread pool. Each chunk gets its own repo/summary service (and, with the
+default wiring, its own database session). With the default wiring only
+users whose activity changed since their stored summary are targeted, so
+when a run stops short of the Lambda timeout the next invocation simply
+picks up the rest. Repos with fixed targets can use chunk checkpoints
+instead.
+
+Repos exposing `upsert_weekly_insights` receive a whole chunk's rows in one
+call (multi-row INSERT ... ON CONFLICT with the SQLAlchemy repo); others are
+written row by row through `upsert_weekly_insight`.
 """
 
 from __future__ import annotations
 
+import json
 import logging
+import math
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import date, timedelta
-from typing import Any, Optional, Protocol
+from functools import partial
+from typing import Any, Callable, ContextManager, Iterator, Optional, Protocol
 
+from sqlalchemy import delete, select
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import SessionLocal
-from app.models.user import User, WeeklyWellbeingInsight
+from app.models.user import WeeklyInsightsJobChunk
+from app.services.insights_cache import (
+    WeeklyInsightRecord,
+    activity_stamp,
+    upsert_weekly_insights,
+    users_needing_insights,
+)
 from app.services.wellbeing import wellbeing_analyzer
 
 logger = logging.getLogger(__name__)
@@ -23,7 +50,7 @@ logger = logging.getLogger(__name__)
 class WeeklyInsightsRepo(Protocol):
     """Persistence contract for weekly insight jobs."""
 
-    def get_target_user_ids(self) -> list[int]:
+    def get_target_user_ids(self, week_start: date, week_end: date) -> list[int]:
         """Return user IDs that should be processed by this weekly run."""
 
     def upsert_weekly_insight(
@@ -49,15 +76,151 @@ class WeeklySummaryService(Protocol):
         """Return summary text and optional risk tier."""
 
 
+class CheckpointStore(Protocol):
+    """Records finished chunks of the week's unfinished run so it can resume."""
+
+    def completed_chunks(self, week_start: date) -> list["ChunkCheckpoint"]:
+        """Return the chunks already finished by the week's current run."""
+
+    def mark_completed(self, week_start: date, chunk: "UserChunk") -> None:
+        """Record a finished chunk, including the users that failed in it."""
+
+    def clear(self, week_start: date) -> None:
+        """Forget the week's checkpoints once a run has covered every target."""
+
+
+WorkerFactory = Callable[[], ContextManager[tuple[WeeklyInsightsRepo, WeeklySummaryService]]]
+
+
+@dataclass
+class UserChunk:
+    index: int
+    user_ids: list[int]
+    processed_users: int = 0
+    failed_user_ids: list[int] = field(default_factory=list)
+    latency_seconds: float = 0.0
+
+    @property
+    def first_user_id(self) -> int:
+        return self.user_ids[0]
+
+    @property
+    def last_user_id(self) -> int:
+        return self.user_ids[-1]
+
+    @property
+    def failed_users(self) -> int:
+        return len(self.failed_user_ids)
+
+
+@dataclass(frozen=True)
+class ChunkCheckpoint:
+    """A finished chunk: its id range, minus the users that failed and must be retried."""
+    first_user_id: int
+    last_user_id: int
+    failed_user_ids: frozenset[int] = frozenset()
+
+    @classmethod
+    def from_chunk(cls, chunk: UserChunk) -> "ChunkCheckpoint":
+        return cls(chunk.first_user_id, chunk.last_user_id, frozenset(chunk.failed_user_ids))
+
+    def covers(self, user_id: int) -> bool:
+        return self.first_user_id <= user_id <= self.last_user_id and user_id not in self.failed_user_ids
+
+
+class InMemoryCheckpointStore:
+    """Process-local checkpoints (tests, local runs)."""
+
+    def __init__(self) -> None:
+        self._chunks: dict[date, list[ChunkCheckpoint]] = {}
+
+    def completed_chunks(self, week_start: date) -> list[ChunkCheckpoint]:
+        return list(self._chunks.get(week_start, []))
+
+    def mark_completed(self, week_start: date, chunk: UserChunk) -> None:
+        self._chunks.setdefault(week_start, []).append(ChunkCheckpoint.from_chunk(chunk))
+
+    def clear(self, week_start: date) -> None:
+        self._chunks.pop(week_start, None)
+
+
+class SQLAlchemyCheckpointStore:
+    """Checkpoints in weekly_insights_job_chunks, each write in its own short session."""
+
+    def __init__(self, session_factory: Callable[[], Session]) -> None:
+        self.session_factory = session_factory
+
+    def completed_chunks(self, week_start: date) -> list[ChunkCheckpoint]:
+        db = self.session_factory()
+        try:
+            rows = db.execute(
+                select(
+                    WeeklyInsightsJobChunk.first_user_id,
+                    WeeklyInsightsJobChunk.last_user_id,
+                    WeeklyInsightsJobChunk.failed_user_ids,
+                )
+                .where(WeeklyInsightsJobChunk.week_start == week_start)
+            ).all()
+            return [
+                ChunkCheckpoint(
+                    row.first_user_id,
+                    row.last_user_id,
+                    frozenset(json.loads(row.failed_user_ids or "[]")),
+                )
+                for row in rows
+            ]
+        finally:
+            db.close()
+
+    def mark_completed(self, week_start: date, chunk: UserChunk) -> None:
+        db = self.session_factory()
+        try:
+            db.add(WeeklyInsightsJobChunk(
+                week_start=week_start,
+                first_user_id=chunk.first_user_id,
+                last_user_id=chunk.last_user_id,
+                processed_users=chunk.processed_users,
+                failed_users=chunk.failed_users,
+                failed_user_ids=json.dumps(chunk.failed_user_ids) if chunk.failed_user_ids else None,
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def clear(self, week_start: date) -> None:
+        db = self.session_factory()
+        try:
+            db.execute(delete(WeeklyInsightsJobChunk).where(WeeklyInsightsJobChunk.week_start == week_start))
+            db.commit()
+        finally:
+            db.close()
+
+
 class SQLAlchemyWeeklyInsightsRepo:
     """SQLAlchemy-backed repository for weekly insight persistence."""
 
-    def __init__(self, db: Session) -> None:
+    # Targets are users whose stored activity stamp is stale, so finished users
+    # drop out on their own and a re-run resumes without chunk checkpoints
+    targets_stale_users_only = True
+
+    def __init__(self, db: Session, batch_size: Optional[int] = None) -> None:
         self.db = db
+        self.batch_size = batch_size or settings.WEEKLY_INSIGHTS_UPSERT_BATCH_SIZE
+
+    def get_target_user_ids(self, week_start: date, week_end: date) -> list[int]:
+        """Users active in the week whose summary is missing or stale (one query)."""
+        user_ids, unchanged = users_needing_insights(self.db, week_start)
+        logger.info(
+            "weekly_insights_targets week_start=%s changed_users=%d unchanged_users=%d",
+            week_start,
+            len(user_ids),
+            unchanged,
+        )
+        return user_ids
 
-    def get_target_user_ids(self) -> list[int]:
-        rows = self.db.query(User.id).order_by(User.id.asc()).all()
-        return [row[0] for row in rows]
+    def current_activity_stamp(self, user_id: int, week_start: date) -> str:
+        """Activity stamp for summaries built without `build_weekly_record`."""
+        return activity_stamp(self.db, user_id, week_start)
 
     def upsert_weekly_insight(
         self,
@@ -67,30 +230,24 @@ class SQLAlchemyWeeklyInsightsRepo:
         summary_text: str,
         risk_tier: Optional[str],
     ) -> None:
-        existing = (
-            self.db.query(WeeklyWellbeingInsight)
-            .filter(
-                WeeklyWellbeingInsight.user_id == user_id,
-                WeeklyWellbeingInsight.week_start == week_start,
-                WeeklyWellbeingInsight.week_end == week_end,
-            )
-            .first()
-        )
-        if existing is None:
-            self.db.add(
-                WeeklyWellbeingInsight(
-                    user_id=user_id,
-                    week_start=week_start,
-                    week_end=week_end,
-                    summary_text=summary_text,
-                    risk_tier=risk_tier,
-                )
+        self.upsert_weekly_insights([
+            WeeklyInsightRecord(
+                user_id=user_id,
+                week_start=week_start,
+                week_end=week_end,
+                summary_text=summary_text,
+                risk_tier=risk_tier,
             )
-        else:
-            existing.summary_text = summary_text
-            existing.risk_tier = risk_tier
+        ])
 
-        self.db.commit()
+    def upsert_weekly_insights(self, records: list[WeeklyInsightRecord]) -> None:
+        """Write a batch of rows with multi-row INSERT ... ON CONFLICT, in one transaction."""
+        try:
+            upsert_weekly_insights(self.db, records, chunk_size=self.batch_size)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
 
 
 class WellbeingAnalyzerSummaryService:
@@ -99,22 +256,26 @@ class WellbeingAnalyzerSummaryService:
     def __init__(self, db: Session) -> None:
         self.db = db
 
+    def build_weekly_record(self, user_id: int, week_start: date, week_end: date) -> WeeklyInsightRecord:
+        """
+        Generate the full snapshot row for one user without writing it.
+
+        The stamp is read before the analyzer runs, so activity landing in
+        between leaves the row looking stale rather than fresh.
+        """
+        _ = week_end  # Analyzer derives week_end from week_start internally.
+        stamp = activity_stamp(self.db, user_id, week_start)
+        insights = wellbeing_analyzer.generate_weekly_insights(self.db, user_id=user_id, week_start=week_start)
+        return WeeklyInsightRecord.from_insights(user_id, insights, stamp)
+
     def build_weekly_summary(
         self,
         user_id: int,
         week_start: date,
         week_end: date,
     ) -> tuple[str, Optional[str]]:
-        _ = week_end  # Analyzer derives week_end from week_start internally.
-        insights = wellbeing_analyzer.generate_weekly_insights(
-            db=self.db,
-            user_id=user_id,
-            week_start=week_start,
-        )
-        summary_text = insights.encouragement_message or (
-            "Weekly wellbeing summary generated."
-        )
-        return summary_text, insights.most_common_tier
+        record = self.build_weekly_record(user_id, week_start, week_end)
+        return record.summary_text, record.risk_tier
 
 
 def _default_week_start(today: Optional[date] = None) -> date:
@@ -122,54 +283,234 @@ def _default_week_start(today: Optional[date] = None) -> date:
     return today - timedelta(days=today.weekday())
 
 
+def partition_user_ids(user_ids: list[int], chunk_size: int) -> list[UserChunk]:
+    """Split user ids (sorted) into consecutive chunks of at most chunk_size."""
+    ordered = sorted(user_ids)
+    return [
+        UserChunk(index=n, user_ids=ordered[start:start + chunk_size])
+        for n, start in enumerate(range(0, len(ordered), chunk_size))
+    ]
+
+
+def _already_done(user_id: int, completed: list[ChunkCheckpoint]) -> bool:
+    return any(checkpoint.covers(user_id) for checkpoint in completed)
+
+
+@contextmanager
+def _shared_worker(repo: WeeklyInsightsRepo, summary_service: WeeklySummaryService) -> Iterator[tuple]:
+    yield repo, summary_service
+
+
+def sqlalchemy_worker_factory(session_factory: Callable[[], Session] = SessionLocal) -> WorkerFactory:
+    """Worker factory giving each chunk its own session, repo and summary service."""
+
+    @contextmanager
+    def worker() -> Iterator[tuple[WeeklyInsightsRepo, WeeklySummaryService]]:
+        db = session_factory()
+        try:
+            yield SQLAlchemyWeeklyInsightsRepo(db), WellbeingAnalyzerSummaryService(db)
+        finally:
+            db.close()
+
+    return worker
+
+
+def _build_record(
+    repo: WeeklyInsightsRepo,
+    summary_service: WeeklySummaryService,
+    user_id: int,
+    week_start: date,
+    week_end: date,
+) -> WeeklyInsightRecord:
+    build_record = getattr(summary_service, "build_weekly_record", None)
+    if build_record is not None:
+        return build_record(user_id=user_id, week_start=week_start, week_end=week_end)
+    # Stamp before summarising, as build_weekly_record does; a stamp-targeting
+    # repo would otherwise pick the user again on every run
+    current_stamp = getattr(repo, "current_activity_stamp", None)
+    stamp = current_stamp(user_id, week_start) if current_stamp is not None else None
+    summary_text, risk_tier = summary_service.build_weekly_summary(
+        user_id=user_id,
+        week_start=week_start,
+        week_end=week_end,
+    )
+    return WeeklyInsightRecord(
+        user_id=user_id,
+        week_start=week_start,
+        week_end=week_end,
+        summary_text=summary_text,
+        risk_tier=risk_tier,
+        activity_stamp=stamp,
+    )
+
+
+def _write_records(
+    repo: WeeklyInsightsRepo,
+    records: list[WeeklyInsightRecord],
+    chunk: UserChunk,
+    week_start: date,
+) -> None:
+    """
+    Persist a chunk's records: one batched upsert when the repo supports it, else row by row.
+
+    If the batch fails (the repo rolls it back), its records are retried one
+    at a time so only the bad ones count as failed.
+    """
+    if not records:
+        return
+    upsert_many = getattr(repo, "upsert_weekly_insights", None)
+    if upsert_many is not None:
+        try:
+            upsert_many(records)
+            chunk.processed_users += len(records)
+            return
+        except Exception as exc:
+            logger.warning(
+                "weekly_insights_chunk_write_failed chunk=%s users=%d week_start=%s reason=%s; retrying per user",
+                chunk.index,
+                len(records),
+                week_start,
+                exc,
+            )
+
+    for record in records:
+        try:
+            if upsert_many is not None:
+                upsert_many([record])
+            else:
+                repo.upsert_weekly_insight(
+                    user_id=record.user_id,
+                    week_start=record.week_start,
+                    week_end=record.week_end,
+                    summary_text=record.summary_text,
+                    risk_tier=record.risk_tier,
+                )
+            chunk.processed_users += 1
+        except Exception as exc:
+            chunk.failed_user_ids.append(record.user_id)
+            logger.exception(
+                "weekly_insights_user_failed user_id=%s week_start=%s reason=%s",
+                record.user_id,
+                week_start,
+                exc,
+            )
+
+
+def _process_chunk(
+    chunk: UserChunk,
+    worker_factory: WorkerFactory,
+    week_start: date,
+    week_end: date,
+) -> UserChunk:
+    started = time.perf_counter()
+    with worker_factory() as (repo, summary_service):
+        records = []
+        for user_id in chunk.user_ids:
+            try:
+                records.append(_build_record(repo, summary_service, user_id, week_start, week_end))
+            except Exception as exc:
+                chunk.failed_user_ids.append(user_id)
+                logger.exception(
+                    "weekly_insights_user_failed user_id=%s week_start=%s reason=%s",
+                    user_id,
+                    week_start,
+                    exc,
+                )
+        _write_records(repo, records, chunk, week_start)
+    chunk.latency_seconds = time.perf_counter() - started
+    return chunk
+
+
+def _latency_summary(latencies: list[float]) -> dict[str, float]:
+    if not latencies:
+        return {"avg": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+    return {
+        "avg": round(sum(ordered) / len(ordered) * 1000, 1),
+        "p95": round(p95 * 1000, 1),
+        "max": round(ordered[-1] * 1000, 1),
+    }
+
+
 def run_weekly_insights_job(
     *,
     week_start: Optional[date],
     repo: WeeklyInsightsRepo,
-    summary_service: WeeklySummaryService,
+    summary_service: Optional[WeeklySummaryService] = None,
+    worker_factory: Optional[WorkerFactory] = None,
+    checkpoints: Optional[CheckpointStore] = None,
+    chunk_size: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    deadline: Optional[float] = None,
 ) -> dict:
     """
     Run one weekly insight generation pass.
 
+    `repo` supplies the target users. Chunks are processed by `worker_factory`
+    contexts, one per chunk and concurrently up to `max_workers`; without a
+    factory every chunk shares `repo`/`summary_service` and runs on a single
+    worker. No new chunk is started after `deadline` (a time.monotonic()
+    value); finished chunks are recorded in `checkpoints` and skipped when
+    the unfinished run is re-invoked for the same week, except for users that
+    failed in them. Checkpoints are cleared once a run covers every target,
+    and are not used at all for repos that only target users with a stale
+    activity stamp (`targets_stale_users_only`).
+
     Returns counters that are easy to surface in logs/alarms and tests.
     """
     effective_week_start = week_start or _default_week_start()
     week_end = effective_week_start + timedelta(days=6)
-
-    user_ids = repo.get_target_user_ids()
-    processed_users = 0
-    failed_users = 0
+    chunk_size = chunk_size or settings.WEEKLY_INSIGHTS_CHUNK_SIZE
+    if worker_factory is None:
+        worker_factory = partial(_shared_worker, repo, summary_service)
+        max_workers = 1
+    max_workers = max(1, max_workers or settings.WEEKLY_INSIGHTS_WORKERS)
+    started = time.perf_counter()
+
+    if getattr(repo, "targets_stale_users_only", False):
+        # Range checkpoints would hide users whose activity changed after their chunk finished
+        checkpoints = None
+    user_ids = repo.get_target_user_ids(week_start=effective_week_start, week_end=week_end)
+    completed = checkpoints.completed_chunks(effective_week_start) if checkpoints else []
+    pending_ids = [user_id for user_id in user_ids if not _already_done(user_id, completed)]
+    chunks = partition_user_ids(pending_ids, chunk_size)
 
     logger.info(
-        "weekly_insights_job_started week_start=%s week_end=%s total_users=%d",
+        "weekly_insights_job_started week_start=%s week_end=%s total_users=%d resumed_users=%d chunks=%d workers=%d",
         effective_week_start,
         week_end,
         len(user_ids),
+        len(user_ids) - len(pending_ids),
+        len(chunks),
+        max_workers,
     )
 
-    for user_id in user_ids:
-        try:
-            summary_text, risk_tier = summary_service.build_weekly_summary(
-                user_id=user_id,
-                week_start=effective_week_start,
-                week_end=week_end,
-            )
-            repo.upsert_weekly_insight(
-                user_id=user_id,
-                week_start=effective_week_start,
-                week_end=week_end,
-                summary_text=summary_text,
-                risk_tier=risk_tier,
-            )
-            processed_users += 1
-        except Exception as exc:
-            failed_users += 1
-            logger.exception(
-                "weekly_insights_user_failed user_id=%s week_start=%s reason=%s",
-                user_id,
-                effective_week_start,
-                exc,
-            )
+    finished: list[UserChunk] = []
+    queue = list(reversed(chunks))
+    running: set[Future] = set()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weekly-insights") as pool:
+        while queue or running:
+            while queue and len(running) < max_workers and (deadline is None or time.monotonic() < deadline):
+                running.add(pool.submit(_process_chunk, queue.pop(), worker_factory, effective_week_start, week_end))
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    chunk = future.result()
+                except Exception as exc:
+                    # Worker setup failed (e.g. no session); the chunk stays pending for the next run
+                    logger.exception("weekly_insights_chunk_failed reason=%s", exc)
+                    continue
+                finished.append(chunk)
+                if checkpoints is not None:
+                    checkpoints.mark_completed(effective_week_start, chunk)
+
+    elapsed = time.perf_counter() - started
+    processed_users = sum(chunk.processed_users for chunk in finished)
+    failed_users = sum(chunk.failed_users for chunk in finished)
+    remaining_users = len(pending_ids) - sum(len(chunk.user_ids) for chunk in finished)
 
     result = {
         "week_start": effective_week_start.isoformat(),
@@ -177,7 +518,18 @@ def run_weekly_insights_job(
         "total_users": len(user_ids),
         "processed_users": processed_users,
         "failed_users": failed_users,
+        "skipped_users": len(user_ids) - len(pending_ids),
+        "remaining_users": remaining_users,
+        "complete": remaining_users == 0,
+        "chunks": len(chunks),
+        "chunks_completed": len(finished),
+        "elapsed_seconds": round(elapsed, 3),
+        "users_per_second": round((processed_users + failed_users) / elapsed, 1) if elapsed else 0.0,
+        "chunk_latency_ms": _latency_summary([chunk.latency_seconds for chunk in finished]),
     }
+    if checkpoints is not None and result["complete"]:
+        # Checkpoints only serve to resume this run; the next run starts from fresh targets
+        checkpoints.clear(effective_week_start)
     logger.info("weekly_insights_job_finished result=%s", result)
     return result
 
@@ -204,6 +556,15 @@ def _extract_week_start(event: Optional[dict[str, Any]]) -> Optional[date]:
     return date.fromisoformat(str(week_start_raw))
 
 
+def _deadline_from_context(context: Any) -> Optional[float]:
+    """time.monotonic() value at which to stop starting chunks, from the Lambda context."""
+    remaining_ms = getattr(context, "get_remaining_time_in_millis", None)
+    if remaining_ms is None:
+        return None
+    budget = remaining_ms() / 1000 - settings.WEEKLY_INSIGHTS_TIME_MARGIN_SECONDS
+    return time.monotonic() + max(budget, 0.0)
+
+
 def lambda_handler(
     event: Optional[dict[str, Any]],
     context: Any,
@@ -217,7 +578,6 @@ def lambda_handler(
     Returns HTTP-like payload shape with statusCode/body for easy operational
     debugging in CloudWatch and test assertions.
     """
-    _ = context  # context is currently unused but kept for AWS compatibility.
     try:
         week_start = _extract_week_start(event)
     except ValueError:
@@ -241,15 +601,20 @@ def lambda_handler(
 
     owned_db = None
     try:
+        job_options: dict[str, Any] = {}
         if repo is None and summary_service is None:
             owned_db = SessionLocal()
             repo = SQLAlchemyWeeklyInsightsRepo(owned_db)
-            summary_service = WellbeingAnalyzerSummaryService(owned_db)
+            job_options = {
+                "worker_factory": sqlalchemy_worker_factory(SessionLocal),
+                "deadline": _deadline_from_context(context),
+            }
 
         result = run_weekly_insights_job(
             week_start=week_start,
             repo=repo,
             summary_service=summary_service,
+            **job_options,
         )
         return {"statusCode": 200, "body": result}
     finally:
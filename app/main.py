@@ -1,6 +1,7 @@
 """
 Main FastAPI application entry point.
 """
+import asyncio
 import logging
 
 from contextlib import asynccontextmanager
@@ -11,7 +12,9 @@ from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, get_pool_status
+from app.core.principal import principal_cache
+from app.core.security import password_pool
 from app.routers import auth, llm, chat, users
 from app.routers import hearts
 from app.routers import onboarding, checkins
@@ -23,6 +26,7 @@ from app.routers import insights
 from app.routers import crisis
 from app.routers import community_ws
 from app.routers import voice
+from app.services.xp import xp_accumulator
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -36,11 +40,17 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events.
     """
     logger.info("Starting up Meghan API...")
+    xp_flusher = asyncio.create_task(xp_accumulator.run()) if xp_accumulator.enabled else None
     logger.info("Application startup complete")
     
     yield
     
     logger.info("Shutting down Meghan API...")
+    if xp_flusher is not None:
+        # Cancelling runs a final flush of buffered XP
+        xp_flusher.cancel()
+        await asyncio.gather(xp_flusher, return_exceptions=True)
+    await community_ws.manager.stop()
     logger.info("Shutdown complete")
 
 
@@ -80,6 +90,30 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/debug/db-pool")
+async def db_pool_status():
+    """Debug endpoint with live connection pool metrics (checked out, overflow, checkout wait)."""
+    return get_pool_status()
+
+
+@app.get("/debug/auth-cache")
+async def auth_cache_status():
+    """Debug endpoint with principal cache stats (hits skip the users table lookup)."""
+    return principal_cache.get_stats()
+
+
+@app.get("/debug/password-pool")
+async def password_pool_status():
+    """Debug endpoint with bcrypt worker pool stats (queue depth, rejections, latency)."""
+    return password_pool.get_stats()
+
+
+@app.get("/debug/community-ws")
+async def community_ws_status():
+    """Debug endpoint with community WebSocket backplane stats and local connection counts."""
+    return community_ws.manager.get_stats()
+
+
 @app.get("/debug/schema-check")
 async def schema_check(db: Session = Depends(get_db)):
     """Debug endpoint to verify key DB tables/columns for A4 schema alignment."""
@@ -88,12 +122,14 @@ async def schema_check(db: Session = Depends(get_db)):
         "conversations",
         "chat_messages",
         "hearts_transactions",
+        "hearts_balances",
         "crisis_events",
         "weekly_wellbeing_insights",
     ]
     required_columns = {
         "chat_messages": ["s3_key"],
-        "weekly_wellbeing_insights": ["user_id", "week_start", "week_end", "summary_text"],
+        "conversations": ["history_summary", "summary_through_message_id"],
+        "weekly_wellbeing_insights": ["user_id", "week_start", "week_end", "summary_text", "insights_json", "activity_stamp", "snapshot_verified_at"],
     }
 
     inspector = inspect(db.bind)
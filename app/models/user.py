@@ -79,7 +79,7 @@ Model Overview:
    Relationship: Links User and PeerCluster
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Date, func, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Date, func, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql.functions import now
 
@@ -141,9 +141,16 @@ class Conversation(Base):
     mood = Column(String)
     source = Column(String)
     mode = Column(String, default="talk")  # 'talk' or 'plan'
+    # Rolling summary of turns that fell out of the recent context window
+    history_summary = Column(Text, nullable=True)
+    summary_through_message_id = Column(Integer, nullable=True)  # Last ChatMessage.id folded into the summary
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
+    __table_args__ = (
+        Index("ix_conversations_user_created", "user_id", "created_at"),
+    )
+
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
@@ -154,6 +161,11 @@ class ChatMessage(Base):
     s3_key = Column(String, nullable=True)
     created_at = Column(DateTime, default=func.now(), index=True)
 
+    __table_args__ = (
+        # Keyset pagination of a conversation's history on (created_at, id)
+        Index("ix_chat_messages_conversation_created_id", "conversation_id", "created_at", "id"),
+    )
+
 class JournalEntry(Base):
     __tablename__ = "journal_entries"
 
@@ -165,6 +177,10 @@ class JournalEntry(Base):
     xp_gained = Column(Integer, default=30)
     created_at = Column(DateTime, default=func.now(), index=True)
 
+    __table_args__ = (
+        Index("ix_journal_entries_user_created", "user_id", "created_at"),
+    )
+
 
 class WeeklyWellbeingInsight(Base):
     __tablename__ = "weekly_wellbeing_insights"
@@ -175,7 +191,34 @@ class WeeklyWellbeingInsight(Base):
     week_end = Column(Date, nullable=False, index=True)
     summary_text = Column(Text, nullable=False)
     risk_tier = Column(String, nullable=True)
+    # Full WeeklyInsightsResponse as compact JSON, served by /api/insights/weekly
+    insights_json = Column(Text, nullable=True)
+    # Fingerprint of the week's journal/conversation/hearts rows when insights_json was built
+    activity_stamp = Column(String, nullable=True)
+    # Last time insights_json/activity_stamp were built or re-verified; closed weeks
+    # are trusted only when this is after the week ended
+    snapshot_verified_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=func.now(), index=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Conflict target for the bulk upsert: one row per user and week
+        Index("uq_weekly_wellbeing_insights_user_week", "user_id", "week_start", unique=True),
+    )
+
+
+class WeeklyInsightsJobChunk(Base):
+    """A finished chunk of the current weekly insights run; lets a timed-out run resume."""
+    __tablename__ = "weekly_insights_job_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    week_start = Column(Date, nullable=False, index=True)
+    first_user_id = Column(Integer, nullable=False)
+    last_user_id = Column(Integer, nullable=False)
+    processed_users = Column(Integer, nullable=False, default=0)
+    failed_users = Column(Integer, nullable=False, default=0)
+    failed_user_ids = Column(Text, nullable=True)  # JSON list, retried when the run resumes
+    completed_at = Column(DateTime, default=func.now())
 
 class PeerCluster(Base):
     __tablename__ = "peer_clusters"
@@ -204,6 +247,20 @@ class HeartsTransaction(Base):
    balance_after=Column(Integer,nullable=False)
    created_at=Column(DateTime,default=func.now(),index=True)
 
+   __table_args__ = (
+       Index("ix_hearts_transactions_user_created", "user_id", "created_at"),
+   )
+
+class HeartsBalanceSummary(Base):
+    """Running hearts totals per user, kept in step with every ledger append."""
+    __tablename__ = "hearts_balances"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="cascade"), primary_key=True)
+    balance = Column(Integer, nullable=False, default=0)
+    total_earned = Column(Integer, nullable=False, default=0)
+    total_redeemed = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
 class ProblemCommunity(Base):
     __tablename__ = "problem_communities"
 
@@ -238,6 +295,10 @@ class CrisisEvent(Base):
     matched_phrases = Column(Text, nullable=False)  # JSON string of patterns
     created_at = Column(DateTime, default=func.now(), index=True)
 
+    __table_args__ = (
+        Index("ix_crisis_events_user_created", "user_id", "created_at"),
+    )
+
 class MicroExpression(Base):
     __tablename__ = "micro_expressions"
 
@@ -2,50 +2,92 @@
 Authentication router.
 Handles user registration, login, and current user retrieval.
 """
-from datetime import timedelta
+import logging
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, decode_access_token
-from app.core.config import settings
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.principal import AuthenticatedPrincipal, cached_principal, remember_principal, token_claims
+from app.core.security import (
+    PasswordPoolSaturated,
+    aget_password_hash,
+    averify_password,
+    create_access_token,
+    decode_access_token,
+    password_needs_rehash,
+)
 from app.models.user import User
 from app.schemas.auth import UserCreate, UserLogin, UserResponse, Token, TokenData
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_user_by_email(db: Session, email: str) -> Optional[User]:
+# Seconds a client should back off when the password pool is saturated
+PASSWORD_POOL_RETRY_AFTER_SECONDS = 1
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     """Get a user by email address."""
-    return db.query(User).filter(User.email == email).first()
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+def _password_pool_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": str(PASSWORD_POOL_RETRY_AFTER_SECONDS)},
+    )
+
+
+async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """
     Authenticate a user by email and password.
     
+    bcrypt runs on the password pool. Hashes made with an older BCRYPT_ROUNDS
+    are upgraded to the current cost after a successful check; the upgrade is
+    best-effort and skipped (retried on a later login) when the pool is full.
+    
     Returns:
         User object if authentication succeeds, None otherwise
+    
+    Raises:
+        HTTPException: 503 if the password pool is saturated during verification
     """
-    user = get_user_by_email(db, email)
+    user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
-        return None
+    try:
+        if not await averify_password(password, user.password_hash):
+            return None
+    except PasswordPoolSaturated:
+        raise _password_pool_busy()
+    if password_needs_rehash(user.password_hash):
+        try:
+            user.password_hash = await aget_password_hash(password)
+            await db.commit()
+        except PasswordPoolSaturated:
+            logger.warning(f"Password pool saturated; skipping hash upgrade for user {user.id}")
     return user
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> AuthenticatedPrincipal:
     """
     Dependency to get the current authenticated user from JWT token.
     
+    Resolves the principal from the token's `uid` claim through the principal
+    cache; the `users` table is only read on a cache miss.
+    
     Raises:
         HTTPException: If token is invalid or user not found
     """
@@ -63,31 +105,43 @@ async def get_current_user(
     if email is None:
         raise credentials_exception
     
+    principal = cached_principal(payload)
+    if principal is not None:
+        return principal
+    
     token_data = TokenData(email=email)
-    user = get_user_by_email(db, email=token_data.email)
-    if user is None:
+    user_id = payload.get("uid")
+    if user_id is not None:
+        user = await db.get(User, user_id)
+    else:
+        # Tokens issued before the uid claim existed
+        result = await db.execute(select(User).where(User.email == token_data.email))
+        user = result.scalars().first()
+    if user is None or user.email != token_data.email:
         raise credentials_exception
     
-    return user
+    principal = AuthenticatedPrincipal.from_user(user)
+    remember_principal(principal, payload)
+    return principal
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user.
     
     Args:
         user_data: User registration data (email and password)
-        db: Database session
+        db: Async database session
     
     Returns:
         Created user information (without password)
     
     Raises:
-        HTTPException: If email already exists
+        HTTPException: If email already exists, or 503 if the password pool is saturated
     """
     # Check if user already exists
-    existing_user = get_user_by_email(db, user_data.email)
+    existing_user = await get_user_by_email(db, user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -95,15 +149,18 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await aget_password_hash(user_data.password)
+    except PasswordPoolSaturated:
+        raise _password_pool_busy()
     db_user = User(
         email=user_data.email,
         password_hash=hashed_password
     )
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return db_user
 
@@ -111,22 +168,22 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Login endpoint that returns JWT access token.
     
     Args:
         form_data: OAuth2 password request form (username=email, password)
-        db: Database session
+        db: Async database session
     
     Returns:
         JWT access token and token type
     
     Raises:
-        HTTPException: If credentials are invalid
+        HTTPException: If credentials are invalid, or 503 if the password pool is saturated
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -135,26 +192,26 @@ async def login(
         )
     
     # Create access token
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data=token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.post("/login-json", response_model=Token)
-async def login_json(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login_json(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """
     Login endpoint that accepts JSON (alternative to OAuth2 form).
     
     Args:
         user_data: User login data (email and password)
-        db: Database session
+        db: Async database session
     
     Returns:
         JWT access token and token type
     
     Raises:
-        HTTPException: If credentials are invalid
+        HTTPException: If credentials are invalid, or 503 if the password pool is saturated
     """
-    user = authenticate_user(db, user_data.email, user_data.password)
+    user = await authenticate_user(db, user_data.email, user_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -163,20 +220,27 @@ async def login_json(user_data: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Create access token
-    access_token = create_access_token(data={"sub": user.email})
+    access_token = create_access_token(data=token_claims(user))
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
+async def get_current_user_info(
+    current_user: AuthenticatedPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
     Get current authenticated user information.
     
     Args:
         current_user: Current authenticated user (from dependency)
+        db: Async database session
     
     Returns:
         Current user information
     """
-    return current_user
+    user = await db.get(User, current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
 
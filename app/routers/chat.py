@@ -1,15 +1,21 @@
 """
 Chat router handling conversation lifecycle, safety gating, LLM orchestration, and crisis escalation.
 """
+import asyncio
+import base64
+import binascii
 import logging
-import math
+import time
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.dependencies import CurrentUser, DatabaseSession
-from app.models.user import User, UserState, UserProfile, Conversation, ChatMessage, CrisisEvent
+from typing import List, Optional, Dict, Any, Tuple
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.database import async_unit_of_work
+from app.core.dependencies import CurrentUser, AsyncDatabaseSession
+from app.models.user import UserState, UserProfile, Conversation, ChatMessage, CrisisEvent
 from app.schemas.chat import (
     ConversationCreate,
     ConversationResponse,
@@ -19,10 +25,13 @@ from app.schemas.chat import (
     ChatHistoryResponse
 )
 from app.services.chat import chat_service
+from app.services.chat_context import ChatContext, build_chat_context
+from app.services.history_cache import locked_updated_at, record_message_write
 from app.services.safety import safety_service
+from app.services.xp import award_xp_buffered
 from app.services.notifications import notification_service
+from app.routers.users import get_or_create_user_state  # reuse helper
 import json
-from app.models.user import CrisisEvent
 
 
 logger = logging.getLogger(__name__)
@@ -32,63 +41,27 @@ router = APIRouter(prefix="/api/chat", tags=["chat"])
 # XP awarded per message sent
 XP_PER_MESSAGE = 5
 
+# Page size bounds for cursor-paginated history
+HISTORY_DEFAULT_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
 
-def calculate_level(xp: int) -> int:
-    """
-    Calculate user level from XP.
-    Formula: floor(xp / 200) + 1
-    
-    Args:
-        xp: Experience points
-    
-    Returns:
-        User level
-    """
-    return math.floor(xp / 200) + 1
+# Disable proxy buffering so SSE tokens reach the client as they are produced
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 
 
-def get_or_create_user_state(db: Session, user_id: int) -> UserState:
-    """
-    Get existing user state or create a default one.
-    
-    Args:
-        db: Database session
-        user_id: User ID
-    
-    Returns:
-        UserState object
-    """
-    user_state = db.query(UserState).filter(UserState.user_id == user_id).first()
-    if not user_state:
-        # Create default user state
-        user_state = UserState(
-            user_id=user_id,
-            mood="Grounded",
-            risk_tier="Green",
-            xp=0,
-            level=1,
-            steps=0,
-            sleep_hours=0,
-            pomo_sessions=0
-        )
-        db.add(user_state)
-        db.commit()
-        db.refresh(user_state)
-    return user_state
-
-
-def get_user_profile_dict(db: Session, user_id: int) -> Optional[Dict[str, Any]]:
+async def get_user_profile_dict(db: AsyncSession, user_id: int) -> Optional[Dict[str, Any]]:
     """
     Get user profile as a dictionary for use in bio context.
     
     Args:
-        db: Database session
+        db: Async database session
         user_id: User ID
     
     Returns:
         Dict with bio info or None
     """
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    result = await db.execute(select(UserProfile).where(UserProfile.user_id == user_id))
+    profile = result.scalars().first()
     if not profile:
         return None
     
@@ -107,31 +80,11 @@ def get_user_profile_dict(db: Session, user_id: int) -> Optional[Dict[str, Any]]
     return bio_dict if bio_dict else None
 
 
-def add_xp_to_user_state(db: Session, user_id: int, amount: int) -> UserState:
-    """
-    Add XP to user state and update level.
-    
-    Args:
-        db: Database session
-        user_id: User ID
-        amount: XP amount to add
-    
-    Returns:
-        Updated UserState object
-    """
-    user_state = get_or_create_user_state(db, user_id)
-    user_state.xp += amount
-    user_state.level = calculate_level(user_state.xp)
-    db.commit()
-    db.refresh(user_state)
-    return user_state
-
-
 @router.post("/conversations", response_model=ConversationResponse, status_code=status.HTTP_201_CREATED)
 async def create_conversation(
     conversation_data: ConversationCreate,
     current_user: CurrentUser,
-    db: DatabaseSession
+    db: AsyncDatabaseSession
 ):
     """
     Create a new conversation.
@@ -147,7 +100,7 @@ async def create_conversation(
         Created conversation
     """
     # Get or use current user state
-    user_state = get_or_create_user_state(db, current_user.id)
+    user_state = await get_or_create_user_state(db, current_user.id)
     
     # Use provided values or fall back to user state
     tier = conversation_data.tier or user_state.risk_tier
@@ -188,8 +141,8 @@ async def create_conversation(
     )
     
     db.add(conversation)
-    db.commit()
-    db.refresh(conversation)
+    await db.commit()
+    await db.refresh(conversation)
     
     logger.info(f"Created conversation {conversation.id} for user {current_user.id}")
     return conversation
@@ -198,7 +151,7 @@ async def create_conversation(
 @router.get("/conversations", response_model=ConversationListResponse)
 async def list_conversations(
     current_user: CurrentUser,
-    db: DatabaseSession
+    db: AsyncDatabaseSession
 ):
     """
     List all conversations for the current user.
@@ -210,57 +163,278 @@ async def list_conversations(
     Returns:
         List of conversations
     """
-    conversations = db.query(Conversation).filter(
-        Conversation.user_id == current_user.id
-    ).order_by(Conversation.created_at.desc()).all()
+    result = await db.execute(
+        select(Conversation)
+        .where(Conversation.user_id == current_user.id)
+        .order_by(Conversation.created_at.desc())
+    )
+    conversations = result.scalars().all()
     
     return ConversationListResponse(conversations=conversations)
 
 
+async def _get_owned_conversation(db: AsyncSession, conversation_id: int, user_id: int) -> Conversation:
+    """
+    Load a conversation and verify it belongs to the given user.
+    
+    Raises:
+        HTTPException: If conversation not found or doesn't belong to user
+    """
+    conversation = await db.get(Conversation, conversation_id)
+    
+    if not conversation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found"
+        )
+    
+    # Verify ownership
+    if conversation.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this conversation"
+        )
+    
+    return conversation
+
+
+def _add_message(
+    db: AsyncSession,
+    conversation: Conversation,
+    role: str,
+    content: str,
+    created_at: Optional[datetime] = None,
+) -> ChatMessage:
+    """
+    Stage a chat message and bump the conversation timestamp.
+
+    Nothing is committed here; callers persist the turn with `async_unit_of_work`
+    (reading `locked_updated_at` first) and then call `_record_cached_history`.
+    Timestamps are set explicitly so messages written in the same transaction
+    keep their send order.
+    """
+    now = datetime.now(timezone.utc)
+    message = ChatMessage(
+        conversation_id=conversation.id,
+        role=role,
+        content=content,
+        created_at=created_at or now,
+    )
+    db.add(message)
+    conversation.updated_at = now
+    return message
+
+
+def _record_cached_history(
+    conversation: Conversation,
+    previous_updated_at: Optional[datetime],
+    *messages: ChatMessage,
+) -> None:
+    """
+    Append committed messages to the history cache under the new `updated_at` stamp.
+
+    previous_updated_at is the `locked_updated_at` value read inside the
+    committing unit of work.
+    """
+    record_message_write(conversation, previous_updated_at, *messages)
+
+
+def _add_blocked_reply(
+    db: AsyncSession,
+    conversation: Conversation,
+    user_id: int,
+    content: str,
+    safety,
+) -> tuple[ChatMessage, CrisisEvent]:
+    """
+    Stage the safe model reply for a message stopped by the safety gate
+    and a crisis event for therapist monitoring.
+    """
+    # Save a safe model message without calling the LLM
+    safe_model_message = _add_message(db, conversation, "model", safety.safe_reply)
+
+    # Log crisis event for therapist monitoring
+    event = CrisisEvent(
+        user_id=user_id,
+        source="chat",
+        community_id=None,
+        message_excerpt=content[:300],
+        risk_level=safety.risk_level,
+        matched_phrases=json.dumps(safety.matched_phrases),
+    )
+    db.add(event)
+    return safe_model_message, event
+
+
+def _notify_blocked_message(event: CrisisEvent, conversation_id: int, user_id: int, safety) -> None:
+    """Notify therapists once the crisis event is committed."""
+    try:
+        # Notify therapist (stubbed notification service)
+        notification_service.notify_therapist_crisis(event)
+    except Exception as e:
+        logger.error(f"Failed to notify therapist of CrisisEvent: {e}")
+
+    logger.warning(
+        f"Safety gate blocked LLM for user={user_id}, "
+        f"conversation={conversation_id}, risk_level={safety.risk_level}, "
+        f"matches={safety.matched_phrases}"
+    )
+
+
+async def _load_chat_context(
+    db: AsyncSession,
+    conversation: Conversation,
+    before_message_id: Optional[int] = None,
+) -> ChatContext:
+    """Load the bounded recent window and rolling summary formatted for the LLM."""
+    return await build_chat_context(
+        db, conversation, before_message_id, summarizer=chat_service.summarize_history
+    )
+
+
+def _reply_arguments(
+    conversation: Conversation,
+    context: ChatContext,
+    user_content: str,
+    user_state: UserState,
+    user_profile: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Keyword arguments for chat_service.generate_response, resolved up front.
+
+    Everything is read from already-loaded objects here, so the generation
+    itself never touches the request's session.
+    """
+    return {
+        "user_message": user_content,
+        "chat_history": context.recent,
+        "tier": conversation.tier,
+        "mood": conversation.mood,
+        "source": conversation.source,
+        "bio": user_profile,
+        "other_text": user_state.other_text if conversation.source == "Others" else None,
+        "mode": conversation.mode or "talk",
+        "history_summary": context.summary,
+    }
+
+
+async def _generate_reply(
+    db: AsyncSession,
+    conversation: Conversation,
+    user_content: str,
+    user_state: UserState,
+    user_profile: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Build the bounded history for the current turn and generate the AI reply."""
+    # Get recent chat history (plus summary of older turns) for context.
+    # The current user message is not persisted yet, so all stored messages are prior turns.
+    context = await _load_chat_context(db, conversation)
+    return await chat_service.generate_response(
+        **_reply_arguments(conversation, context, user_content, user_state, user_profile)
+    )
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def encode_history_cursor(message: ChatMessage) -> str:
+    """Opaque cursor for a message's position in history, i.e. its (created_at, id)."""
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_history_cursor.
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, message_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(message_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid history cursor")
+
+
 @router.get("/conversations/{conversation_id}/messages", response_model=ChatHistoryResponse)
 async def get_conversation_messages(
     conversation_id: int,
     current_user: CurrentUser,
-    db: DatabaseSession
+    db: AsyncDatabaseSession,
+    limit: Optional[int] = Query(
+        None, ge=1, le=HISTORY_MAX_PAGE_SIZE,
+        description="Page size. Without limit/before/after the full history is returned.",
+    ),
+    before: Optional[str] = Query(None, description="Cursor: return messages older than this one"),
+    after: Optional[str] = Query(None, description="Cursor: return messages newer than this one"),
 ):
     """
-    Get all messages for a specific conversation.
+    Get messages for a specific conversation, oldest first.
+    
+    With `limit`, `before` or `after` the history is keyset-paginated on
+    (created_at, id): the default page is the most recent `limit` messages,
+    `before` walks back into older messages and `after` fetches newer ones.
+    Each page is one index range scan, so deep pages cost the same as the first.
     
     Args:
         conversation_id: Conversation ID
         current_user: Current authenticated user
         db: Database session
+        limit: Page size
+        before: Cursor of the oldest message already seen
+        after: Cursor of the newest message already seen
     
     Returns:
-        Conversation and its messages
+        Conversation, its messages, and cursors for the neighbouring pages
     
     Raises:
-        HTTPException: If conversation not found or doesn't belong to user
+        HTTPException: If conversation not found or doesn't belong to user,
+            or if both cursors are given or a cursor is malformed
     """
-    # Get conversation
-    conversation = db.query(Conversation).filter(
-        Conversation.id == conversation_id
-    ).first()
+    conversation = await _get_owned_conversation(db, conversation_id, current_user.id)
     
-    if not conversation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
-        )
+    query = select(ChatMessage).where(ChatMessage.conversation_id == conversation_id)
+    position = tuple_(ChatMessage.created_at, ChatMessage.id)
     
-    # Verify ownership
-    if conversation.user_id != current_user.id:
+    if limit is None and before is None and after is None:
+        result = await db.execute(query.order_by(ChatMessage.created_at.asc(), ChatMessage.id.asc()))
+        return ChatHistoryResponse(conversation=conversation, messages=result.scalars().all())
+    
+    if before is not None and after is not None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this conversation"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass either 'before' or 'after', not both",
         )
+    page_size = limit or HISTORY_DEFAULT_PAGE_SIZE
     
-    # Get messages
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.conversation_id == conversation_id
-    ).order_by(ChatMessage.created_at.asc()).all()
-    
-    return ChatHistoryResponse(conversation=conversation, messages=messages)
+    if after is not None:
+        query = query.where(position > decode_history_cursor(after)).order_by(
+            ChatMessage.created_at.asc(), ChatMessage.id.asc()
+        )
+    else:
+        if before is not None:
+            query = query.where(position < decode_history_cursor(before))
+        query = query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+    
+    # One extra row tells us whether another page exists
+    result = await db.execute(query.limit(page_size + 1))
+    messages = list(result.scalars().all())
+    has_more = len(messages) > page_size
+    messages = messages[:page_size]
+    if after is None:
+        messages.reverse()
+    
+    return ChatHistoryResponse(
+        conversation=conversation,
+        messages=messages,
+        has_more=has_more,
+        before_cursor=encode_history_cursor(messages[0]) if messages else before,
+        after_cursor=encode_history_cursor(messages[-1]) if messages else after,
+    )
 
 
 @router.post("/conversations/{conversation_id}/messages", response_model=ChatMessageResponse)
@@ -268,7 +442,7 @@ async def send_message(
     conversation_id: int,
     message_data: ChatMessageCreate,
     current_user: CurrentUser,
-    db: DatabaseSession
+    db: AsyncDatabaseSession
 ):
     """
     Send a message in a conversation and get AI response.
@@ -295,106 +469,53 @@ async def send_message(
             detail="Message role must be 'user'. Model responses are generated automatically."
         )
     
-    # Get conversation
-    conversation = db.query(Conversation).filter(
-        Conversation.id == conversation_id
-    ).first()
-    
-    if not conversation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Conversation not found"
-        )
-    
-    # Verify ownership
-    if conversation.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this conversation"
-        )
+    conversation = await _get_owned_conversation(db, conversation_id, current_user.id)
     
     # Get user state and profile for context
-    user_state = get_or_create_user_state(db, current_user.id)
-    user_profile = get_user_profile_dict(db, current_user.id)
-    
-    # Save user message
-    user_message = ChatMessage(
-        conversation_id=conversation_id,
-        role="user",
-        content=message_data.content
-    )
-    db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
+    user_state = await get_or_create_user_state(db, current_user.id)
+    user_profile = await get_user_profile_dict(db, current_user.id)
     
+    # The user message is persisted together with the reply in one transaction below
+    received_at = datetime.now(timezone.utc)
     logger.info(f"User {current_user.id} sent message in conversation {conversation_id}")
 
-    # Safety Gate check (V1) - run before calling the LLM
+    # Safety Gate check (V1) - run before any reply is returned
     # TODO: Replace keyword heuristics with model-based classifier + eval harness
-    safety = safety_service.assess_user_message(message_data.content)
+    scan = safety_service.scan(message_data.content)
+    generation: Optional[asyncio.Task] = None
+    if settings.SAFETY_LLM_CONCURRENT_WITH_CHAT and safety_service.needs_llm_assessment(scan):
+        # Start the reply while the LLM risk check runs; it is discarded if the gate blocks.
+        # History is loaded here on the request's session: the task must never use `db`,
+        # which the blocked path goes on to use after cancelling it.
+        context = await _load_chat_context(db, conversation)
+        generation = asyncio.create_task(chat_service.generate_response(
+            **_reply_arguments(conversation, context, message_data.content, user_state, user_profile)
+        ))
+    safety = await safety_service.aassess_user_message(message_data.content, scan)
     
     if not safety.allowed:  
-        # Save a safe model message without calling the LLM
-        safe_model_message = ChatMessage(
-            conversation_id=conversation_id,
-            role="model",
-            content=safety.safe_reply,
-        )
-        db.add(safe_model_message)
-        db.commit()
-        db.refresh(safe_model_message)
-
-        # Log crisis event for therapist monitoring
-        try:
-            event = CrisisEvent(
-                user_id=current_user.id,
-                source="chat",
-                community_id=None,
-                message_excerpt=message_data.content[:300],
-                risk_level=safety.risk_level,
-                matched_phrases=json.dumps(safety.matched_phrases),
-            )
-            db.add(event)
-            db.commit()
-
-            # Notify therapist (stubbed notification service)
-            notification_service.notify_therapist_crisis(event)
-        except Exception as e:
-            logger.error(f"Failed to create CrisisEvent: {e}")
-
-        logger.warning(
-            f"Safety gate blocked LLM for user={current_user.id}, "
-            f"conversation={conversation_id}, risk_level={safety.risk_level}, "
-            f"matches={safety.matched_phrases}"
-        )
-
+        if generation is not None:
+            generation.cancel()
+            await asyncio.gather(generation, return_exceptions=True)
         # For now, do NOT award XP when safety gate triggers
+        async with async_unit_of_work(db):
+            previous_updated_at = await locked_updated_at(db, conversation.id)
+            user_message = _add_message(db, conversation, "user", message_data.content, received_at)
+            safe_model_message, event = _add_blocked_reply(
+                db, conversation, current_user.id, message_data.content, safety
+            )
+        _record_cached_history(conversation, previous_updated_at, user_message, safe_model_message)
+        _notify_blocked_message(event, conversation_id, current_user.id, safety)
         return safe_model_message
     
-    # Get existing chat history for context
-    existing_messages = db.query(ChatMessage).filter(
-        ChatMessage.conversation_id == conversation_id,
-        ChatMessage.id < user_message.id  # Exclude the message we just added
-    ).order_by(ChatMessage.created_at.asc()).all()
-    
-    # Format chat history for LLM
-    chat_history = [
-        {"role": msg.role, "content": msg.content}
-        for msg in existing_messages
-    ]
-    
     # Generate AI response using chat service
     try:
-        llm_response = await chat_service.generate_response(
-            user_message=message_data.content,
-            chat_history=chat_history,
-            tier=conversation.tier,
-            mood=conversation.mood,
-            source=conversation.source,
-            bio=user_profile,
-            other_text=user_state.other_text if conversation.source == "Others" else None,
-            mode=conversation.mode or "talk"
-        )
+        if generation is not None:
+            llm_response = await generation
+        else:
+            llm_response = await _generate_reply(
+                db, conversation, message_data.content, user_state, user_profile
+            )
         
         if not llm_response.get("success"):
             logger.error(f"LLM response generation failed: {llm_response.get('error')}")
@@ -403,43 +524,131 @@ async def send_message(
         else:
             response_content = llm_response["content"]
         
-        # Save AI response
-        model_message = ChatMessage(
-            conversation_id=conversation_id,
-            role="model",
-            content=response_content
-        )
-        db.add(model_message)
-        db.commit()
-        db.refresh(model_message)
-        
-        # Update conversation timestamp
-        conversation.updated_at = datetime.now(timezone.utc)
-        db.commit()
-        
-        # Award XP for sending message
-        add_xp_to_user_state(db, current_user.id, XP_PER_MESSAGE)
-        
-        logger.info(f"Generated and saved AI response for conversation {conversation_id}, awarded {XP_PER_MESSAGE} XP")
-        
-        return model_message
-        
     except Exception as e:
         logger.error(f"Error generating AI response: {str(e)}", exc_info=True)
         # Even if LLM fails, we should save a fallback response
-        fallback_content = "I'm sorry, I'm experiencing technical difficulties. Please try again in a moment."
-        
-        model_message = ChatMessage(
-            conversation_id=conversation_id,
-            role="model",
-            content=fallback_content
+        # (and still award XP since user sent a message)
+        response_content = "I'm sorry, I'm experiencing technical difficulties. Please try again in a moment."
+    
+    # One transaction for the whole turn: user message, reply, updated_at and XP
+    async with async_unit_of_work(db):
+        previous_updated_at = await locked_updated_at(db, conversation.id)
+        user_message = _add_message(db, conversation, "user", message_data.content, received_at)
+        model_message = _add_message(db, conversation, "model", response_content)
+        # Award XP for sending message
+        await db.run_sync(award_xp_buffered, current_user.id, XP_PER_MESSAGE)
+    _record_cached_history(conversation, previous_updated_at, user_message, model_message)
+    
+    logger.info(f"Generated and saved AI response for conversation {conversation_id}, awarded {XP_PER_MESSAGE} XP")
+    
+    return model_message
+
+
+@router.post("/conversations/{conversation_id}/messages/stream")
+async def send_message_stream(
+    conversation_id: int,
+    message_data: ChatMessageCreate,
+    current_user: CurrentUser,
+    db: AsyncDatabaseSession
+):
+    """
+    Streaming variant of send_message using Server-Sent Events.
+    
+    Validation, user message persistence and the safety gate run before the
+    stream opens, in the same order as send_message. The stream then emits:
+    - `token` events ({"content": "..."}) as the provider yields text
+    - one final `done` event ({"message": ChatMessageResponse, "ttft_ms": float | null})
+    
+    The model ChatMessage is persisted and XP awarded once the stream completes.
+    Messages blocked by the safety gate emit only the `done` event carrying the
+    safe reply, and award no XP.
+    
+    Args:
+        conversation_id: Conversation ID
+        message_data: Message data (role must be 'user')
+        current_user: Current authenticated user
+        db: Database session
+    
+    Returns:
+        text/event-stream response
+    
+    Raises:
+        HTTPException: If conversation not found, doesn't belong to user, or message role is invalid
+    """
+    if message_data.role != "user":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Message role must be 'user'. Model responses are generated automatically."
         )
-        db.add(model_message)
-        db.commit()
-        db.refresh(model_message)
-        
-        # Still award XP since user sent a message
-        add_xp_to_user_state(db, current_user.id, XP_PER_MESSAGE)
-        
-        return model_message
+    
+    conversation = await _get_owned_conversation(db, conversation_id, current_user.id)
+    
+    user_state = await get_or_create_user_state(db, current_user.id)
+    user_profile = await get_user_profile_dict(db, current_user.id)
+    
+    # Committed before the stream opens: a client may disconnect before the reply is saved
+    async with async_unit_of_work(db):
+        previous_updated_at = await locked_updated_at(db, conversation.id)
+        user_message = _add_message(db, conversation, "user", message_data.content)
+    _record_cached_history(conversation, previous_updated_at, user_message)
+    
+    logger.info(f"User {current_user.id} sent streaming message in conversation {conversation_id}")
+
+    # Tokens must not reach the client before the verdict, so the stream waits for it
+    safety = await safety_service.aassess_user_message(message_data.content)
+    
+    if not safety.allowed:
+        async with async_unit_of_work(db):
+            previous_updated_at = await locked_updated_at(db, conversation.id)
+            safe_model_message, event = _add_blocked_reply(
+                db, conversation, current_user.id, message_data.content, safety
+            )
+        _record_cached_history(conversation, previous_updated_at, safe_model_message)
+        _notify_blocked_message(event, conversation_id, current_user.id, safety)
+
+        async def blocked_events():
+            yield _sse_event("done", {
+                "message": ChatMessageResponse.model_validate(safe_model_message).model_dump(mode="json"),
+                "ttft_ms": None,
+            })
+
+        return StreamingResponse(blocked_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+    
+    context = await _load_chat_context(db, conversation, user_message.id)
+
+    async def events():
+        started = time.perf_counter()
+        ttft_ms: Optional[float] = None
+        chunks: List[str] = []
+
+        async for chunk in chat_service.stream_response(
+            user_message=message_data.content,
+            chat_history=context.recent,
+            tier=conversation.tier,
+            mood=conversation.mood,
+            source=conversation.source,
+            bio=user_profile,
+            other_text=user_state.other_text if conversation.source == "Others" else None,
+            mode=conversation.mode or "talk",
+            history_summary=context.summary,
+        ):
+            if ttft_ms is None:
+                ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+            chunks.append(chunk)
+            yield _sse_event("token", {"content": chunk})
+
+        async with async_unit_of_work(db):
+            previous_updated_at = await locked_updated_at(db, conversation.id)
+            model_message = _add_message(db, conversation, "model", "".join(chunks))
+            await db.run_sync(award_xp_buffered, current_user.id, XP_PER_MESSAGE)
+        _record_cached_history(conversation, previous_updated_at, model_message)
+        logger.info(
+            f"Streamed and saved AI response for conversation {conversation_id} "
+            f"(ttft_ms={ttft_ms}), awarded {XP_PER_MESSAGE} XP"
+        )
+        yield _sse_event("done", {
+            "message": ChatMessageResponse.model_validate(model_message).model_dump(mode="json"),
+            "ttft_ms": ttft_ms,
+        })
 
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -3,7 +3,7 @@ Check-in endpoints:
 - POST /api/checkins/first  -> first emotional check-in
 """
 from fastapi import APIRouter, HTTPException, status
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.dependencies import CurrentUser, AsyncDatabaseSession
 from app.models.user import UserState
 from app.routers.users import get_or_create_user_state  # reuse helper
 
@@ -12,7 +12,7 @@ router = APIRouter(prefix="/api/checkins", tags=["checkins"])
 @router.post("/first",status_code=status.HTTP_201_CREATED)
 async def first_checkin(payload:dict,
 current_user:CurrentUser,
-db:DatabaseSession
+db:AsyncDatabaseSession
 ):
     """
     Store first emotional check-in.
@@ -43,12 +43,12 @@ db:DatabaseSession
             detail=f"Invalid risk_tier: {risk_tier}",
         )
 
-    user_state = get_or_create_user_state(db,current_user.id)
+    user_state = await get_or_create_user_state(db,current_user.id)
     user_state.mood = mood
     user_state.risk_tier = risk_tier
     if stress_source is not None:
         user_state.stress_source = stress_source
 
-    db.commit()
-    db.refresh(user_state)
+    await db.commit()
+    await db.refresh(user_state)
     return {"success":True}
\ No newline at end of file
@@ -1,18 +1,23 @@
 """
 WebSocket + REST endpoints for real-time community chat.
 
-Goal: Discord-style chat inside each community (single-instance, in-memory rooms).
+Goal: Discord-style chat inside each community. Sockets live in each process;
+broadcasts reach members on other workers via the community backplane
+(app/services/community_backplane.py).
 """
 
+import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Set
+from functools import partial
+from typing import Callable, Dict, Optional, Set
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, status, Depends
 from fastapi.websockets import WebSocketState
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.core.security import decode_access_token
 from app.models.user import User, ProblemCommunity, CommunityMembership, CommunityMessage, CrisisEvent
@@ -21,6 +26,7 @@ from app.schemas.community import (
     CommunityMessageResponse,
     CommunityMessageListResponse,
 )
+from app.services.community_backplane import CommunityBackplane, build_community_backplane
 from app.services.safety import safety_service
 from app.services.notifications import notification_service
 
@@ -29,44 +35,161 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/communities", tags=["communities-realtime"])
 
 
+class ConnectionSender:
+    """
+    Outbound side of one local connection.
+
+    Serialized payloads go into a bounded queue drained by the connection's
+    own task, so a slow client only ever delays itself. A full queue or a
+    single send outlasting the send timeout marks it as a slow consumer.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_failure: Callable[["ConnectionSender", str], None],
+        max_queue: int,
+        send_timeout_seconds: float,
+    ) -> None:
+        self.websocket = websocket
+        self.sent = 0
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_queue)
+        self._send_timeout_seconds = send_timeout_seconds
+        self._on_failure = on_failure
+        self._task = asyncio.create_task(self._drain())
+
+    @property
+    def lag(self) -> int:
+        """Payloads queued but not yet sent."""
+        return self._queue.qsize()
+
+    def offer(self, payload: str) -> bool:
+        """Queue a payload without waiting; False when the client is too far behind."""
+        try:
+            self._queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+    async def _drain(self) -> None:
+        try:
+            while True:
+                payload = await self._queue.get()
+                await asyncio.wait_for(self.websocket.send_text(payload), self._send_timeout_seconds)
+                self.sent += 1
+        except asyncio.TimeoutError:
+            self._on_failure(self, "slow")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self._on_failure(self, "error")
+
+
 class ConnectionManager:
     """
-    Manages active WebSocket connections per community.
-    Single-instance, in-memory (sufficient for current deployment).
+    Manages this process's WebSocket connections per community.
+
+    Broadcasts go through the community backplane: the message is serialized
+    and published once, and every process (this one included) hands the same
+    payload to each local connection's ConnectionSender. Delivery never waits
+    on a client; slow consumers are closed with 1013 (try again later) so
+    they reconnect and reload history over REST.
     """
 
-    def __init__(self) -> None:
-        # community_id -> set of websockets
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
+    def __init__(
+        self,
+        backplane: Optional[CommunityBackplane] = None,
+        max_queue: Optional[int] = None,
+        send_timeout_seconds: Optional[float] = None,
+    ) -> None:
+        # community_id -> {websocket: sender}
+        self.active_connections: Dict[int, Dict[WebSocket, ConnectionSender]] = {}
+        self.backplane = backplane or build_community_backplane()
+        self.max_queue = max_queue or settings.COMMUNITY_WS_SEND_QUEUE_SIZE
+        self.send_timeout_seconds = send_timeout_seconds or settings.COMMUNITY_WS_SEND_TIMEOUT_SECONDS
+        self._started = False
+        self._closing: Set[asyncio.Task] = set()
+        self._stats = {"slow_consumers_dropped": 0, "send_errors": 0}
+
+    async def start(self) -> None:
+        """Subscribe to the backplane (idempotent; also done on first connect)."""
+        if not self._started:
+            await self.backplane.start(self.deliver_local)
+            self._started = True
+
+    async def stop(self) -> None:
+        if self._started:
+            await self.backplane.stop()
+            self._started = False
 
     async def connect(self, community_id: int, websocket: WebSocket) -> None:
+        await self.start()
         await websocket.accept()
-        self.active_connections.setdefault(community_id, set()).add(websocket)
+        sender = ConnectionSender(
+            websocket,
+            on_failure=partial(self._drop, community_id),
+            max_queue=self.max_queue,
+            send_timeout_seconds=self.send_timeout_seconds,
+        )
+        self.active_connections.setdefault(community_id, {})[websocket] = sender
         logger.info(f"WebSocket connected for community {community_id}, total={len(self.active_connections[community_id])}")
 
     def disconnect(self, community_id: int, websocket: WebSocket) -> None:
-        try:
-            self.active_connections.get(community_id, set()).discard(websocket)
+        sender = self.active_connections.get(community_id, {}).pop(websocket, None)
+        if sender is not None:
+            sender.cancel()
             logger.info(f"WebSocket disconnected for community {community_id}")
-        except Exception:
-            pass
 
     async def broadcast(self, community_id: int, message: dict) -> None:
         """
-        Broadcast JSON message to all active connections in a community.
+        Broadcast JSON message to every member of a community, on all workers.
         """
-        dead: list[WebSocket] = []
-        for websocket in self.active_connections.get(community_id, set()):
-            try:
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_json(message)
-                else:
-                    dead.append(websocket)
-            except Exception:
-                dead.append(websocket)
-
-        for ws in dead:
-            self.disconnect(community_id, ws)
+        await self.start()
+        await self.backplane.publish(community_id, json.dumps(message))
+
+    async def deliver_local(self, community_id: int, payload: str) -> None:
+        """
+        Queue an already-serialized broadcast for this process's connections.
+        """
+        for websocket, sender in list(self.active_connections.get(community_id, {}).items()):
+            if websocket.client_state != WebSocketState.CONNECTED:
+                self.disconnect(community_id, websocket)
+            elif not sender.offer(payload):
+                self._drop(community_id, sender, "slow")
+
+    def get_stats(self) -> dict:
+        senders = [sender for sockets in self.active_connections.values() for sender in sockets.values()]
+        return {
+            **self.backplane.get_stats(),
+            **self._stats,
+            "communities": sum(1 for sockets in self.active_connections.values() if sockets),
+            "connections": len(senders),
+            "queued": sum(sender.lag for sender in senders),
+            "max_lag": max((sender.lag for sender in senders), default=0),
+        }
+
+    def _drop(self, community_id: int, sender: ConnectionSender, reason: str) -> None:
+        self.disconnect(community_id, sender.websocket)
+        if reason == "slow":
+            self._stats["slow_consumers_dropped"] += 1
+            logger.warning(f"Dropping slow WebSocket consumer in community {community_id}")
+            task = asyncio.create_task(self._close_slow(sender.websocket))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        else:
+            self._stats["send_errors"] += 1
+
+    async def _close_slow(self, websocket: WebSocket) -> None:
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=status.WS_1013_TRY_AGAIN_LATER),
+                self.send_timeout_seconds,
+            )
+        except Exception:
+            pass
 
 
 manager = ConnectionManager()
@@ -11,8 +11,7 @@ from app.schemas.expressions import (
     EmpathyResponseResponse,
     MicroExpressionListResponse,
 )
-from app.schemas.hearts import HeartsTransactionCreate
-from app.services.hearts import award_hearts
+from app.services.hearts import HeartsAward, append_hearts
 from app.services.safety import safety_service
 from app.services.notifications import notification_service
 
@@ -80,18 +79,18 @@ async def create_expression(
         is_anonymous=payload.is_anonymous
     )
     db.add(expression)
-    db.commit()
-    db.refresh(expression)
+    db.flush()
 
-    #awards hearts to author
-    tx = HeartsTransactionCreate(
+    #awards hearts to author, in the same commit as the expression
+    append_hearts(db, [HeartsAward(
+        user_id=current_user.id,
         amount=HEARTS_FOR_EXPRESSION,
         type = "expression_post",
         description="Posted a micro expression",
         reference_id= str(expression.id)
-    )
-
-    award_hearts(db,current_user.id,tx)
+    )])
+    db.commit()
+    db.refresh(expression)
 
     return MicroExpressionResponse(
         id=expression.id,
@@ -191,16 +190,17 @@ async def add_empathy_response(
     )
 
     db.add(response)
-    db.commit()
-    db.refresh(response)
+    db.flush()
 
-    tx = HeartsTransactionCreate(
+    append_hearts(db, [HeartsAward(
+        user_id=current_user.id,
         amount=HEARTS_FOR_EMPATHY,
         type="empathy_response",
         description = "Posted an empathy response",
         reference_id= str(response.id)
-    )
-    award_hearts(db,current_user.id,tx)
+    )])
+    db.commit()
+    db.refresh(response)
 
     return EmpathyResponseResponse(
         id=response.id,
@@ -6,8 +6,7 @@ Hearts currency endpoints.
 """
 
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.dependencies import CurrentUser, AsyncDatabaseSession
 from app.schemas.hearts import HeartsBalance, HeartsTransactionCreate, HeartsTransactionResponse
 from app.services.hearts import get_hearts_balance, award_hearts
 
@@ -16,18 +15,18 @@ router = APIRouter(prefix="/api/hearts", tags=["hearts"])
 @router.get("/balance", response_model=HeartsBalance)
 async def get_balance(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: AsyncDatabaseSession,
 ):
     """
     Get current hearts balance and totals for the authenticated user.
     """
-    return get_hearts_balance(db, current_user.id)
+    return await db.run_sync(get_hearts_balance, current_user.id)
 
 @router.post("/earn", response_model=HeartsTransactionResponse, status_code=status.HTTP_201_CREATED)
 async def earn_hearts(
     payload: HeartsTransactionCreate,
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: AsyncDatabaseSession,
 ):
     """
     Award hearts to the current user.
@@ -41,4 +40,4 @@ async def earn_hearts(
             detail="amount must be positive for earn endpoint",
         )
 
-    return award_hearts(db, current_user.id, payload)
\ No newline at end of file
+    return await db.run_sync(award_hearts, current_user.id, payload)
\ No newline at end of file
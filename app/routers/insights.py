@@ -6,9 +6,9 @@ from datetime import date, timedelta
 from typing import Optional
 from fastapi import APIRouter, HTTPException, status, Query
 
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.dependencies import CurrentUser, AsyncDatabaseSession
 from app.schemas.insights import WeeklyInsightsResponse
-from app.services.wellbeing import wellbeing_analyzer
+from app.services.insights_cache import get_weekly_insights as get_cached_weekly_insights
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +18,7 @@ router = APIRouter(prefix="/api/insights", tags=["insights"])
 @router.get("/weekly", response_model=WeeklyInsightsResponse)
 async def get_weekly_insights(
     current_user: CurrentUser,
-    db: DatabaseSession,
+    db: AsyncDatabaseSession,
     week_start: Optional[date] = Query(
         None,
         description="Start date of the week (defaults to most recent Monday). Format: YYYY-MM-DD"
@@ -40,6 +40,9 @@ async def get_weekly_insights(
     - Personalized recommendations
     - Encouragement message
     
+    Served from the persisted snapshot for closed weeks, and for the current
+    week until new journal, chat or hearts activity lands.
+    
     Args:
         current_user: Current authenticated user
         db: Database session
@@ -49,13 +52,13 @@ async def get_weekly_insights(
         WeeklyInsightsResponse with all insights
     """
     try:
-        insights = wellbeing_analyzer.generate_weekly_insights(
-            db=db,
+        insights = await db.run_sync(
+            get_cached_weekly_insights,
             user_id=current_user.id,
             week_start=week_start
         )
         
-        logger.info(f"Generated weekly insights for user {current_user.id}, week {insights.week_starting}")
+        logger.info(f"Served weekly insights for user {current_user.id}, week {insights.week_starting}")
         
         return insights
         
@@ -4,8 +4,9 @@ Journal router for guided journaling with prompts and voice support.
 import logging
 from fastapi import APIRouter, HTTPException, status, UploadFile, File
 from typing import List, Optional
+from sqlalchemy import func, select
 
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.dependencies import CurrentUser, AsyncDatabaseSession
 from app.models.user import JournalEntry
 from app.schemas.journal import (
     JournalEntryCreate,
@@ -15,8 +16,7 @@ from app.schemas.journal import (
     JournalPromptResponse,
     JournalPromptListResponse,
 )
-from app.schemas.hearts import HeartsTransactionCreate
-from app.services.hearts import award_hearts
+from app.services.hearts import HeartsAward, append_hearts
 from app.services.safety import safety_service
 from app.services.notifications import notification_service
 import json
@@ -85,7 +85,7 @@ async def get_journal_prompts(current_user:CurrentUser):
 async def create_journal_entry(
     payload:JournalEntryCreate,
     current_user:CurrentUser,
-    db:DatabaseSession
+    db:AsyncDatabaseSession
 ):
     """
     Create a new journal entry.
@@ -99,7 +99,7 @@ async def create_journal_entry(
     tier = payload.tier_at_time
 
         # Safety gate check on journal content
-    safety = safety_service.assess_user_message(payload.content)
+    safety = await safety_service.aassess_user_message(payload.content)
     if not safety.allowed:
         # Log crisis event
         try:
@@ -114,13 +114,13 @@ async def create_journal_entry(
                 matched_phrases=json.dumps(safety.matched_phrases),
             )
             db.add(event)
-            db.commit()
+            await db.commit()
 
             # Notify therapist about journal crisis event
             notification_service.notify_therapist_crisis(event)
         except Exception as e:
             logger.error(f"Failed to create CrisisEvent: {e}")
-            db.rollback()
+            await db.rollback()
 
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -137,17 +137,19 @@ async def create_journal_entry(
     )
 
     db.add(entry)
-    db.commit()
-    db.refresh(entry)
+    await db.flush()
 
-    # Award hearts for journal completion
-    tx = HeartsTransactionCreate(
+    # Award hearts for journal completion, committed together with the entry
+    award = HeartsAward(
+        user_id=current_user.id,
         amount=HEARTS_FOR_JOURNAL,
         type="journal_entry",
         description="Completed a journal entry",
         reference_id=str(entry.id),
     )
-    award_hearts(db, current_user.id, tx)
+    await db.run_sync(append_hearts, [award])
+    await db.commit()
+    await db.refresh(entry)
     
     logger.info(f"Created journal entry {entry.id} for user {current_user.id}, awarded {HEARTS_FOR_JOURNAL} hearts")
     
@@ -165,7 +167,7 @@ async def create_journal_entry(
 @router.get("/entries",response_model=JournalEntryListResponse)
 async def list_journal_entries(
     current_user:CurrentUser,
-    db:DatabaseSession,
+    db:AsyncDatabaseSession,
     limit:int=20,
     offset:int=0
 ):
@@ -175,18 +177,21 @@ async def list_journal_entries(
     Returns paginated list of entries ordered by most recent first.
     """
 
-    total = db.query(JournalEntry).filter(
-        JournalEntry.user_id == current_user.id
-    ).count()
+    total = await db.scalar(
+        select(func.count()).select_from(JournalEntry).where(
+            JournalEntry.user_id == current_user.id
+        )
+    )
 
     entries = (
-        db.query(JournalEntry)
-        .filter(JournalEntry.user_id == current_user.id)
-        .order_by(JournalEntry.created_at.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
+        await db.scalars(
+            select(JournalEntry)
+            .where(JournalEntry.user_id == current_user.id)
+            .order_by(JournalEntry.created_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+    ).all()
 
     return JournalEntryListResponse(
         entries = [
@@ -209,7 +214,7 @@ async def upload_voice_note(
     entry_id:int,
     file:UploadFile = File(...),
     current_user:CurrentUser=None,
-    db:DatabaseSession =None
+    db:AsyncDatabaseSession =None
 ):
     """
     Upload a voice note for a journal entry (STUB).
@@ -224,9 +229,13 @@ async def upload_voice_note(
     """
 
     # Verify entry exists and belongs to user
-    entry = db.query(JournalEntry).filter(
-        JournalEntry.id == entry_id,
-        JournalEntry.user_id == current_user.id,
+    entry = (
+        await db.scalars(
+            select(JournalEntry).where(
+                JournalEntry.id == entry_id,
+                JournalEntry.user_id == current_user.id,
+            )
+        )
     ).first()
     
     if not entry:
@@ -38,16 +38,18 @@ async def llm_health():
     Only checks if API key is configured, doesn't make actual API call.
     
     Returns:
-        dict with health status
+        dict with health status and client pool counters
     """
     if not llm_service.api_key:
         return {
             "status": "unhealthy",
-            "message": "GEMINI_API_KEY is not configured"
+            "message": "GEMINI_API_KEY is not configured",
+            "client_pool": llm_service.get_pool_stats(),
         }
     
     return {
         "status": "healthy",
-        "message": "API key is configured"
+        "message": "API key is configured",
+        "client_pool": llm_service.get_pool_stats(),
     }
 
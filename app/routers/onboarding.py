@@ -6,8 +6,7 @@ Onboarding endpoints:
 
 import json
 from fastapi import APIRouter, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.dependencies import CurrentUser, AsyncDatabaseSession
 from app.models.user import UserProfile
 from app.routers.users import get_or_create_user_profile  # reuse helper
 from app.schemas.user import UserProfileResponse
@@ -19,14 +18,14 @@ router = APIRouter(prefix='/api/onboarding',tags=['onboarding'])
 async def update_onboarding_profile(
     payload: dict,
     current_user:CurrentUser,
-    db:DatabaseSession,
+    db:AsyncDatabaseSession,
 ):
     """
     Save onboarding fields: age_range, life_stage, struggles.
     - struggles: expect a list of strings from frontend; store as JSON string.
     """
     # current_user is a User model (from auth dependency) and uses `id`
-    profile = get_or_create_user_profile(db, current_user.id)
+    profile = await get_or_create_user_profile(db, current_user.id)
 
     age_range = payload.get("age_range")
     life_stage = payload.get("life_stage")
@@ -44,24 +43,24 @@ async def update_onboarding_profile(
     if life_stage is not None:
         profile.life_stage = life_stage
     
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
 
     # Auto-assign communities based on updated struggles
-    auto_assign_communities_for_user(db, current_user.id, profile)
+    await db.run_sync(auto_assign_communities_for_user, current_user.id, profile)
     return profile
 
 @router.put("/privacy",response_model=UserProfileResponse)
 async def update_onboarding_privacy(
     payload:dict,
     current_user:CurrentUser,
-    db:DatabaseSession,
+    db:AsyncDatabaseSession,
 ):
     """
     Save initial privacy preference (privacy_level).
     - privacy_level: "full" | "partial" | "identified"
     """
-    profile = get_or_create_user_profile(db,current_user.id)
+    profile = await get_or_create_user_profile(db,current_user.id)
     privacy_level = payload.get("privacy_level")
 
     if privacy_level is None:
@@ -76,7 +75,7 @@ async def update_onboarding_privacy(
             detail=f"Invalid privacy level. Must be one of: {valid_levels}")
     
     profile.privacy_level = privacy_level
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
     return profile
 
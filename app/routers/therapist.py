@@ -1,7 +1,13 @@
 from fastapi import APIRouter
 from app.core.dependencies import TherapistUser, DatabaseSession
 from app.models.user import CrisisEvent
-from app.schemas.therapist import CrisisEventResponse, CrisisEventListResponse
+from app.schemas.therapist import (
+    CrisisEventResponse,
+    CrisisEventListResponse,
+    CrisisRescoreRequest,
+    CrisisRescoreResponse,
+)
+from app.services.safety_rescore import rescore_crisis_events
 import json
 
 router = APIRouter(prefix="/api/therapist", tags=["therapist"])
@@ -43,4 +49,25 @@ async def list_crisis_events(
             )
         )
 
-    return CrisisEventListResponse(events=items)
\ No newline at end of file
+    return CrisisEventListResponse(events=items)
+
+@router.post("/crisis-events/rescore", response_model=CrisisRescoreResponse)
+def rescore_crisis_events_endpoint(
+    payload: CrisisRescoreRequest,
+    current_user: TherapistUser,
+    db: DatabaseSession,
+):
+    """
+    Re-score stored chat, journal, expression and community messages against
+    the current safety lexicon and create CrisisEvents for newly flagged rows.
+
+    Declared sync so the long-running scan runs in the threadpool instead of
+    blocking the event loop. Use dry_run to preview counts.
+    """
+    report = rescore_crisis_events(
+        db,
+        sources=payload.sources,
+        chunk_size=payload.chunk_size,
+        dry_run=payload.dry_run,
+    )
+    return report.to_dict()
@@ -3,11 +3,10 @@ User state and profile management router.
 Handles user state updates, XP management, and profile operations.
 """
 import logging
-import math
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.dependencies import CurrentUser, DatabaseSession
+from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.dependencies import CurrentUser, AsyncDatabaseSession
 from app.models.user import User, UserState, UserProfile
 from app.schemas.userState import (
     UserStateResponse,
@@ -17,6 +16,7 @@ from app.schemas.userState import (
 )
 from app.schemas.user import UserProfileResponse, UserProfileUpdate
 from app.schemas.dashboard import DashboardResponse
+from app.services.xp import award_xp
 
 logger = logging.getLogger(__name__)
 
@@ -27,32 +27,19 @@ XP_PER_BIO_FIELD = 20
 
 
 
-def calculate_level(xp: int) -> int:
-    """
-    Calculate user level from XP.
-    Formula: floor(xp / 200) + 1
-    
-    Args:
-        xp: Experience points
-    
-    Returns:
-        User level
-    """
-    return math.floor(xp / 200) + 1
-
-
-def get_or_create_user_state(db: Session, user_id: int) -> UserState:
+async def get_or_create_user_state(db: AsyncSession, user_id: int) -> UserState:
     """
     Get existing user state or create a default one.
     
     Args:
-        db: Database session
+        db: Async database session
         user_id: User ID
     
     Returns:
         UserState object
     """
-    user_state = db.query(UserState).filter(UserState.user_id == user_id).first()
+    result = await db.execute(select(UserState).where(UserState.user_id == user_id))
+    user_state = result.scalars().first()
     if not user_state:
         # Create default user state
         user_state = UserState(
@@ -66,35 +53,36 @@ def get_or_create_user_state(db: Session, user_id: int) -> UserState:
             pomo_sessions=0
         )
         db.add(user_state)
-        db.commit()
-        db.refresh(user_state)
+        await db.commit()
+        await db.refresh(user_state)
     return user_state
 
 
-def get_or_create_user_profile(db: Session, user_id: int) -> UserProfile:
+async def get_or_create_user_profile(db: AsyncSession, user_id: int) -> UserProfile:
     """
     Get existing user profile or create an empty one.
     
     Args:
-        db: Database session
+        db: Async database session
         user_id: User ID
     
     Returns:
         UserProfile object
     """
-    profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
+    result = await db.execute(select(UserProfile).where(UserProfile.user_id == user_id))
+    profile = result.scalars().first()
     if not profile:
         profile = UserProfile(user_id=user_id)
         db.add(profile)
-        db.commit()
-        db.refresh(profile)
+        await db.commit()
+        await db.refresh(profile)
     return profile
 
 
 @router.get("/me/state", response_model=UserStateResponse)
 async def get_user_state(
     current_user: CurrentUser,
-    db: DatabaseSession
+    db: AsyncDatabaseSession
 ):
     """
     Get current user's state.
@@ -106,7 +94,7 @@ async def get_user_state(
     Returns:
         User state information
     """
-    user_state = get_or_create_user_state(db, current_user.id)
+    user_state = await get_or_create_user_state(db, current_user.id)
     return user_state
 
 
@@ -114,7 +102,7 @@ async def get_user_state(
 async def update_user_state(
     state_update: UserStateUpdate,
     current_user: CurrentUser,
-    db: DatabaseSession
+    db: AsyncDatabaseSession
 ):
     """
     Update user's state (mood, tier, metrics, etc.).
@@ -130,7 +118,7 @@ async def update_user_state(
     Raises:
         HTTPException: If validation fails
     """
-    user_state = get_or_create_user_state(db, current_user.id)
+    user_state = await get_or_create_user_state(db, current_user.id)
     
     # Validate tier and mood if provided
     valid_tiers = {"Green", "Yellow", "Red"}
@@ -170,8 +158,8 @@ async def update_user_state(
     for field, value in update_data.items():
         setattr(user_state, field, value)
     
-    db.commit()
-    db.refresh(user_state)
+    await db.commit()
+    await db.refresh(user_state)
     
     logger.info(f"Updated user state for user {current_user.id}")
     return user_state
@@ -181,7 +169,7 @@ async def update_user_state(
 async def add_xp(
     xp_request: XPAddRequest,
     current_user: CurrentUser,
-    db: DatabaseSession
+    db: AsyncDatabaseSession
 ):
     """
     Add XP to user state and recalculate level.
@@ -194,23 +182,18 @@ async def add_xp(
     Returns:
         Updated XP and level
     """
-    user_state = get_or_create_user_state(db, current_user.id)
-    
-    user_state.xp += xp_request.amount
-    user_state.level = calculate_level(user_state.xp)
+    totals = await db.run_sync(award_xp, current_user.id, xp_request.amount)
+    await db.commit()
     
-    db.commit()
-    db.refresh(user_state)
+    logger.info(f"Added {xp_request.amount} XP to user {current_user.id}, new level: {totals.level}")
     
-    logger.info(f"Added {xp_request.amount} XP to user {current_user.id}, new level: {user_state.level}")
-    
-    return XPAddResponse(xp=user_state.xp, level=user_state.level)
+    return XPAddResponse(xp=totals.xp, level=totals.level)
 
 
 @router.get("/me/profile", response_model=UserProfileResponse)
 async def get_user_profile(
     current_user: CurrentUser,
-    db: DatabaseSession
+    db: AsyncDatabaseSession
 ):
     """
     Get current user's profile.
@@ -222,7 +205,7 @@ async def get_user_profile(
     Returns:
         User profile information
     """
-    profile = get_or_create_user_profile(db, current_user.id)
+    profile = await get_or_create_user_profile(db, current_user.id)
     return profile
 
 
@@ -230,7 +213,7 @@ async def get_user_profile(
 async def update_user_profile(
     profile_update: UserProfileUpdate,
     current_user: CurrentUser,
-    db: DatabaseSession
+    db: AsyncDatabaseSession
 ):
     """
     Update user's profile/bio information.
@@ -245,7 +228,7 @@ async def update_user_profile(
     Returns:
         Updated user profile
     """
-    profile = get_or_create_user_profile(db, current_user.id)
+    profile = await get_or_create_user_profile(db, current_user.id)
     
     # Track which fields are being newly filled in for XP bonus
     bio_fields = ["name", "major", "hobbies", "values", "bio"]
@@ -268,22 +251,19 @@ async def update_user_profile(
     for field, value in update_data.items():
         setattr(profile, field, value)
     
-    db.commit()
-    db.refresh(profile)
-    
-    # Award XP if any fields were newly filled
+    # Award XP if any fields were newly filled (same transaction as the profile update)
     if xp_to_award > 0:
-        user_state = get_or_create_user_state(db, current_user.id)
-        user_state.xp += xp_to_award
-        user_state.level = calculate_level(user_state.xp)
-        db.commit()
+        await db.run_sync(award_xp, current_user.id, xp_to_award)
         logger.info(f"Awarded {xp_to_award} XP to user {current_user.id} for bio field completions")
     
+    await db.commit()
+    await db.refresh(profile)
+    
     logger.info(f"Updated profile for user {current_user.id}")
     return profile
 
 @router.get("/me/dashboard",response_model=DashboardResponse)
-async def get_dashboard(current_user:CurrentUser,db:DatabaseSession):
+async def get_dashboard(current_user:CurrentUser,db:AsyncDatabaseSession):
     """
     Get aggregated dashboard data for the current user.
     
@@ -298,9 +278,9 @@ async def get_dashboard(current_user:CurrentUser,db:DatabaseSession):
         Dashboard data including state, profile, hearts balance, and weekly summary
     """
 
-    user_state = get_or_create_user_state(db, current_user.id)
+    user_state = await get_or_create_user_state(db, current_user.id)
 
-    user_profile =get_or_create_user_profile(db, current_user.id)
+    user_profile = await get_or_create_user_profile(db, current_user.id)
 
     hearts_balance = user_state.xp
 
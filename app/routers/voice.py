@@ -9,15 +9,19 @@ Flow:
   - Returns both messages in a single response.
 """
 import logging
+from datetime import datetime, timezone
 from typing import Optional
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, status
 from app.core.config import settings
-from app.core.dependencies import CurrentUser, DatabaseSession
+from app.core.database import async_unit_of_work
+from app.core.dependencies import CurrentUser, AsyncDatabaseSession
 from app.models.user import Conversation, ChatMessage
 from app.schemas.chat import ChatMessageResponse
 from app.schemas.voice import VoiceMessageResponse
 from app.services.chat import chat_service
+from app.services.chat_context import build_chat_context
+from app.services.history_cache import locked_updated_at, record_message_write
 from app.services.s3_storage import S3StorageService, S3StorageError
 from app.services.stt import (
     transcribe_audio_assemblyai,
@@ -49,7 +53,7 @@ async def voice_message(
     audio: UploadFile = File(...),
     include_audio: bool = False,  # reserved for future TTS support
     current_user: CurrentUser = None,
-    db: DatabaseSession = None,
+    db: AsyncDatabaseSession = None,
 ):
     """
     Handle a single voice message for an existing conversation.
@@ -61,9 +65,7 @@ async def voice_message(
     - Returns both messages.
     """
     # 1) Validate conversation exists and belongs to user
-    conversation: Optional[Conversation] = (
-        db.query(Conversation).filter(Conversation.id == conversation_id).first()
-    )
+    conversation: Optional[Conversation] = await db.get(Conversation, conversation_id)
     if not conversation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,49 +138,26 @@ async def voice_message(
             detail="Could not transcribe audio (empty transcript). Please try again.",
         )
 
-    # 5) Save user message (as text, originating from voice) + media key if uploaded
-    user_message = ChatMessage(
-        conversation_id=conversation_id,
-        role="user",
-        content=transcript,
-        s3_key=uploaded_s3_key,
-    )
-    db.add(user_message)
-    db.commit()
-    db.refresh(user_message)
-
-    logger.info(
-        f"Saved voice-originated user message {user_message.id} "
-        f"for conversation {conversation_id}"
-    )
-
-    # 6) Build minimal chat history for context (all previous messages)
-    existing_messages = (
-        db.query(ChatMessage)
-        .filter(
-            ChatMessage.conversation_id == conversation_id,
-            ChatMessage.id < user_message.id,
-        )
-        .order_by(ChatMessage.created_at.asc())
-        .all()
+    # 5) Build bounded chat history (recent window + rolling summary) for context.
+    # The transcript is not persisted yet, so every stored message is a prior turn.
+    received_at = datetime.now(timezone.utc)
+    context = await build_chat_context(
+        db, conversation, None, summarizer=chat_service.summarize_history
     )
 
-    chat_history = [
-        {"role": msg.role, "content": msg.content} for msg in existing_messages
-    ]
-
     # 6) Generate AI response using existing chat_service
     # Note: For now we *skip* safety/hearts; that will be wired in V4.
     try:
         llm_response = await chat_service.generate_response(
             user_message=transcript,
-            chat_history=chat_history,
+            chat_history=context.recent,
             tier=conversation.tier,
             mood=conversation.mood,
             source=conversation.source,
             bio=None,  # can be added later if needed
             other_text=None,
             mode=conversation.mode or "talk",
+            history_summary=context.summary,
         )
 
         if not llm_response.get("success"):
@@ -193,37 +172,41 @@ async def voice_message(
         else:
             response_content = llm_response["content"]
 
-        ai_message = ChatMessage(
-            conversation_id=conversation_id,
-            role="model",
-            content=response_content,
-        )
-        db.add(ai_message)
-        db.commit()
-        db.refresh(ai_message)
-
-        logger.info(
-            f"Generated AI response {ai_message.id} for voice message "
-            f"in conversation {conversation_id}"
-        )
-
     except Exception as e:
         logger.error(
             f"Error generating AI response for voice message: {str(e)}",
             exc_info=True,
         )
-        fallback_content = (
+        response_content = (
             "I'm sorry, I'm experiencing technical difficulties. "
             "Please try again in a moment."
         )
+
+    # 7) Save user message (as text, originating from voice) + media key and the
+    # AI reply in one transaction
+    async with async_unit_of_work(db):
+        previous_updated_at = await locked_updated_at(db, conversation_id)
+        user_message = ChatMessage(
+            conversation_id=conversation_id,
+            role="user",
+            content=transcript,
+            s3_key=uploaded_s3_key,
+            created_at=received_at,
+        )
         ai_message = ChatMessage(
             conversation_id=conversation_id,
             role="model",
-            content=fallback_content,
+            content=response_content,
+            created_at=datetime.now(timezone.utc),
         )
-        db.add(ai_message)
-        db.commit()
-        db.refresh(ai_message)
+        db.add_all([user_message, ai_message])
+        conversation.updated_at = ai_message.created_at
+    record_message_write(conversation, previous_updated_at, user_message, ai_message)
+
+    logger.info(
+        f"Saved voice-originated user message {user_message.id} and AI response "
+        f"{ai_message.id} for conversation {conversation_id}"
+    )
 
     # 8) Return temporary read URL to the uploaded user voice clip if requested.
     audio_url: Optional[str] = None
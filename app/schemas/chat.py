@@ -51,4 +51,7 @@ class ConversationListResponse(BaseModel):
 class ChatHistoryResponse(BaseModel):
     conversation: ConversationResponse
     messages: List[ChatMessageResponse]
+    has_more: bool = Field(False, description="More messages exist beyond this page in the requested direction")
+    before_cursor: Optional[str] = Field(None, description="Pass as `before` to fetch the next older page (paged requests only)")
+    after_cursor: Optional[str] = Field(None, description="Pass as `after` to fetch newer messages (paged requests only)")
 
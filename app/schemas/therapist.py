@@ -1,6 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 
 class CrisisEventResponse(BaseModel):
@@ -19,3 +19,26 @@ class CrisisEventResponse(BaseModel):
 class CrisisEventListResponse(BaseModel):
     events: List[CrisisEventResponse]
 
+
+
+class CrisisRescoreRequest(BaseModel):
+    sources: Optional[List[Literal["chat", "journal", "expression", "community"]]] = None  # default: all
+    chunk_size: int = Field(default=1000, ge=1, le=10000)
+    dry_run: bool = False
+
+
+class CrisisRescoreSourceStats(BaseModel):
+    scanned: int
+    flagged: int
+    events_created: int
+    skipped_existing: int
+    chunks: int
+
+
+class CrisisRescoreResponse(BaseModel):
+    dry_run: bool
+    sources: Dict[str, CrisisRescoreSourceStats]
+    rows_scanned: int
+    events_created: int
+    elapsed_seconds: float
+    rows_per_second: float
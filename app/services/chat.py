@@ -2,21 +2,35 @@
 Chat Service for handling conversations with the LLM.
 Manages chat history, context, and LLM interactions.
 """
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Protocol
-from app.services.chat_contract import ChatPrompt, ChatMode
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Dict, Any, Optional, Protocol
+from app.core.config import settings
+from app.services.chat_contract import ChatPrompt, ChatMode, ChatResult
 from app.services.gemini_provider import GeminiChatService
 from app.services.prompts import (
-    generate_system_instructions
+    generate_system_instructions,
+    generate_history_summary_instructions,
 )
 
 logger = logging.getLogger(__name__)
 
 
 class ChatProvider(Protocol):
-    """Minimal provider contract so ChatService can swap AI backends."""
+    """
+    Minimal provider contract so ChatService can swap AI backends.
 
-    def generate_chat_response(self, prompt: ChatPrompt): ...
+    Providers should implement `agenerate_chat_response`. Providers that only
+    expose the sync method are still supported, but are run on a bounded
+    thread pool so they never block the event loop.
+    """
+
+    def generate_chat_response(self, prompt: ChatPrompt) -> ChatResult: ...
+
+    async def agenerate_chat_response(self, prompt: ChatPrompt) -> ChatResult: ...
+
+    def astream_chat_response(self, prompt: ChatPrompt) -> AsyncIterator[str]: ...
 
 
 class ChatService:
@@ -25,6 +39,12 @@ class ChatService:
     def __init__(self, provider: Optional[ChatProvider] = None):
         """Initialize chat service with an injectable AI provider."""
         self.provider = provider or GeminiChatService()
+        # Caps in-flight LLM calls per process; excess turns wait for a slot.
+        self._llm_slots = asyncio.Semaphore(settings.LLM_MAX_CONCURRENT_CALLS)
+        self._sync_executor = ThreadPoolExecutor(
+            max_workers=settings.LLM_SYNC_EXECUTOR_WORKERS,
+            thread_name_prefix="llm-sync",
+        )
     
     async def generate_response(
         self,
@@ -36,6 +56,7 @@ class ChatService:
         bio: Optional[Dict[str, Any]] = None,
         other_text: Optional[str] = None,
         mode: ChatMode | str = ChatMode.TALK,
+        history_summary: Optional[str] = None,
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         top_p: Optional[float] = None,
@@ -53,6 +74,7 @@ class ChatService:
             bio: Optional dict with user bio info (name, major, hobbies, values, bio)
             other_text: Optional text when source is 'Others'
             mode: Chat mode ('talk' or 'plan')
+            history_summary: Optional rolling summary of turns older than chat_history
             model: Optional model name override
             temperature: Optional temperature override
             top_p: Optional top_p override
@@ -66,47 +88,21 @@ class ChatService:
         """
         try:
             mode_value = ChatMode(mode)
-            prompt_contract = ChatPrompt(
+            provider_prompt = self._build_provider_prompt(
                 user_message=user_message,
-                mode=mode_value,
-                temperature=temperature,
-                max_tokens=max_output_tokens,
-            )
-
-            # Generate system instructions
-            system_instructions = generate_system_instructions(
+                chat_history=chat_history,
                 tier=tier,
                 mood=mood,
                 source=source,
                 bio=bio,
                 other_text=other_text,
-                mode=prompt_contract.mode.value
-            )
-            
-            logger.debug(
-                "Generated system instructions for tier=%s, mood=%s, source=%s, mode=%s",
-                tier,
-                mood,
-                source,
-                mode_value.value,
-            )
-
-            history_block = self._render_history(chat_history)
-            merged_user_message = (
-                f"{history_block}\n\nCurrent user message:\n{prompt_contract.user_message}"
-                if history_block
-                else prompt_contract.user_message
-            )
-
-            provider_prompt = ChatPrompt(
-                system_prompt=system_instructions,
-                user_message=merged_user_message,
-                mode=prompt_contract.mode,
-                temperature=prompt_contract.temperature,
-                max_tokens=prompt_contract.max_tokens,
+                mode=mode_value,
+                history_summary=history_summary,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
             )
 
-            provider_result = self.provider.generate_chat_response(provider_prompt)
+            provider_result = await self._call_provider(provider_prompt)
             content = provider_result.content or self._get_fallback_response(tier)
             if not provider_result.success:
                 logger.warning(
@@ -142,15 +138,193 @@ class ChatService:
                 "content": self._get_fallback_response(tier)
             }
 
-    def _render_history(self, chat_history: List[Dict[str, str]]) -> str:
-        if not chat_history:
-            return ""
-        history_lines = []
-        for message in chat_history:
-            role = message.get("role", "unknown")
-            content = message.get("content", "")
-            history_lines.append(f"{role}: {content}")
-        return "Previous conversation context:\n" + "\n".join(history_lines)
+    async def stream_response(
+        self,
+        user_message: str,
+        chat_history: List[Dict[str, str]],
+        tier: str,
+        mood: str,
+        source: str,
+        bio: Optional[Dict[str, Any]] = None,
+        other_text: Optional[str] = None,
+        mode: ChatMode | str = ChatMode.TALK,
+        history_summary: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_output_tokens: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response from the LLM as text chunks.
+
+        Takes the same context arguments as `generate_response`. Providers
+        without `astream_chat_response` yield their full reply as one chunk.
+        If the provider fails before producing any text, the tier fallback
+        message is yielded instead so callers always have content to persist.
+
+        Yields:
+            Non-empty text chunks in generation order
+        """
+        produced = False
+        try:
+            provider_prompt = self._build_provider_prompt(
+                user_message=user_message,
+                chat_history=chat_history,
+                tier=tier,
+                mood=mood,
+                source=source,
+                bio=bio,
+                other_text=other_text,
+                mode=ChatMode(mode),
+                history_summary=history_summary,
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+            )
+
+            astream = getattr(self.provider, "astream_chat_response", None)
+            if astream is None:
+                provider_result = await self._call_provider(provider_prompt)
+                content = provider_result.content or self._get_fallback_response(tier)
+                produced = True
+                yield content
+                return
+
+            async with self._llm_slots:
+                async for chunk in astream(provider_prompt):
+                    if chunk:
+                        produced = True
+                        yield chunk
+        except Exception as e:
+            logger.error(f"Error streaming chat response: {str(e)}", exc_info=True)
+
+        if not produced:
+            yield self._get_fallback_response(tier)
+
+    def _build_provider_prompt(
+        self,
+        user_message: str,
+        chat_history: List[Dict[str, str]],
+        tier: str,
+        mood: str,
+        source: str,
+        bio: Optional[Dict[str, Any]],
+        other_text: Optional[str],
+        mode: ChatMode,
+        history_summary: Optional[str],
+        temperature: Optional[float],
+        max_output_tokens: Optional[int],
+    ) -> ChatPrompt:
+        """Resolve system instructions and history into the provider prompt."""
+        prompt_contract = ChatPrompt(
+            user_message=user_message,
+            mode=mode,
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+        )
+
+        # Generate system instructions
+        system_instructions = generate_system_instructions(
+            tier=tier,
+            mood=mood,
+            source=source,
+            bio=bio,
+            other_text=other_text,
+            mode=prompt_contract.mode.value
+        )
+
+        logger.debug(
+            "Generated system instructions for tier=%s, mood=%s, source=%s, mode=%s",
+            tier,
+            mood,
+            source,
+            mode.value,
+        )
+
+        history_block = self._render_history(chat_history, history_summary)
+        merged_user_message = (
+            f"{history_block}\n\nCurrent user message:\n{prompt_contract.user_message}"
+            if history_block
+            else prompt_contract.user_message
+        )
+
+        return ChatPrompt(
+            system_prompt=system_instructions,
+            user_message=merged_user_message,
+            mode=prompt_contract.mode,
+            temperature=prompt_contract.temperature,
+            max_tokens=prompt_contract.max_tokens,
+        )
+
+    async def _call_provider(self, prompt: ChatPrompt) -> ChatResult:
+        """Invoke the provider without blocking the event loop."""
+        async with self._llm_slots:
+            agenerate = getattr(self.provider, "agenerate_chat_response", None)
+            if agenerate is not None:
+                return await agenerate(prompt)
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._sync_executor,
+                self.provider.generate_chat_response,
+                prompt,
+            )
+
+    async def summarize_history(
+        self,
+        previous_summary: Optional[str],
+        messages: List[Dict[str, str]],
+    ) -> str:
+        """
+        Fold older messages into the rolling conversation summary.
+        
+        Args:
+            previous_summary: Current summary, or None for the first fold
+            messages: Messages leaving the recent window, oldest first
+        
+        Returns:
+            Updated summary text. Falls back to a truncated transcript digest
+            if the provider fails, so the fold never blocks a chat turn.
+        """
+        max_tokens = settings.CHAT_SUMMARY_MAX_TOKENS
+        transcript = "\n".join(
+            f"{message.get('role', 'unknown')}: {message.get('content', '')}"
+            for message in messages
+        )
+        prompt = ChatPrompt(
+            system_prompt=generate_history_summary_instructions(max_words=max_tokens * 3 // 4),
+            user_message=(
+                f"Current summary:\n{previous_summary or '(none)'}\n\n"
+                f"Older messages:\n{transcript}"
+            ),
+            temperature=0.2,
+            max_tokens=max_tokens,
+        )
+        try:
+            result = await self._call_provider(prompt)
+            if result.success and result.content and result.content.strip():
+                return result.content.strip()
+            logger.warning("History summary provider call unsuccessful: %s", result.error)
+        except Exception as e:
+            logger.error(f"Error summarizing chat history: {str(e)}", exc_info=True)
+        
+        digest = "\n".join(filter(None, [previous_summary, transcript]))
+        # Keep the tail: the most recent folded turns matter most
+        return digest[-max_tokens * 4:]
+
+    def _render_history(
+        self,
+        chat_history: List[Dict[str, str]],
+        history_summary: Optional[str] = None,
+    ) -> str:
+        blocks = []
+        if history_summary:
+            blocks.append(f"Summary of earlier conversation:\n{history_summary}")
+        if chat_history:
+            history_lines = []
+            for message in chat_history:
+                role = message.get("role", "unknown")
+                content = message.get("content", "")
+                history_lines.append(f"{role}: {content}")
+            blocks.append("Previous conversation context:\n" + "\n".join(history_lines))
+        return "\n\n".join(blocks)
     
     def _get_fallback_response(self, tier: str) -> str:
         """
@@ -0,0 +1,153 @@
+"""
+Context-budget engine for chat prompts.
+
+Keeps prompt size bounded regardless of conversation length: the most recent
+turns are sent verbatim within an estimated token budget, and turns that fall
+out of that window are folded into a rolling summary stored on the
+`Conversation` row. Each fold only covers messages newer than
+`Conversation.summary_through_message_id`, so the summary is updated
+incrementally rather than recomputed.
+"""
+import logging
+import math
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import ChatMessage, Conversation
+from app.services.history_cache import history_cache, history_stamp
+
+logger = logging.getLogger(__name__)
+
+# Rough heuristic for English text with Gemini tokenizers
+CHARS_PER_TOKEN = 4
+# Role label, separators and newline per rendered message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+Summarizer = Callable[[Optional[str], List[Dict[str, str]]], Awaitable[str]]
+
+
+@dataclass
+class ChatContext:
+    """History to send with the current turn."""
+    summary: Optional[str]
+    recent: List[Dict[str, str]]
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate the token count of a piece of text."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def split_window(
+    messages: List[Dict[str, str]],
+    token_budget: int,
+) -> Tuple[List[Dict[str, str]], List[Dict[str, str]]]:
+    """
+    Split messages into (older, window) where window is the newest suffix
+    fitting the token budget.
+
+    Args:
+        messages: Messages ordered oldest first
+        token_budget: Estimated tokens allowed for the verbatim window
+
+    Returns:
+        Tuple of (messages outside the window, messages inside it). The newest
+        message is always kept in the window, even if it alone exceeds the budget.
+    """
+    used = 0
+    start = len(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        cost = estimate_tokens(messages[index].get("content")) + MESSAGE_OVERHEAD_TOKENS
+        if used + cost > token_budget and start < len(messages):
+            break
+        used += cost
+        start = index
+    return messages[:start], messages[start:]
+
+
+async def load_unsummarized_messages(
+    db: AsyncSession,
+    conversation: Conversation,
+    before_message_id: Optional[int] = None,
+) -> List[Dict[str, str]]:
+    """
+    Load messages not yet covered by the conversation summary.
+
+    Reads the newest CHAT_HISTORY_MAX_MESSAGES messages from the history
+    cache, falling back to one DB query on a miss. Anything older than that
+    (only possible for conversations that predate the summary) is skipped
+    on the next fold.
+
+    Returns:
+        Message dicts with 'id', 'role' and 'content', oldest first
+    """
+    stamp = history_stamp(conversation.updated_at)
+    recent = history_cache.get(conversation.id, stamp)
+    if recent is None:
+        rows = (await db.execute(
+            select(ChatMessage.id, ChatMessage.role, ChatMessage.content)
+            .where(ChatMessage.conversation_id == conversation.id)
+            .order_by(ChatMessage.id.desc())
+            .limit(settings.CHAT_HISTORY_MAX_MESSAGES)
+        )).all()
+        recent = [
+            {"id": row.id, "role": row.role, "content": row.content}
+            for row in reversed(rows)
+        ]
+        history_cache.set(conversation.id, stamp, recent)
+
+    summarized_through = conversation.summary_through_message_id or 0
+    return [
+        message for message in recent
+        if summarized_through < message["id"]
+        and (before_message_id is None or message["id"] < before_message_id)
+    ]
+
+
+async def build_chat_context(
+    db: AsyncSession,
+    conversation: Conversation,
+    before_message_id: Optional[int],
+    summarizer: Summarizer,
+) -> ChatContext:
+    """
+    Build the bounded history for a chat turn, folding older turns if needed.
+
+    Turns outside the token window are only folded once at least
+    CHAT_SUMMARY_FOLD_MIN_MESSAGES of them have accumulated, so summarisation
+    runs in batches rather than on every turn; until then they stay in the
+    window. Summary changes are set on `conversation` and persisted by the
+    caller's next commit.
+
+    Args:
+        db: Database session
+        conversation: Conversation being replied to
+        before_message_id: ID of the current user message (excluded), or None
+            when the current message is not persisted yet
+        summarizer: Async callable (previous_summary, messages) -> new summary
+
+    Returns:
+        ChatContext with the summary and recent messages to render
+    """
+    messages = await load_unsummarized_messages(db, conversation, before_message_id)
+    older, window = split_window(messages, settings.CHAT_HISTORY_TOKEN_BUDGET)
+
+    if len(older) < settings.CHAT_SUMMARY_FOLD_MIN_MESSAGES:
+        return ChatContext(summary=conversation.history_summary, recent=older + window)
+
+    summary = await summarizer(conversation.history_summary, older)
+    conversation.history_summary = summary
+    conversation.summary_through_message_id = older[-1]["id"]
+    logger.info(
+        "Folded %s messages into summary for conversation %s (through message %s)",
+        len(older),
+        conversation.id,
+        older[-1]["id"],
+    )
+    return ChatContext(summary=summary, recent=window)
@@ -0,0 +1,178 @@
+"""
+Broadcast backplane for community WebSocket chat.
+
+Each process keeps its own sockets in `ConnectionManager`; the backplane
+carries serialized broadcast payloads between processes. A process publishes
+a message once, and every subscribed process (the publisher included) hands
+it to its local connections.
+
+Backends:
+- `memory` (default): delivers straight back to this process (single worker)
+- `redis`: one pub/sub channel per community at REDIS_URL, pattern-subscribed
+  by every worker
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional, Protocol
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (community_id, serialized JSON payload) -> fan out to local sockets
+LocalDelivery = Callable[[int, str], Awaitable[None]]
+
+
+class CommunityBackplane(Protocol):
+    """Backend contract for cross-process community broadcasts."""
+
+    async def start(self, deliver: LocalDelivery) -> None: ...
+
+    async def publish(self, community_id: int, payload: str) -> None: ...
+
+    async def stop(self) -> None: ...
+
+    def get_stats(self) -> dict: ...
+
+
+class InMemoryBackplane:
+    """Process-local backplane: publishing is local delivery."""
+
+    def __init__(self) -> None:
+        self._deliver: Optional[LocalDelivery] = None
+        self._stats = {"published": 0, "delivered": 0}
+
+    async def start(self, deliver: LocalDelivery) -> None:
+        self._deliver = deliver
+
+    async def publish(self, community_id: int, payload: str) -> None:
+        self._stats["published"] += 1
+        if self._deliver is not None:
+            self._stats["delivered"] += 1
+            await self._deliver(community_id, payload)
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "backend": "memory"}
+
+
+class RedisBackplane:
+    """
+    Redis pub/sub backplane shared by all workers.
+
+    Publishes to `<prefix>:<community_id>` and listens on `<prefix>:*`, so a
+    worker receives every community's traffic once and drops what it has no
+    sockets for. If a publish fails the payload is still delivered locally,
+    so members on this worker keep seeing each other during a Redis outage.
+    The listener reconnects with a short backoff.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        client: Any | None = None,
+        channel_prefix: str = "community:ws",
+        reconnect_delay_seconds: float = 1.0,
+    ) -> None:
+        self._channel_prefix = channel_prefix
+        self._reconnect_delay_seconds = reconnect_delay_seconds
+        self.client = client or self._build_default_client(url)
+        self._deliver: Optional[LocalDelivery] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+        self._stats = {"published": 0, "delivered": 0, "errors": 0}
+
+    def _build_default_client(self, url: str) -> Any:
+        # Lazy import keeps redis optional for single-worker deployments.
+        import redis.asyncio as redis
+
+        return redis.Redis.from_url(url)
+
+    def _channel(self, community_id: int) -> str:
+        return f"{self._channel_prefix}:{community_id}"
+
+    async def start(self, deliver: LocalDelivery) -> None:
+        self._deliver = deliver
+        if self._listener is None or self._listener.done():
+            self._subscribed.clear()
+            self._listener = asyncio.create_task(self._listen())
+        await self._subscribed.wait()
+
+    async def publish(self, community_id: int, payload: str) -> None:
+        try:
+            await self.client.publish(self._channel(community_id), payload)
+            self._stats["published"] += 1
+        except Exception as exc:
+            self._record_error("publish", exc)
+            await self._deliver_local(community_id, payload)
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        self._deliver = None
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "backend": "redis", "listening": self._listener is not None and not self._listener.done()}
+
+    async def _listen(self) -> None:
+        pattern = f"{self._channel_prefix}:*"
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.psubscribe(pattern)
+                self._subscribed.set()
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    community_id = _community_id(message.get("channel"))
+                    if community_id is not None:
+                        await self._deliver_local(community_id, _decode(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._record_error("listen", exc)
+                # Don't leave start() waiting on a broker that is down
+                self._subscribed.set()
+                await asyncio.sleep(self._reconnect_delay_seconds)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def _deliver_local(self, community_id: int, payload: str) -> None:
+        if self._deliver is None:
+            return
+        try:
+            await self._deliver(community_id, payload)
+            self._stats["delivered"] += 1
+        except Exception as exc:
+            self._record_error("deliver", exc)
+
+    def _record_error(self, operation: str, exc: Exception) -> None:
+        self._stats["errors"] += 1
+        logger.warning("Community backplane %s failed: %s", operation, exc)
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _community_id(channel: Any) -> Optional[int]:
+    try:
+        return int(_decode(channel).rsplit(":", 1)[1])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def build_community_backplane() -> CommunityBackplane:
+    """Create the backplane selected by COMMUNITY_WS_BACKPLANE."""
+    if settings.COMMUNITY_WS_BACKPLANE == "redis":
+        return RedisBackplane(url=settings.REDIS_URL, channel_prefix=settings.COMMUNITY_WS_CHANNEL_PREFIX)
+    return InMemoryBackplane()
@@ -8,7 +8,7 @@ contract (`ChatPrompt` -> `ChatResult`).
 from __future__ import annotations
 
 import logging
-from typing import Any
+from typing import Any, AsyncIterator
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
@@ -18,47 +18,85 @@ from app.services.llm import llm_service
 
 logger = logging.getLogger(__name__)
 
+FALLBACK_REPLY = "I am sorry, I am having trouble responding right now. Please try again shortly."
+
 
 class GeminiChatService:
     """Gemini-backed provider used by ChatService in production."""
 
     def generate_chat_response(self, prompt: ChatPrompt) -> ChatResult:
         try:
-            llm = llm_service.get_llm(
-                model=settings.GEMINI_MODEL,
-                temperature=prompt.temperature,
-                max_output_tokens=prompt.max_tokens,
-            )
+            llm = self._get_llm(prompt)
+            response = llm.invoke(self._build_messages(prompt))
+            return self._to_result(response)
+        except Exception as exc:
+            return self._error_result(exc)
 
-            messages: list[Any] = []
-            if prompt.system_prompt:
-                messages.append(SystemMessage(content=prompt.system_prompt))
-            messages.append(HumanMessage(content=prompt.user_message))
+    async def agenerate_chat_response(self, prompt: ChatPrompt) -> ChatResult:
+        """Async variant backed by `ainvoke` so the event loop is never blocked."""
+        try:
+            llm = self._get_llm(prompt)
+            response = await llm.ainvoke(self._build_messages(prompt))
+            return self._to_result(response)
+        except Exception as exc:
+            return self._error_result(exc)
 
-            response = llm.invoke(messages)
-            content = getattr(response, "content", None) or str(response)
-            content = content.strip()
+    async def astream_chat_response(self, prompt: ChatPrompt) -> AsyncIterator[str]:
+        """Yield reply text incrementally as Gemini produces it."""
+        llm = self._get_llm(prompt)
+        async for chunk in llm.astream(self._build_messages(prompt)):
+            text = self._chunk_text(chunk)
+            if text:
+                yield text
 
-            if not content:
-                return ChatResult(
-                    success=False,
-                    content="I am sorry, I am having trouble responding right now. Please try again shortly.",
-                    error="Gemini response was empty.",
-                    model_id=settings.GEMINI_MODEL,
-                )
+    def _get_llm(self, prompt: ChatPrompt):
+        return llm_service.get_llm(
+            model=settings.GEMINI_MODEL,
+            temperature=prompt.temperature,
+            max_output_tokens=prompt.max_tokens,
+        )
 
-            return ChatResult(
-                success=True,
-                content=content,
-                error=None,
-                model_id=settings.GEMINI_MODEL,
+    def _build_messages(self, prompt: ChatPrompt) -> list[Any]:
+        messages: list[Any] = []
+        if prompt.system_prompt:
+            messages.append(SystemMessage(content=prompt.system_prompt))
+        messages.append(HumanMessage(content=prompt.user_message))
+        return messages
+
+    def _chunk_text(self, chunk: Any) -> str:
+        content = getattr(chunk, "content", None) or ""
+        if isinstance(content, list):
+            # Gemini may return content blocks instead of a plain string.
+            content = "".join(
+                part.get("text", "") if isinstance(part, dict) else str(part)
+                for part in content
             )
-        except Exception as exc:
-            logger.error("Gemini invocation failed: %s", exc, exc_info=True)
+        return content
+
+    def _to_result(self, response: Any) -> ChatResult:
+        content = getattr(response, "content", None) or str(response)
+        content = content.strip()
+
+        if not content:
             return ChatResult(
                 success=False,
-                content="I am sorry, I am having trouble responding right now. Please try again shortly.",
-                error=str(exc),
+                content=FALLBACK_REPLY,
+                error="Gemini response was empty.",
                 model_id=settings.GEMINI_MODEL,
             )
 
+        return ChatResult(
+            success=True,
+            content=content,
+            error=None,
+            model_id=settings.GEMINI_MODEL,
+        )
+
+    def _error_result(self, exc: Exception) -> ChatResult:
+        logger.error("Gemini invocation failed: %s", exc, exc_info=True)
+        return ChatResult(
+            success=False,
+            content=FALLBACK_REPLY,
+            error=str(exc),
+            model_id=settings.GEMINI_MODEL,
+        )
@@ -1,53 +1,171 @@
+"""
+Hearts ledger and per-user balance summary.
+
+Every ledger append also increments the user's `hearts_balances` row in the
+same transaction, so balance lookups are a single primary-key read. The
+UPDATE on that row takes a row lock held until the caller commits, so
+concurrent awards for one user serialize and each `balance_after` is derived
+from the locked balance rather than from re-reading the newest ledger entry.
+
+`append_hearts` writes inside the caller's transaction (so an award commits
+together with the entity it rewards) and inserts any number of awards in a
+single statement; `award_hearts` is the commit-per-call wrapper. `app.services.hearts_reconcile` checks
+the summary rows against the ledger and can repair drift.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from app.models.user import HeartsTransaction
-from app.models.user import UserState
+
+from app.models.user import HeartsBalanceSummary, HeartsTransaction
 from app.schemas.hearts import HeartsBalance, HeartsTransactionCreate, HeartsTransactionResponse
 
+
+@dataclass(frozen=True)
+class HeartsAward:
+    """One ledger entry to append for a user."""
+    user_id: int
+    amount: int
+    type: str
+    description: str
+    reference_id: Optional[str] = None
+
+    @classmethod
+    def for_user(cls, user_id: int, data: HeartsTransactionCreate) -> "HeartsAward":
+        return cls(user_id=user_id, **data.model_dump())
+
+
+def ledger_totals(db: Session, user_id: Optional[int] = None):
+    """SUM the ledger into (user_id, total_earned, total_redeemed) rows, for one user or all."""
+    query = select(
+        HeartsTransaction.user_id,
+        func.coalesce(func.sum(case((HeartsTransaction.amount > 0, HeartsTransaction.amount), else_=0)), 0)
+        .label("total_earned"),
+        func.coalesce(func.sum(case((HeartsTransaction.amount < 0, -HeartsTransaction.amount), else_=0)), 0)
+        .label("total_redeemed"),
+    ).group_by(HeartsTransaction.user_id)
+    if user_id is not None:
+        query = query.where(HeartsTransaction.user_id == user_id)
+    return db.execute(query).all()
+
+
 def get_hearts_balance(db: Session, user_id: int) -> HeartsBalance:
-    """Calculate hearts balance and totals from the transaction ledger."""
-    q = db.query(HeartsTransaction).filter(HeartsTransaction.user_id == user_id)
-
-    total_earned = 0
-    total_redeemed = 0
-    for tx in q:
-        if tx.amount > 0:
-            total_earned += tx.amount
-        else:
-            total_redeemed += -tx.amount
-
-    balance = total_earned - total_redeemed
+    """Read hearts balance and totals from the user's summary row."""
+    summary = db.get(HeartsBalanceSummary, user_id)
+    if summary is None:
+        # No row until the first award; fall back to one aggregate (normally empty)
+        totals = ledger_totals(db, user_id)
+        earned, redeemed = (totals[0].total_earned, totals[0].total_redeemed) if totals else (0, 0)
+        return HeartsBalance(balance=earned - redeemed, total_earned=earned, total_redeemed=redeemed)
     return HeartsBalance(
-        balance=balance,
-        total_earned=total_earned,
-        total_redeemed=total_redeemed,
+        balance=summary.balance,
+        total_earned=summary.total_earned,
+        total_redeemed=summary.total_redeemed,
     )
 
-def award_hearts(db: Session, user_id: int, data: HeartsTransactionCreate) -> HeartsTransactionResponse:
+
+def _increment_summary(db: Session, user_id: int, amount: int, earned: int, redeemed: int) -> Optional[int]:
+    """UPDATE ... RETURNING on the summary row (locking it); None if the user has no row yet."""
+    return db.execute(
+        update(HeartsBalanceSummary)
+        .where(HeartsBalanceSummary.user_id == user_id)
+        .values(
+            balance=HeartsBalanceSummary.balance + amount,
+            total_earned=HeartsBalanceSummary.total_earned + earned,
+            total_redeemed=HeartsBalanceSummary.total_redeemed + redeemed,
+        )
+        .returning(HeartsBalanceSummary.balance)
+    ).scalar()
+
+
+def _create_summary(db: Session, user_id: int) -> None:
     """
-    Append a new hearts transaction and return it.
-    This does NOT do any business rules (like max balance); it's a simple ledger write.
+    Create the summary row for a user, seeded from any ledger rows that predate it.
+
+    Runs in a savepoint: if a concurrent transaction created the row first,
+    the primary-key conflict is swallowed and the caller's UPDATE retry wins.
     """
-    # Get current balance from last transaction (faster than recomputing all)
-    last_tx = (
-        db.query(HeartsTransaction)
-        .filter(HeartsTransaction.user_id == user_id)
-        .order_by(HeartsTransaction.created_at.desc())
-        .first()
-    )
+    totals = ledger_totals(db, user_id)
+    earned, redeemed = (totals[0].total_earned, totals[0].total_redeemed) if totals else (0, 0)
+    try:
+        with db.begin_nested():
+            db.execute(insert(HeartsBalanceSummary).values(
+                user_id=user_id,
+                balance=earned - redeemed,
+                total_earned=earned,
+                total_redeemed=redeemed,
+            ))
+    except IntegrityError:
+        pass
 
-    current_balance = last_tx.balance_after if last_tx else 0
-    new_balance = current_balance + data.amount
 
-    tx = HeartsTransaction(
-        user_id=user_id,
-        amount=data.amount,
-        type=data.type,
-        description=data.description,
-        reference_id=data.reference_id,
-        balance_after=new_balance,
-    )
-    db.add(tx)
-    db.commit()
-    db.refresh(tx)
+def _apply_to_summary(db: Session, user_id: int, amount: int, earned: int, redeemed: int) -> int:
+    """Atomically add totals to the user's summary row and return the new balance."""
+    balance = _increment_summary(db, user_id, amount, earned, redeemed)
+    if balance is None:
+        _create_summary(db, user_id)
+        balance = _increment_summary(db, user_id, amount, earned, redeemed)
+    return balance
+
+
+def append_hearts(db: Session, awards: Sequence[HeartsAward]) -> List[HeartsTransaction]:
+    """
+    Append hearts transactions inside the caller's transaction.
+
+    Each user's summary row is updated once for all of their awards (users in
+    id order, so concurrent batches lock rows in the same order), then every
+    ledger row is inserted with one multi-row INSERT. Nothing is committed.
+
+    Args:
+        db: Database session
+        awards: Ledger entries to append, possibly for several users
+
+    Returns:
+        The inserted HeartsTransaction rows, in the order of `awards`
+    """
+    if not awards:
+        return []
+
+    by_user: Dict[int, List[HeartsAward]] = defaultdict(list)
+    for award in awards:
+        by_user[award.user_id].append(award)
 
-    return HeartsTransactionResponse.model_validate(tx)
\ No newline at end of file
+    running: Dict[int, int] = {}
+    for user_id in sorted(by_user):
+        user_awards = by_user[user_id]
+        amount = sum(a.amount for a in user_awards)
+        earned = sum(a.amount for a in user_awards if a.amount > 0)
+        redeemed = -sum(a.amount for a in user_awards if a.amount < 0)
+        # Balance before this batch; each row's balance_after then accumulates from it
+        running[user_id] = _apply_to_summary(db, user_id, amount, earned, redeemed) - amount
+
+    rows = []
+    for award in awards:
+        running[award.user_id] += award.amount
+        rows.append({
+            "user_id": award.user_id,
+            "amount": award.amount,
+            "type": award.type,
+            "description": award.description,
+            "reference_id": award.reference_id,
+            "balance_after": running[award.user_id],
+        })
+    inserted = db.scalars(insert(HeartsTransaction).returning(HeartsTransaction), rows).all()
+    # Ids are assigned in VALUES order; RETURNING order itself is not guaranteed
+    return sorted(inserted, key=lambda tx: tx.id)
+
+
+def award_hearts(db: Session, user_id: int, data: HeartsTransactionCreate) -> HeartsTransactionResponse:
+    """
+    Append a new hearts transaction, commit, and return it.
+    This does NOT do any business rules (like max balance); it's a simple ledger write.
+    Flows that create the rewarded entity should call `append_hearts` before
+    their own commit instead.
+    """
+    tx, = append_hearts(db, [HeartsAward.for_user(user_id, data)])
+    response = HeartsTransactionResponse.model_validate(tx)
+    db.commit()
+    return response
@@ -0,0 +1,99 @@
+"""
+Reconciliation of hearts_balances summary rows against the hearts ledger.
+
+The ledger (`hearts_transactions`) is the source of truth. This job sums it
+per user in one GROUP BY and reports summary rows that disagree, e.g. after a
+manual ledger fix or a failed backfill; with --fix they are overwritten.
+
+CLI:
+    python -m app.services.hearts_reconcile [--fix]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.user import HeartsBalanceSummary
+from app.services.hearts import ledger_totals
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReconcileReport:
+    fix: bool
+    users_checked: int = 0
+    mismatched: list[dict[str, Any]] = field(default_factory=list)
+    repaired: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def reconcile_hearts_balances(db: Session, *, fix: bool = False) -> ReconcileReport:
+    """
+    Compare every summary row against the ledger.
+    
+    Users with ledger rows but no summary row, and summary rows whose totals
+    differ from the ledger SUM, are reported; with fix=True they are
+    overwritten from the ledger and committed.
+    
+    Args:
+        db: Database session
+        fix: Repair mismatches instead of only reporting them
+    
+    Returns:
+        ReconcileReport with the mismatches found
+    """
+    report = ReconcileReport(fix=fix)
+    ledger = {row.user_id: (row.total_earned, row.total_redeemed) for row in ledger_totals(db)}
+    summaries = {row.user_id: row for row in db.scalars(select(HeartsBalanceSummary))}
+
+    for user_id in ledger.keys() | summaries.keys():
+        report.users_checked += 1
+        earned, redeemed = ledger.get(user_id, (0, 0))
+        expected = (earned - redeemed, earned, redeemed)
+        summary = summaries.get(user_id)
+        actual = (summary.balance, summary.total_earned, summary.total_redeemed) if summary else None
+        if actual == expected:
+            continue
+
+        report.mismatched.append({"user_id": user_id, "expected": expected, "actual": actual})
+        if fix:
+            if summary is None:
+                summary = HeartsBalanceSummary(user_id=user_id)
+                db.add(summary)
+            summary.balance, summary.total_earned, summary.total_redeemed = expected
+            report.repaired += 1
+
+    if fix and report.repaired:
+        db.commit()
+    if report.mismatched:
+        logger.warning("Hearts balance drift for %s users%s", len(report.mismatched), " (repaired)" if fix else "")
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    from app.core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Verify hearts_balances against the hearts ledger.")
+    parser.add_argument("--fix", action="store_true", help="Overwrite drifted summary rows from the ledger")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        report = reconcile_hearts_balances(db, fix=args.fix)
+    finally:
+        db.close()
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
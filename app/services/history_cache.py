@@ -0,0 +1,359 @@
+"""
+Hot cache of recent chat history per conversation.
+
+Keeps the newest CHAT_HISTORY_MAX_MESSAGES messages of active conversations
+so the send path can build context without querying `chat_messages`.
+
+Each entry is tagged with the conversation's `updated_at` value ("stamp").
+Every message write bumps `updated_at`, so a reader whose conversation row
+carries a different stamp treats the entry as a miss and reloads from the DB.
+Writers extend an entry only if it is still cached under the stamp they
+replaced; if another worker wrote in between, the entry is dropped instead.
+That keeps entries safe across workers even with the in-process backend;
+the Redis backend additionally shares warm entries between workers.
+
+Backends:
+- `memory` (default): bounded LRU with size-aware eviction
+- `redis`: one list + stamp key per conversation at REDIS_URL
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Protocol
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import ChatMessage, Conversation
+
+logger = logging.getLogger(__name__)
+
+# Approximate per-message overhead (dict, ids, role) on top of content length
+MESSAGE_OVERHEAD_BYTES = 96
+
+CachedMessage = Dict[str, Any]
+
+
+def history_stamp(updated_at: Optional[datetime]) -> Optional[str]:
+    """
+    Normalise a Conversation.updated_at value into a cache stamp.
+
+    Aware values (set in-process before a commit) and the naive UTC values
+    loaded back from the DB produce the same stamp.
+    """
+    if updated_at is None:
+        return None
+    if updated_at.tzinfo is not None:
+        updated_at = updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return updated_at.isoformat()
+
+
+def message_to_cache(message: ChatMessage) -> CachedMessage:
+    """Convert a persisted ChatMessage into the cached dict shape."""
+    return {"id": message.id, "role": message.role, "content": message.content}
+
+
+class HistoryCache(Protocol):
+    """Backend contract for the conversation history cache."""
+
+    def get(self, conversation_id: int, stamp: Optional[str]) -> Optional[List[CachedMessage]]: ...
+
+    def set(self, conversation_id: int, stamp: Optional[str], messages: List[CachedMessage]) -> None: ...
+
+    def append(
+        self, conversation_id: int, expected_stamp: Optional[str], stamp: Optional[str], message: CachedMessage
+    ) -> None: ...
+
+    def invalidate(self, conversation_id: int) -> None: ...
+
+    def clear(self) -> None: ...
+
+    def get_stats(self) -> dict: ...
+
+
+class InMemoryHistoryCache:
+    """Process-local LRU bounded by both conversation count and total bytes."""
+
+    def __init__(self, max_conversations: int, max_bytes: int, max_messages: int):
+        self._max_conversations = max_conversations
+        self._max_bytes = max_bytes
+        self._max_messages = max_messages
+        # conversation_id -> (stamp, messages, size_bytes)
+        self._entries: "OrderedDict[int, tuple[Optional[str], List[CachedMessage], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, conversation_id: int, stamp: Optional[str]) -> Optional[List[CachedMessage]]:
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None or entry[0] != stamp:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(conversation_id)
+            self._stats["hits"] += 1
+            return list(entry[1])
+
+    def set(self, conversation_id: int, stamp: Optional[str], messages: List[CachedMessage]) -> None:
+        messages = list(messages[-self._max_messages:])
+        with self._lock:
+            self._store(conversation_id, stamp, messages)
+
+    def append(
+        self, conversation_id: int, expected_stamp: Optional[str], stamp: Optional[str], message: CachedMessage
+    ) -> None:
+        """
+        Append a newly written message; only warm entries are extended.
+
+        The entry must still be cached under expected_stamp (the stamp this
+        write replaced); otherwise it misses writes from elsewhere and is dropped.
+        """
+        with self._lock:
+            entry = self._entries.get(conversation_id)
+            if entry is None:
+                return
+            messages = entry[1]
+            if entry[0] != expected_stamp or (messages and message["id"] <= messages[-1]["id"]):
+                # Out-of-order write from a concurrent request: let the next read reload.
+                self._drop(conversation_id)
+                self._stats["invalidations"] += 1
+                return
+            self._store(conversation_id, stamp, (messages + [message])[-self._max_messages:])
+
+    def invalidate(self, conversation_id: int) -> None:
+        with self._lock:
+            if conversation_id in self._entries:
+                self._drop(conversation_id)
+                self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "backend": "memory",
+                "conversations": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+    def _store(self, conversation_id: int, stamp: Optional[str], messages: List[CachedMessage]) -> None:
+        if conversation_id in self._entries:
+            self._drop(conversation_id)
+        size = sum(len(m.get("content") or "") + MESSAGE_OVERHEAD_BYTES for m in messages)
+        if size > self._max_bytes:
+            return
+        self._entries[conversation_id] = (stamp, messages, size)
+        self._bytes += size
+        while self._bytes > self._max_bytes or len(self._entries) > self._max_conversations:
+            evicted_id = next(iter(self._entries))
+            self._drop(evicted_id)
+            self._stats["evictions"] += 1
+
+    def _drop(self, conversation_id: int) -> None:
+        _, _, size = self._entries.pop(conversation_id)
+        self._bytes -= size
+
+
+# KEYS[1] = messages list, KEYS[2] = stamp
+# ARGV = message json, message id, new stamp, max messages, ttl seconds, expected stamp
+_REDIS_APPEND_SCRIPT = """
+local cached_stamp = redis.call('GET', KEYS[2])
+if not cached_stamp then
+  return 0
+end
+local last = redis.call('LINDEX', KEYS[1], -1)
+if cached_stamp ~= ARGV[6] or (last and cjson.decode(last)['id'] >= tonumber(ARGV[2])) then
+  redis.call('DEL', KEYS[1], KEYS[2])
+  return -1
+end
+redis.call('RPUSH', KEYS[1], ARGV[1])
+redis.call('LTRIM', KEYS[1], -tonumber(ARGV[4]), -1)
+redis.call('SET', KEYS[2], ARGV[3], 'EX', ARGV[5])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+
+class RedisHistoryCache:
+    """
+    Redis-backed history cache shared by all workers.
+
+    Redis errors are logged and treated as misses so chat never fails on
+    cache outages.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_messages: int,
+        ttl_seconds: int,
+        client: Any | None = None,
+        key_prefix: str = "chat:history",
+    ):
+        self._max_messages = max_messages
+        self._ttl_seconds = ttl_seconds
+        self._key_prefix = key_prefix
+        self.client = client or self._build_default_client(url)
+        self._append_script = self.client.register_script(_REDIS_APPEND_SCRIPT)
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0, "errors": 0}
+
+    def _build_default_client(self, url: str) -> Any:
+        # Lazy import keeps redis optional for single-worker deployments.
+        import redis
+
+        return redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+
+    def _keys(self, conversation_id: int) -> tuple[str, str]:
+        base = f"{self._key_prefix}:{conversation_id}"
+        return f"{base}:messages", f"{base}:stamp"
+
+    def get(self, conversation_id: int, stamp: Optional[str]) -> Optional[List[CachedMessage]]:
+        messages_key, stamp_key = self._keys(conversation_id)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.get(stamp_key)
+            pipe.lrange(messages_key, 0, -1)
+            cached_stamp, raw_messages = pipe.execute()
+        except Exception as exc:
+            self._record_error("get", exc)
+            return None
+        if cached_stamp is None or _decode(cached_stamp) != (stamp or ""):
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        return [json.loads(raw) for raw in raw_messages]
+
+    def set(self, conversation_id: int, stamp: Optional[str], messages: List[CachedMessage]) -> None:
+        messages_key, stamp_key = self._keys(conversation_id)
+        try:
+            pipe = self.client.pipeline(transaction=True)
+            pipe.delete(messages_key, stamp_key)
+            encoded = [json.dumps(m) for m in messages[-self._max_messages:]]
+            if encoded:
+                pipe.rpush(messages_key, *encoded)
+                pipe.expire(messages_key, self._ttl_seconds)
+            pipe.set(stamp_key, stamp or "", ex=self._ttl_seconds)
+            pipe.execute()
+        except Exception as exc:
+            self._record_error("set", exc)
+
+    def append(
+        self, conversation_id: int, expected_stamp: Optional[str], stamp: Optional[str], message: CachedMessage
+    ) -> None:
+        try:
+            result = self._append_script(
+                keys=list(self._keys(conversation_id)),
+                args=[
+                    json.dumps(message), message["id"], stamp or "",
+                    self._max_messages, self._ttl_seconds, expected_stamp or "",
+                ],
+            )
+            if result == -1:
+                self._stats["invalidations"] += 1
+        except Exception as exc:
+            self._record_error("append", exc)
+            self.invalidate(conversation_id)
+
+    def invalidate(self, conversation_id: int) -> None:
+        try:
+            self.client.delete(*self._keys(conversation_id))
+            self._stats["invalidations"] += 1
+        except Exception as exc:
+            self._record_error("invalidate", exc)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self.client.scan_iter(match=f"{self._key_prefix}:*"))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as exc:
+            self._record_error("clear", exc)
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "backend": "redis"}
+
+    def _record_error(self, operation: str, exc: Exception) -> None:
+        self._stats["errors"] += 1
+        logger.warning("History cache %s failed: %s", operation, exc)
+
+
+def _decode(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def build_history_cache() -> HistoryCache:
+    """Create the history cache backend selected by CHAT_HISTORY_CACHE_BACKEND."""
+    if settings.CHAT_HISTORY_CACHE_BACKEND == "redis":
+        return RedisHistoryCache(
+            url=settings.REDIS_URL,
+            max_messages=settings.CHAT_HISTORY_MAX_MESSAGES,
+            ttl_seconds=settings.CHAT_HISTORY_CACHE_TTL_SECONDS,
+        )
+    return InMemoryHistoryCache(
+        max_conversations=settings.CHAT_HISTORY_CACHE_MAX_CONVERSATIONS,
+        max_bytes=settings.CHAT_HISTORY_CACHE_MAX_BYTES,
+        max_messages=settings.CHAT_HISTORY_MAX_MESSAGES,
+    )
+
+
+history_cache: HistoryCache = build_history_cache()
+
+
+def record_message_write(
+    conversation: Conversation,
+    previous_updated_at: Optional[datetime],
+    *messages: ChatMessage,
+) -> None:
+    """
+    Append messages committed together to the cache under the conversation's new stamp.
+
+    Callers must have bumped `conversation.updated_at` in the same commit as
+    the messages so other readers see the stamp change. previous_updated_at
+    is the value that commit replaced, read inside the transaction (see
+    `locked_updated_at`); a cache entry under any other stamp is dropped.
+    """
+    expected = history_stamp(previous_updated_at)
+    stamp = history_stamp(conversation.updated_at)
+    for message in messages:
+        history_cache.append(conversation.id, expected, stamp, message_to_cache(message))
+        expected = stamp
+
+
+async def locked_updated_at(db: AsyncSession, conversation_id: int) -> Optional[datetime]:
+    """
+    Read a conversation's committed updated_at, row-locked until the transaction ends.
+
+    Call inside the unit of work that writes the messages, before bumping the
+    stamp, and pass the result to `record_message_write`.
+    """
+    return await db.scalar(
+        select(Conversation.updated_at).where(Conversation.id == conversation_id).with_for_update()
+    )
+
+
+def _affected_conversation_ids(objects: Iterable[Any]) -> set[int]:
+    ids = set()
+    for obj in objects:
+        if isinstance(obj, ChatMessage) and obj.conversation_id is not None:
+            ids.add(obj.conversation_id)
+        elif isinstance(obj, Conversation) and obj.id is not None:
+            ids.add(obj.id)
+    return ids
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_deleted_history(session: Session, flush_context: Any) -> None:
+    """Drop cached history for conversations whose messages were deleted via the ORM."""
+    for conversation_id in _affected_conversation_ids(session.deleted):
+        history_cache.invalidate(conversation_id)
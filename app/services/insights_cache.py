@@ -0,0 +1,269 @@
+"""
+Persisted weekly insights served by /api/insights/weekly.
+
+The full WeeklyInsightsResponse is stored as compact JSON on the user's
+`weekly_wellbeing_insights` row for that week, next to an activity stamp:
+the count and latest `created_at` of the week's journal entries,
+conversations and hearts transactions, read in one aggregate query over the
+(user_id, created_at) indexes.
+
+- Closed weeks (ended before today) are served straight from the row once
+  it was written or re-verified after the week ended; a snapshot built while
+  the week was open gets one more stamp check first.
+- The current week is served from the row while its stamp still matches;
+  once new events land the report is rebuilt and the row updated.
+
+The weekly job targets only `users_needing_insights` for a week and writes
+the same snapshot, so it also pre-warms the API.
+"""
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass
+from datetime import date
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import and_, case, func, literal, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+from app.models.user import Conversation, HeartsTransaction, JournalEntry, WeeklyWellbeingInsight
+from app.schemas.insights import WeeklyInsightsResponse
+from app.services.wellbeing import WellbeingAnalyzer, resolve_week, wellbeing_analyzer, week_datetime_range
+
+logger = logging.getLogger(__name__)
+
+# Text stored in the Lambda's summary_text column when the API builds the row
+DEFAULT_SUMMARY_TEXT = "Weekly wellbeing summary generated."
+
+
+# Activity that feeds the weekly report; the stamp is (count, latest created_at) per source
+STAMP_SOURCES = (JournalEntry, Conversation, HeartsTransaction)
+
+
+def _format_stamp(values: Sequence[Any]) -> str:
+    return "|".join("" if value is None else str(value) for value in values)
+
+
+def activity_stamp(db: Session, user_id: int, week_start: date) -> str:
+    """Fingerprint of the user's journal, conversation and hearts rows in the week."""
+    start, end = week_datetime_range(week_start)
+    parts = []
+    for model in STAMP_SOURCES:
+        in_week = (model.user_id == user_id, model.created_at >= start, model.created_at <= end)
+        parts.extend([
+            select(func.count()).select_from(model).where(*in_week).scalar_subquery(),
+            select(func.max(model.created_at)).where(*in_week).scalar_subquery(),
+        ])
+    return _format_stamp(db.execute(select(*parts)).one())
+
+
+def users_needing_insights(db: Session, week_start: date) -> tuple[list[int], int]:
+    """
+    Users with activity in the week whose snapshot is missing or out of date.
+
+    One query: the week's journal, conversation and hearts rows are
+    unioned, grouped per user into the same stamp `activity_stamp` builds, and
+    joined to the stored stamp on the user's insights row. Users without any
+    activity never appear, so the cost follows weekly active users.
+
+    Returns:
+        (user ids to process in id order, number of active users skipped as unchanged)
+    """
+    start, end = week_datetime_range(week_start)
+    events = union_all(*[
+        select(
+            model.user_id.label("user_id"),
+            literal(n).label("source"),
+            model.created_at.label("created_at"),
+        ).where(model.created_at >= start, model.created_at <= end, model.user_id.isnot(None))
+        for n, model in enumerate(STAMP_SOURCES)
+    ]).subquery()
+
+    aggregates = []
+    for n in range(len(STAMP_SOURCES)):
+        aggregates.extend([
+            func.count(case((events.c.source == n, 1))),
+            func.max(case((events.c.source == n, events.c.created_at))),
+        ])
+    stored = WeeklyWellbeingInsight.activity_stamp
+    rows = db.execute(
+        select(events.c.user_id, stored, *aggregates)
+        .outerjoin(
+            WeeklyWellbeingInsight,
+            and_(WeeklyWellbeingInsight.user_id == events.c.user_id, WeeklyWellbeingInsight.week_start == week_start),
+        )
+        .group_by(events.c.user_id, stored)
+        .order_by(events.c.user_id)
+    ).all()
+
+    active = sorted({row[0] for row in rows})
+    unchanged = {user_id for user_id, stored_stamp, *values in rows if stored_stamp == _format_stamp(values)}
+    return [user_id for user_id in active if user_id not in unchanged], len(unchanged)
+
+
+def get_cached_insight(db: Session, user_id: int, week_start: date) -> Optional[WeeklyWellbeingInsight]:
+    return db.scalars(
+        select(WeeklyWellbeingInsight)
+        .where(WeeklyWellbeingInsight.user_id == user_id, WeeklyWellbeingInsight.week_start == week_start)
+    ).first()
+
+
+@dataclass(frozen=True)
+class WeeklyInsightRecord:
+    """One user's weekly_wellbeing_insights row, as written by upsert_weekly_insights."""
+    user_id: int
+    week_start: date
+    week_end: date
+    summary_text: str
+    risk_tier: Optional[str] = None
+    insights_json: Optional[str] = None
+    activity_stamp: Optional[str] = None
+
+    @classmethod
+    def from_insights(cls, user_id: int, insights: WeeklyInsightsResponse, stamp: str) -> "WeeklyInsightRecord":
+        return cls(
+            user_id=user_id,
+            week_start=insights.week_starting,
+            week_end=insights.week_ending,
+            summary_text=insights.encouragement_message or DEFAULT_SUMMARY_TEXT,
+            risk_tier=insights.most_common_tier,
+            insights_json=insights.model_dump_json(exclude_none=True),
+            activity_stamp=stamp,
+        )
+
+
+# Dialects with INSERT ... ON CONFLICT; others use _upsert_row_by_row
+_ON_CONFLICT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def _upsert_row_by_row(db: Session, records: Sequence[WeeklyInsightRecord]) -> None:
+    """Portable SELECT then insert/update path, same semantics as the ON CONFLICT statement."""
+    for record in records:
+        row = get_cached_insight(db, record.user_id, record.week_start)
+        if row is None:
+            verified_at = func.now() if record.insights_json is not None else None
+            db.add(WeeklyWellbeingInsight(**asdict(record), snapshot_verified_at=verified_at))
+            continue
+        row.week_end = record.week_end
+        row.summary_text = record.summary_text
+        row.risk_tier = record.risk_tier
+        if record.activity_stamp is not None:
+            row.insights_json = record.insights_json
+            row.activity_stamp = record.activity_stamp
+        if record.insights_json is not None:
+            row.snapshot_verified_at = func.now()
+    db.flush()
+
+
+def upsert_weekly_insights(
+    db: Session,
+    records: Sequence[WeeklyInsightRecord],
+    *,
+    chunk_size: Optional[int] = None,
+) -> int:
+    """
+    Insert or update weekly insight rows, one multi-row statement per chunk.
+
+    Uses INSERT ... ON CONFLICT (user_id, week_start) DO UPDATE (PostgreSQL, or
+    SQLite's equivalent syntax); other dialects fall back to one SELECT and
+    insert/update per record. A record without insights_json/activity_stamp
+    (summary-only writers) keeps the snapshot already stored on the row, and
+    its snapshot_verified_at, so a later write cannot vouch for an old snapshot.
+    A record with a stamp but no insights_json (job summaries built without
+    the report) clears the stored report; the API rebuilds it on next read.
+    Not committed.
+
+    Returns:
+        Number of records written
+    """
+    if not records:
+        return 0
+    insert = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+    if insert is None:
+        _upsert_row_by_row(db, records)
+        return len(records)
+    chunk_size = chunk_size or settings.WEEKLY_INSIGHTS_UPSERT_BATCH_SIZE
+    table = WeeklyWellbeingInsight.__table__
+
+    for start in range(0, len(records), chunk_size):
+        stmt = insert(table).values([
+            {**asdict(record), "snapshot_verified_at": func.now() if record.insights_json is not None else None}
+            for record in records[start:start + chunk_size]
+        ])
+        excluded = stmt.excluded
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id, table.c.week_start],
+            set_={
+                "week_end": excluded.week_end,
+                "summary_text": excluded.summary_text,
+                "risk_tier": excluded.risk_tier,
+                # A new stamp replaces the report too (NULL if none was built), so
+                # an old report is never served under a newer stamp
+                "insights_json": case(
+                    (excluded.activity_stamp.isnot(None), excluded.insights_json),
+                    else_=table.c.insights_json,
+                ),
+                "activity_stamp": func.coalesce(excluded.activity_stamp, table.c.activity_stamp),
+                # Summary-only writes must not make an older snapshot look verified
+                "snapshot_verified_at": case(
+                    (excluded.insights_json.isnot(None), func.now()),
+                    else_=table.c.snapshot_verified_at,
+                ),
+                "updated_at": func.now(),
+            },
+        ))
+    return len(records)
+
+
+def get_weekly_insights(
+    db: Session,
+    user_id: int,
+    week_start: Optional[date] = None,
+    *,
+    today: Optional[date] = None,
+    trust_closed_weeks: bool = True,
+    analyzer: WellbeingAnalyzer = wellbeing_analyzer,
+) -> WeeklyInsightsResponse:
+    """
+    Weekly insights for a user, from the persisted snapshot when it is still valid.
+
+    Rebuilds (and commits) the snapshot when there is none, or when its
+    activity stamp has changed. Closed weeks skip the stamp check only once
+    the snapshot was built (or re-verified) after the week ended, going by
+    snapshot_verified_at rather than the general updated_at, so activity
+    from the rest of a week is never hidden by a mid-week snapshot. With
+    trust_closed_weeks=False closed weeks are always stamp-checked (batch jobs).
+    """
+    week_start, week_end = resolve_week(week_start)
+    row = get_cached_insight(db, user_id, week_start)
+    week_closed = week_end < (today or date.today())
+    built_after_close = (
+        row is not None
+        and row.snapshot_verified_at is not None
+        and row.snapshot_verified_at > week_datetime_range(week_start)[1]
+    )
+
+    if row is not None and row.insights_json and week_closed and trust_closed_weeks and built_after_close:
+        return WeeklyInsightsResponse.model_validate_json(row.insights_json)
+
+    stamp = activity_stamp(db, user_id, week_start)
+    if row is not None and row.insights_json and row.activity_stamp == stamp:
+        if week_closed and not built_after_close:
+            # Verified once after the week closed: from now on the row is trusted as is
+            db.execute(
+                update(WeeklyWellbeingInsight)
+                .where(WeeklyWellbeingInsight.id == row.id)
+                .values(snapshot_verified_at=func.now())
+            )
+            db.commit()
+        return WeeklyInsightsResponse.model_validate_json(row.insights_json)
+
+    insights = analyzer.generate_weekly_insights(db, user_id=user_id, week_start=week_start)
+    upsert_weekly_insights(db, [WeeklyInsightRecord.from_insights(user_id, insights, stamp)])
+    db.commit()
+    logger.info(f"Rebuilt weekly insights snapshot for user {user_id}, week {week_start}")
+    return insights
@@ -3,15 +3,29 @@ LangChain LLM Service for Gemini Integration
 Handles LLM initialization and configuration for the Meghan chatbot.
 """
 import logging
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional
+import httpx
 from langchain_google_genai import ChatGoogleGenerativeAI
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# Cache key for pooled clients: (model, temperature, top_p, max_output_tokens)
+ClientKey = tuple[str, float, float, int]
+
+
 class LLMService:
-    """Service for managing LangChain Gemini LLM instances."""
+    """
+    Service for managing LangChain Gemini LLM instances.
+
+    Clients are pooled per configuration and evicted least-recently-used, so
+    chat turns and safety checks reuse HTTP sessions instead of paying client
+    construction and TLS handshakes on every request.
+    """
     
     def __init__(self):
         """Initialize the LLM service with API key validation."""
@@ -21,7 +35,15 @@ class LLMService:
                 "GEMINI_API_KEY not set in environment variables. "
                 "LLM functionality will not work until API key is configured."
             )
-        self._llm_instance: Optional[ChatGoogleGenerativeAI] = None
+        self._clients: "OrderedDict[ClientKey, ChatGoogleGenerativeAI]" = OrderedDict()
+        self._clients_lock = threading.Lock()
+        self._pool_size = settings.LLM_CLIENT_POOL_SIZE
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "construct_seconds_total": 0.0,
+        }
     
     def get_llm(
         self,
@@ -33,6 +55,9 @@ class LLMService:
         """
         Get a configured ChatGoogleGenerativeAI instance.
         
+        Instances are cached per (model, temperature, top_p, max_output_tokens)
+        and shared between callers; they must not be mutated.
+        
         Args:
             model: Model name (default: from settings.GEMINI_MODEL)
             temperature: Sampling temperature (default: from settings.GEMINI_TEMPERATURE)
@@ -61,20 +86,69 @@ class LLMService:
         if max_output_tokens is None:
             max_output_tokens = settings.GEMINI_MAX_OUTPUT_TOKENS
         
-        # Create new instance with specified parameters
+        key: ClientKey = (model, temperature, top_p, max_output_tokens)
+        with self._clients_lock:
+            llm = self._clients.get(key)
+            if llm is not None:
+                self._clients.move_to_end(key)
+                self._stats["hits"] += 1
+                return llm
+            self._stats["misses"] += 1
+        
+        # Build outside the lock; a concurrent miss for the same key just
+        # keeps whichever instance is stored first.
         # Note: thinking_budget is a Gemini-specific parameter that may need
         # special handling depending on model version and LangChain support
         # For now, we rely on default model behavior
+        started = time.perf_counter()
         llm = ChatGoogleGenerativeAI(
             model=model,
             google_api_key=self.api_key,
             temperature=temperature,
             top_p=top_p,
             max_output_tokens=max_output_tokens,
+            client_args={
+                "limits": httpx.Limits(
+                    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            },
         )
+        elapsed = time.perf_counter() - started
+        
+        with self._clients_lock:
+            self._stats["construct_seconds_total"] += elapsed
+            existing = self._clients.get(key)
+            if existing is not None:
+                self._clients.move_to_end(key)
+                return existing
+            self._clients[key] = llm
+            while len(self._clients) > self._pool_size:
+                evicted_key, _ = self._clients.popitem(last=False)
+                self._stats["evictions"] += 1
+                logger.info("Evicted pooled LLM client %s", evicted_key)
         
+        logger.info("Created LLM client %s in %.1f ms", key, elapsed * 1000)
         return llm
     
+    def get_pool_stats(self) -> dict:
+        """
+        Snapshot of client pool counters.
+        
+        Returns:
+            dict with hits, misses, evictions, construct_seconds_total,
+            avg_construct_ms and current pool size
+        """
+        with self._clients_lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._clients)
+            stats["max_size"] = self._pool_size
+        misses = stats["misses"]
+        stats["avg_construct_ms"] = (
+            round(stats["construct_seconds_total"] / misses * 1000, 2) if misses else 0.0
+        )
+        return stats
+    
     def test_connection(self) -> dict:
         """
         Test the LLM connection by making a simple request.
@@ -0,0 +1,122 @@
+"""
+Word-level Aho-Corasick phrase matcher used by the safety gate.
+
+All lexicon phrases (across every risk level) are compiled into one automaton
+over word tokens, so a single left-to-right scan of a message returns every
+matching phrase. Scan cost is linear in message length and independent of
+lexicon size, which keeps the gate cheap as the lexicon grows.
+
+Matching is on whole words, with the same boundaries as the legacy `\\b`
+regexes: `\\bself harm\\b` matches "self harm", "self  harm" and
+"self-harm", but not "selfharm". Apostrophes are word boundaries too, so
+"'kill myself'" and "suicide's" still match, and "don't" is the token pair
+("don", "t").
+"""
+from __future__ import annotations
+
+import re
+from collections import deque
+from typing import Dict, List, Sequence
+
+# Words are runs of letters/digits; apostrophes split them like \b does
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Typographic apostrophes from mobile keyboards
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "ʼ": "'"})
+# Optional \b...\b wrapper used by the legacy regex lexicon
+_WORD_BOUNDARY_RE = re.compile(r"^\\b(.*)\\b$")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase text and split it into word tokens."""
+    return _TOKEN_RE.findall((text or "").lower().translate(_APOSTROPHES))
+
+
+def pattern_to_tokens(pattern: str) -> List[str]:
+    """
+    Convert a lexicon entry into the word tokens it matches.
+
+    Entries may be plain phrases ("no point") or word-bounded literals
+    (r"\\bno point\\b"). Anything else is rejected so the lexicon cannot
+    silently rely on regex features the automaton does not support.
+
+    Raises:
+        ValueError: If the entry is empty or uses other regex syntax
+    """
+    boundary_match = _WORD_BOUNDARY_RE.match(pattern)
+    phrase = boundary_match.group(1) if boundary_match else pattern
+    tokens = tokenize(phrase)
+    normalized = phrase.lower().translate(_APOSTROPHES).replace("'", " ")
+    if not tokens or " ".join(tokens) != " ".join(normalized.split()):
+        raise ValueError(f"Unsupported safety lexicon entry: {pattern!r}")
+    return tokens
+
+
+class PhraseMatcher:
+    """
+    Multi-label phrase index.
+
+    Built from `{label: [pattern, ...]}`; `match` returns
+    `{label: [pattern, ...]}` with matched patterns in lexicon order.
+    """
+
+    def __init__(self, lexicon: Dict[str, Sequence[str]]):
+        self._labels = list(lexicon)
+        # Per entry: (label, pattern), indexed by position in lexicon order
+        self._entries: List[tuple[str, str]] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+
+        for label, patterns in lexicon.items():
+            for pattern in patterns:
+                self._add(len(self._entries), pattern_to_tokens(pattern))
+                self._entries.append((label, pattern))
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _add(self, entry_index: int, tokens: List[str]) -> None:
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        self._outputs[state].append(entry_index)
+
+    def _build_failure_links(self) -> None:
+        # Depth-1 states fail to the root (already 0); deeper states are linked breadth-first
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                # Inherit matches ending at the failure state (shorter suffixes)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def match(self, text: str) -> Dict[str, List[str]]:
+        """Scan text once and return matched patterns grouped by label."""
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found: set[int] = set()
+        state = 0
+        for token in tokenize(text):
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+
+        result: Dict[str, List[str]] = {label: [] for label in self._labels}
+        for entry_index in sorted(found):
+            label, pattern = self._entries[entry_index]
+            result[label].append(pattern)
+        return result
@@ -142,6 +142,28 @@ Remember: You are here to support, not to diagnose or replace professional menta
     return system_instructions
 
 
+def generate_history_summary_instructions(max_words: int) -> str:
+    """
+    Generate system instructions for folding older turns into the rolling summary.
+    
+    Args:
+        max_words: Soft upper bound on summary length
+    
+    Returns:
+        System instructions string
+    """
+    return f"""You maintain a private running summary of a supportive conversation between a user and Meghan, a mental wellness companion.
+
+You will receive the current summary (possibly empty) followed by older messages that are leaving the recent context window. Rewrite the summary so it also covers those messages.
+
+Keep:
+- Stressors, feelings and goals the user has shared, and how they changed over time
+- Personal details the user offered that help continuity (people, plans, coping strategies that helped or did not)
+- Any mention of self-harm, crisis or safety concerns, stated plainly
+
+Write in third person, plain prose, at most {max_words} words. Output only the summary."""
+
+
 def create_chat_prompt_template() -> ChatPromptTemplate:
     """
     Create a LangChain ChatPromptTemplate for the chat interface.
@@ -1,9 +1,13 @@
-import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from langchain_core.messages import HumanMessage
 import logging
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.services.llm import llm_service
+from app.services.phrase_matcher import PhraseMatcher, tokenize
 
 # Global instance (initialized with LLM service)
 
@@ -18,15 +22,23 @@ class SafetyResult:
     llm_assessment: Optional[str] = None  # LLM's risk assessment if used
 
 
+@dataclass
+class KeywordScan:
+    """Lexicon matches from one scan of a message."""
+    high: List[str]
+    medium: List[str]
+
+
 
 class SafetyService:
     """
     Enhanced Safety Gate:
-    - Keyword/phrase based crisis detection (fast path)
-    - LLM-based risk assessment for nuanced detection (fallback)
+    - Keyword/phrase based crisis detection (fast path, one scan for all risk levels)
+    - LLM-based risk assessment for nuanced detection (fallback), with a hard
+      timeout and a TTL cache of verdicts keyed on normalized text
     - Returns SafetyResult
     """
-    
+
 
     # very small starter list (you can expand later)
     HIGH_RISK_PATTERNS = [
@@ -49,25 +61,107 @@ class SafetyService:
     def __init__(self,llm_service=None):
         """
         Initialize safety service.
-        
+
         Args:
             llm_service: Optional LLM service for enhanced risk assessment
         """
         self.llm_service=llm_service
+        self._matcher = PhraseMatcher({
+            "high": self.HIGH_RISK_PATTERNS,
+            "medium": self.MEDIUM_RISK_PATTERNS,
+        })
+        self._assessment_cache: TTLCache[dict] = TTLCache(
+            maxsize=settings.SAFETY_LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.SAFETY_LLM_CACHE_TTL_SECONDS,
+        )
+        # Only used by the sync path, to enforce the timeout on a blocking invoke
+        self._sync_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="safety-llm")
+
+    def scan(self, text: str) -> KeywordScan:
+        """Run the keyword fast path only."""
+        found = self._matcher.match(text)
+        return KeywordScan(high=found["high"], medium=found["medium"])
+
+    def needs_llm_assessment(self, scan: KeywordScan) -> bool:
+        """True when the verdict for this scan depends on an LLM assessment."""
+        return not scan.high and bool(scan.medium) and bool(self.llm_service)
 
     def assess_user_message(self, text: str) -> SafetyResult:
         """
         Assess user message for crisis indicators.
         Uses keyword matching first, then LLM if available and needed.
         """
-        normalized = (text or "").lower().strip()
-        matches = []
+        scan = self.scan(text)
+        if not self.needs_llm_assessment(scan):
+            return self._keyword_result(text, scan)
+
+        llm_assessment = self._cached_assessment(text)
+        if llm_assessment is None:
+            llm_assessment = self._run_sync_assessment(text)
+            self._remember_assessment(text, llm_assessment)
+        return self._llm_result(text, scan, llm_assessment)
+
+    def assess_many(self, texts: Sequence[str]) -> List[SafetyResult]:
+        """
+        Keyword-only assessment of many texts in one pass (bulk moderation).
+
+        Identical texts are scanned once. The LLM fallback is not used, so the
+        verdicts match assess_user_message without an LLM service configured.
+
+        Args:
+            texts: Texts to assess
+
+        Returns:
+            One SafetyResult per input text, in input order
+        """
+        by_text: dict[str, SafetyResult] = {}
+        results = []
+        for text in texts:
+            result = by_text.get(text)
+            if result is None:
+                result = by_text[text] = self._keyword_result(text, self.scan(text))
+            results.append(result)
+        return results
 
-        for pat in self.HIGH_RISK_PATTERNS:
-            if re.search(pat, normalized):
-                matches.append(pat)
+    async def aassess_user_message(self, text: str, scan: Optional[KeywordScan] = None) -> SafetyResult:
+        """
+        Async variant of assess_user_message.
+
+        The LLM assessment uses `ainvoke`, is bounded by
+        SAFETY_LLM_TIMEOUT_SECONDS and never blocks the event loop.
+
+        Args:
+            text: User message
+            scan: Keyword scan already computed by the caller, if any
+        """
+        scan = scan or self.scan(text)
+        if not self.needs_llm_assessment(scan):
+            return self._keyword_result(text, scan)
+
+        llm_assessment = self._cached_assessment(text)
+        if llm_assessment is None:
+            try:
+                llm_assessment = await asyncio.wait_for(
+                    self._aassess_with_llm(text),
+                    timeout=settings.SAFETY_LLM_TIMEOUT_SECONDS,
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"LLM assessment timed out after {settings.SAFETY_LLM_TIMEOUT_SECONDS}s"
+                )
+                llm_assessment = None
+            except Exception as e:
+                logger.error(f"LLM assessment failed: {e}")
+                llm_assessment = None
+            self._remember_assessment(text, llm_assessment)
+        return self._llm_result(text, scan, llm_assessment)
 
-        if matches:
+    def clear_assessment_cache(self) -> None:
+        """Forget all memoized LLM verdicts (e.g. after a prompt change)."""
+        self._assessment_cache.clear()
+
+    def _keyword_result(self, text: str, scan: KeywordScan) -> SafetyResult:
+        if scan.high:
             # Block normal flow, return safe crisis response
             safe_reply = (
                 "I’m really sorry you’re feeling this way. You don’t have to go through this alone.\n\n"
@@ -79,31 +173,10 @@ class SafetyService:
             return SafetyResult(
                 allowed=False,
                 risk_level="high",
-                matched_phrases=matches,
+                matched_phrases=scan.high,
                 user_message=text,
                 safe_reply=safe_reply,
             )
-        
-        # check for medium-risk patterns
-        medium_matches=[]
-        for pat in self.MEDIUM_RISK_PATTERNS:
-            if re.search(pat,normalized):
-                medium_matches.append(pat)
-        
-        if medium_matches and self.llm_service:
-            try:
-                llm_assessment = self._assess_with_llm(text)
-                if llm_assessment and llm_assessment.get("risk_level") in ["medium", "high"]:
-                    return SafetyResult(
-                        allowed=False,
-                        risk_level=llm_assessment["risk_level"],
-                        matched_phrases=medium_matches,
-                        user_message=text,
-                        safe_reply=llm_assessment.get("safe_reply", self._get_default_safe_reply()),
-                        llm_assessment=llm_assessment.get("reasoning"),
-                    )
-            except Exception as e:
-                logger.error(f"LLM assessment failed: {e}")
 
         return SafetyResult(
             allowed=True,
@@ -111,17 +184,75 @@ class SafetyService:
             matched_phrases=[],
             user_message=text,
         )
+
+    def _llm_result(self, text: str, scan: KeywordScan, llm_assessment: Optional[dict]) -> SafetyResult:
+        if llm_assessment and llm_assessment.get("risk_level") in ["medium", "high"]:
+            return SafetyResult(
+                allowed=False,
+                risk_level=llm_assessment["risk_level"],
+                matched_phrases=scan.medium,
+                user_message=text,
+                safe_reply=llm_assessment.get("safe_reply", self._get_default_safe_reply()),
+                llm_assessment=llm_assessment.get("reasoning"),
+            )
+        return self._keyword_result(text, scan)
+
+    def _cache_key(self, text: str) -> str:
+        return " ".join(tokenize(text))
+
+    def _cached_assessment(self, text: str) -> Optional[dict]:
+        return self._assessment_cache.get(self._cache_key(text))
+
+    def _remember_assessment(self, text: str, llm_assessment: Optional[dict]) -> None:
+        # Failures and timeouts are not cached so the next message retries the model
+        if llm_assessment is not None:
+            self._assessment_cache.set(self._cache_key(text), llm_assessment)
+
+    def _run_sync_assessment(self, text: str) -> Optional[dict]:
+        try:
+            future = self._sync_executor.submit(self._assess_with_llm, text)
+            return future.result(timeout=settings.SAFETY_LLM_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            logger.warning(
+                f"LLM assessment timed out after {settings.SAFETY_LLM_TIMEOUT_SECONDS}s"
+            )
+        except Exception as e:
+            logger.error(f"LLM assessment failed: {e}")
+        return None
+
     def _assess_with_llm(self, text: str) -> Optional[dict]:
         """
         Use LLM to assess risk level with nuanced understanding.
-        
+
         Returns:
             dict with 'risk_level', 'safe_reply', 'reasoning' or None if LLM unavailable
         """
         if not self.llm_service:
             return None
         try:
-            prompt = f"""Analyse the following message for mental health. 
+            llm = self.llm_service.get_llm(temperature=0.1)
+            response = llm.invoke([HumanMessage(content=self._build_assessment_prompt(text))])
+            return self._parse_assessment(response)
+
+        except Exception as e:
+            logger.error(f"LLM risk assessment failed: {e}")
+            return None
+
+    async def _aassess_with_llm(self, text: str) -> Optional[dict]:
+        """Async counterpart of _assess_with_llm backed by `ainvoke`."""
+        if not self.llm_service:
+            return None
+        try:
+            llm = self.llm_service.get_llm(temperature=0.1)
+            response = await llm.ainvoke([HumanMessage(content=self._build_assessment_prompt(text))])
+            return self._parse_assessment(response)
+
+        except Exception as e:
+            logger.error(f"LLM risk assessment failed: {e}")
+            return None
+
+    def _build_assessment_prompt(self, text: str) -> str:
+        return f"""Analyse the following message for mental health.
             Message: "{text}"
 
             Assess the risk level:
@@ -135,32 +266,27 @@ class SafetyService:
                 "reasoning": "brief explanation",
                 "safe_reply": "supportive, non-clinical response to offer help"
             }}"""
-            llm = self.llm_service.get_llm(temperature=0.1)
-            response = llm.invoke([HumanMessage(content=prompt)])
-
-            # Parse LLM response (simplified - in production, use structured output)
-            # For now, return structured response
-            content = response.content if hasattr(response, 'content') else str(response)
-            # Simple parsing (in production, use JSON mode or structured output)
-            if "high" in content.lower():
-                return {
-                    "risk_level": "high",
-                    "reasoning": content,
-                    "safe_reply": self._get_default_safe_reply()
-                }
-            elif "medium" in content.lower():
-                return {
-                    "risk_level": "medium",
-                    "reasoning": content,
-                    "safe_reply": "I'm concerned about how you're feeling. Would you like to talk about what's going on?"
-                }
-            
-            return {"risk_level": "low", "reasoning": content}
-            
-        except Exception as e:
-            logger.error(f"LLM risk assessment failed: {e}")
-            return None
-        
+
+    def _parse_assessment(self, response) -> dict:
+        # Parse LLM response (simplified - in production, use structured output)
+        # For now, return structured response
+        content = response.content if hasattr(response, 'content') else str(response)
+        # Simple parsing (in production, use JSON mode or structured output)
+        if "high" in content.lower():
+            return {
+                "risk_level": "high",
+                "reasoning": content,
+                "safe_reply": self._get_default_safe_reply()
+            }
+        elif "medium" in content.lower():
+            return {
+                "risk_level": "medium",
+                "reasoning": content,
+                "safe_reply": "I'm concerned about how you're feeling. Would you like to talk about what's going on?"
+            }
+
+        return {"risk_level": "low", "reasoning": content}
+
     def _get_default_safe_reply(self) -> str:
         """Get default safe reply for crisis situations."""
         return (
@@ -170,11 +296,11 @@ class SafetyService:
             "You can find resources at /api/crisis/resources"
         )
 
-            
+
 
 
 
 
 
 logger = logging.getLogger(__name__)
-safety_service = SafetyService(llm_service=llm_service)
\ No newline at end of file
+safety_service = SafetyService(llm_service=llm_service)
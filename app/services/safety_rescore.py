@@ -0,0 +1,245 @@
+"""
+Bulk re-scoring of historical user content against the current safety lexicon.
+
+Rows are streamed from the database in keyset-paginated chunks, classified
+with `SafetyService.assess_many`, and flagged rows are written as
+`CrisisEvent`s with one bulk INSERT per chunk. Events that already exist for
+the same user, source and excerpt are not duplicated, so re-running a
+backfill is safe.
+
+CLI:
+    python -m app.services.safety_rescore --sources chat journal --chunk-size 2000 --dry-run
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from sqlalchemy import insert, null
+from sqlalchemy.orm import Query, Session
+
+from app.models.user import (
+    ChatMessage,
+    CommunityMessage,
+    Conversation,
+    CrisisEvent,
+    JournalEntry,
+    MicroExpression,
+)
+from app.services.safety import SafetyService, safety_service
+
+logger = logging.getLogger(__name__)
+
+# Same excerpt length as the live safety gate in the routers
+EXCERPT_LENGTH = 300
+DEFAULT_CHUNK_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class RescoreSource:
+    """A table of user-authored text and how to map it onto CrisisEvent."""
+    name: str
+    event_source: str  # CrisisEvent.source value
+    id_column: Any
+    build_query: Callable[[Session], Query]
+
+
+RESCORE_SOURCES: dict[str, RescoreSource] = {
+    "chat": RescoreSource(
+        name="chat",
+        event_source="chat",
+        id_column=ChatMessage.id,
+        build_query=lambda db: db.query(
+            ChatMessage.id, Conversation.user_id, ChatMessage.content, null().label("community_id"),
+        ).join(Conversation, Conversation.id == ChatMessage.conversation_id).filter(
+            ChatMessage.role == "user",
+        ),
+    ),
+    "journal": RescoreSource(
+        name="journal",
+        event_source="journal",
+        id_column=JournalEntry.id,
+        build_query=lambda db: db.query(
+            JournalEntry.id, JournalEntry.user_id, JournalEntry.content, null().label("community_id"),
+        ),
+    ),
+    "expression": RescoreSource(
+        name="expression",
+        event_source="community",
+        id_column=MicroExpression.id,
+        build_query=lambda db: db.query(
+            MicroExpression.id, MicroExpression.user_id, MicroExpression.content,
+            MicroExpression.community_id,
+        ),
+    ),
+    "community": RescoreSource(
+        name="community",
+        event_source="community",
+        id_column=CommunityMessage.id,
+        build_query=lambda db: db.query(
+            CommunityMessage.id, CommunityMessage.user_id, CommunityMessage.content,
+            CommunityMessage.community_id,
+        ),
+    ),
+}
+
+
+@dataclass
+class SourceReport:
+    scanned: int = 0
+    flagged: int = 0
+    events_created: int = 0
+    skipped_existing: int = 0
+    chunks: int = 0
+
+
+@dataclass
+class RescoreReport:
+    dry_run: bool
+    sources: dict[str, SourceReport] = field(default_factory=dict)
+    rows_scanned: int = 0
+    events_created: int = 0
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def iter_chunks(db: Session, source: RescoreSource, chunk_size: int) -> Iterator[list]:
+    """Yield rows (id, user_id, content, community_id) in id order, chunk_size at a time."""
+    last_id = 0
+    while True:
+        rows = (
+            source.build_query(db)
+            .filter(source.id_column > last_id)
+            .order_by(source.id_column.asc())
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def _existing_event_keys(db: Session, event_source: str, user_ids: set[int]) -> set[tuple[int, str]]:
+    rows = db.query(CrisisEvent.user_id, CrisisEvent.message_excerpt).filter(
+        CrisisEvent.source == event_source,
+        CrisisEvent.user_id.in_(user_ids),
+    ).all()
+    return {(row.user_id, row.message_excerpt) for row in rows}
+
+
+def rescore_crisis_events(
+    db: Session,
+    *,
+    sources: Optional[Sequence[str]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dry_run: bool = False,
+    safety: SafetyService = safety_service,
+) -> RescoreReport:
+    """
+    Re-score stored user content and bulk-insert CrisisEvents for flagged rows.
+
+    Args:
+        db: Database session (committed once per chunk unless dry_run)
+        sources: Keys of RESCORE_SOURCES to scan (default: all)
+        chunk_size: Rows fetched and classified per round trip
+        dry_run: Count what would be flagged without writing events
+        safety: SafetyService whose lexicon is applied
+
+    Returns:
+        RescoreReport with per-source counters and overall rows/sec
+
+    Raises:
+        ValueError: If an unknown source is requested
+    """
+    selected = list(sources or RESCORE_SOURCES)
+    unknown = [name for name in selected if name not in RESCORE_SOURCES]
+    if unknown:
+        raise ValueError(f"Unknown rescore sources: {unknown}")
+
+    report = RescoreReport(dry_run=dry_run)
+    started = time.perf_counter()
+
+    for name in selected:
+        source = RESCORE_SOURCES[name]
+        source_report = report.sources[name] = SourceReport()
+
+        for rows in iter_chunks(db, source, chunk_size):
+            results = safety.assess_many([row[2] or "" for row in rows])
+            flagged = [(row, result) for row, result in zip(rows, results) if not result.allowed]
+            source_report.chunks += 1
+            source_report.scanned += len(rows)
+            source_report.flagged += len(flagged)
+            if not flagged:
+                continue
+
+            existing = _existing_event_keys(db, source.event_source, {row[1] for row, _ in flagged})
+            new_events = []
+            for (row_id, user_id, content, community_id), result in flagged:
+                key = (user_id, (content or "")[:EXCERPT_LENGTH])
+                if key in existing:
+                    source_report.skipped_existing += 1
+                    continue
+                existing.add(key)
+                new_events.append({
+                    "user_id": user_id,
+                    "source": source.event_source,
+                    "community_id": community_id,
+                    "message_excerpt": key[1],
+                    "risk_level": result.risk_level,
+                    "matched_phrases": json.dumps(result.matched_phrases),
+                })
+
+            if new_events and not dry_run:
+                db.execute(insert(CrisisEvent), new_events)
+                db.commit()
+            source_report.events_created += len(new_events)
+
+        report.rows_scanned += source_report.scanned
+        report.events_created += source_report.events_created
+        logger.info("Rescored %s: %s", name, source_report)
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    report.rows_per_second = (
+        round(report.rows_scanned / report.elapsed_seconds, 1) if report.elapsed_seconds else 0.0
+    )
+    logger.info(
+        "Crisis rescore finished: %s rows in %.2fs (%.1f rows/sec), %s events%s",
+        report.rows_scanned,
+        report.elapsed_seconds,
+        report.rows_per_second,
+        report.events_created,
+        " (dry run)" if dry_run else "",
+    )
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    from app.core.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Re-score stored content against the safety lexicon.")
+    parser.add_argument("--sources", nargs="*", choices=sorted(RESCORE_SOURCES), default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        report = rescore_crisis_events(
+            db, sources=args.sources, chunk_size=args.chunk_size, dry_run=args.dry_run,
+        )
+    finally:
+        db.close()
+    print(json.dumps(report.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,18 +2,25 @@
 Wellbeing Analyzer Service
 
 Generates weekly insights by analyzing user activity data.
+
+All data for a week is collected up front in a fixed number of queries
+(`_collect_week_activity`): one round trip of COUNT/SUM aggregates, one
+GROUP BY over conversation sources, and one UNION of the mood/tier data
+points. The sub-analyses then work from that shared `WeekActivity`, so the
+query count does not grow with the amount of activity or the number of
+sections in the report.
 """
 import logging
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, date
 from typing import List, Dict, Optional, Any
+from sqlalchemy import case, func, literal, null, select, union_all
 from sqlalchemy.orm import Session
 from collections import Counter
 from app.models.user import (
-    UserState,
     JournalEntry,
     Conversation,
     HeartsTransaction,
-    User,
 )
 from app.schemas.insights import (
     WeeklyInsightsResponse,
@@ -25,6 +32,42 @@ from app.schemas.insights import (
 
 logger = logging.getLogger(__name__)
 
+# Conversation tiers ranked so MAX() over a group yields the most severe one
+TIER_RANK = {"Green": 1, "Yellow": 2, "Red": 3}
+SEVERITY_BY_RANK = {3: "high", 2: "medium"}
+
+
+@dataclass(frozen=True)
+class SourceStats:
+    """Conversations in the week for one stress source."""
+    source: str
+    frequency: int
+    max_tier_rank: int
+
+
+@dataclass
+class WeekActivity:
+    """Everything the weekly report needs, collected in one pass."""
+    journal_count: int = 0
+    chat_count: int = 0
+    hearts_earned: int = 0
+    source_stats: List[SourceStats] = field(default_factory=list)
+    mood_points: List[MoodTrend] = field(default_factory=list)
+
+
+def resolve_week(week_start: Optional[date] = None) -> tuple[date, date]:
+    """Return (week_start, week_end) for a week, defaulting to the one containing today."""
+    if week_start is None:
+        today = date.today()
+        week_start = today - timedelta(days=today.weekday())
+    return week_start, week_start + timedelta(days=6)
+
+
+def week_datetime_range(week_start: date) -> tuple[datetime, datetime]:
+    """Inclusive datetime bounds covering the seven days from week_start."""
+    week_end = week_start + timedelta(days=6)
+    return datetime.combine(week_start, datetime.min.time()), datetime.combine(week_end, datetime.max.time())
+
 
 class WellbeingAnalyzer:
     """
@@ -57,22 +100,16 @@ class WellbeingAnalyzer:
         Returns:
             WeeklyInsightsResponse with insights
         """
-        # Calculate week range (default to most recent Monday)
-        if week_start is None:
-            today = date.today()
-            days_since_monday = today.weekday()
-            week_start = today - timedelta(days=days_since_monday)
-        
-        week_end = week_start + timedelta(days=6)
-        week_start_dt = datetime.combine(week_start, datetime.min.time())
-        week_end_dt = datetime.combine(week_end, datetime.max.time())
+        week_start, week_end = resolve_week(week_start)
+        week_start_dt, week_end_dt = week_datetime_range(week_start)
         
         logger.info(f"Generating weekly insights for user {user_id}, week {week_start} to {week_end}")
         
-        # Aggregate data from various sources
-        mood_trends = self._analyze_mood_trends(db, user_id, week_start_dt, week_end_dt)
-        trigger_patterns = self._identify_trigger_patterns(db, user_id, week_start_dt, week_end_dt)
-        progress_indicators = self._calculate_progress(db, user_id, week_start_dt, week_end_dt)
+        activity = self._collect_week_activity(db, user_id, week_start_dt, week_end_dt)
+        
+        mood_trends = activity.mood_points
+        trigger_patterns = self._identify_trigger_patterns(activity)
+        progress_indicators = self._calculate_progress(activity)
         recommendations = self._generate_recommendations(
             db, user_id, mood_trends, trigger_patterns, progress_indicators
         )
@@ -80,13 +117,6 @@ class WellbeingAnalyzer:
             mood_trends, trigger_patterns, progress_indicators
         )
         
-        # Summary statistics
-        total_journal = self._count_journal_entries(db, user_id, week_start_dt, week_end_dt)
-        total_chat = self._count_chat_sessions(db, user_id, week_start_dt, week_end_dt)
-        hearts_earned = self._calculate_hearts_earned(db, user_id, week_start_dt, week_end_dt)
-        most_common_mood = self._get_most_common_mood(mood_trends)
-        most_common_tier = self._get_most_common_tier(mood_trends)
-        
         return WeeklyInsightsResponse(
             week_starting=week_start,
             week_ending=week_end,
@@ -95,113 +125,104 @@ class WellbeingAnalyzer:
             positive_progress=progress_indicators,
             recommendations=recommendations,
             encouragement_message=encouragement_message,
-            total_journal_entries=total_journal,
-            total_chat_sessions=total_chat,
-            hearts_earned=hearts_earned,
-            most_common_mood=most_common_mood,
-            most_common_tier=most_common_tier,
+            total_journal_entries=activity.journal_count,
+            total_chat_sessions=activity.chat_count,
+            hearts_earned=activity.hearts_earned,
+            most_common_mood=self._get_most_common_mood(mood_trends),
+            most_common_tier=self._get_most_common_tier(mood_trends),
         )
     
-    def _analyze_mood_trends(
+    def _collect_week_activity(
         self,
         db: Session,
         user_id: int,
         week_start: datetime,
         week_end: datetime
-    ) -> List[MoodTrend]:
-        """Analyze mood trends from journal entries and conversations."""
-        trends = []
-        
-        # Get journal entries with mood/tier data
-        journal_entries = (
-            db.query(JournalEntry)
-            .filter(
-                JournalEntry.user_id == user_id,
-                JournalEntry.created_at >= week_start,
-                JournalEntry.created_at <= week_end,
-                JournalEntry.mood_at_time.isnot(None)
-            )
-            .order_by(JournalEntry.created_at.asc())
-            .all()
+    ) -> WeekActivity:
+        """Load the week's counts, source breakdown and mood data points in three queries."""
+        journal_in_week = (
+            JournalEntry.user_id == user_id,
+            JournalEntry.created_at >= week_start,
+            JournalEntry.created_at <= week_end,
+        )
+        conversations_in_week = (
+            Conversation.user_id == user_id,
+            Conversation.created_at >= week_start,
+            Conversation.created_at <= week_end,
         )
         
-        for entry in journal_entries:
-            trends.append(MoodTrend(
-                date=entry.created_at.date(),
-                mood=entry.mood_at_time,
-                tier=entry.tier_at_time,
-                source=None
-            ))
-        
-        # Get conversations with mood/tier data
-        conversations = (
-            db.query(Conversation)
-            .filter(
-                Conversation.user_id == user_id,
-                Conversation.created_at >= week_start,
-                Conversation.created_at <= week_end
+        # 1. Scalar aggregates in a single round trip
+        totals = db.execute(select(
+            select(func.count()).select_from(JournalEntry).where(*journal_in_week)
+            .scalar_subquery().label("journal_count"),
+            select(func.count()).select_from(Conversation).where(*conversations_in_week)
+            .scalar_subquery().label("chat_count"),
+            select(func.coalesce(func.sum(HeartsTransaction.amount), 0)).where(
+                HeartsTransaction.user_id == user_id,
+                HeartsTransaction.created_at >= week_start,
+                HeartsTransaction.created_at <= week_end,
+                HeartsTransaction.amount > 0,  # Only count earnings
+            ).scalar_subquery().label("hearts_earned"),
+        )).one()
+        
+        # 2. Conversations per stress source, with the most severe tier seen
+        frequency = func.count().label("frequency")
+        source_rows = db.execute(
+            select(
+                Conversation.source,
+                frequency,
+                func.max(case(TIER_RANK, value=Conversation.tier, else_=0)).label("max_tier_rank"),
             )
-            .order_by(Conversation.created_at.asc())
-            .all()
+            .where(*conversations_in_week, Conversation.source.isnot(None))
+            .group_by(Conversation.source)
+            .order_by(frequency.desc(), func.min(Conversation.created_at).asc())
+        ).all()
+        
+        # 3. Mood/tier data points from journal entries and conversations
+        points = union_all(
+            select(
+                literal(0).label("kind"),
+                JournalEntry.created_at,
+                JournalEntry.mood_at_time.label("mood"),
+                JournalEntry.tier_at_time.label("tier"),
+                null().label("source"),
+            ).where(*journal_in_week, JournalEntry.mood_at_time.isnot(None)),
+            select(
+                literal(1).label("kind"),
+                Conversation.created_at,
+                Conversation.mood,
+                Conversation.tier,
+                Conversation.source,
+            ).where(*conversations_in_week),
+        ).subquery()
+        point_rows = db.execute(
+            select(points).order_by(points.c.created_at.asc())
+        ).all()
+        # Same day: journal entries before conversations, each in time order
+        point_rows.sort(key=lambda row: (row.created_at.date(), row.kind))
+        
+        return WeekActivity(
+            journal_count=totals.journal_count,
+            chat_count=totals.chat_count,
+            hearts_earned=totals.hearts_earned,
+            source_stats=[
+                SourceStats(source=row.source, frequency=row.frequency, max_tier_rank=row.max_tier_rank)
+                for row in source_rows
+            ],
+            mood_points=[
+                MoodTrend(date=row.created_at.date(), mood=row.mood, tier=row.tier, source=row.source)
+                for row in point_rows
+            ],
         )
-        
-        for conv in conversations:
-            trends.append(MoodTrend(
-                date=conv.created_at.date(),
-                mood=conv.mood,
-                tier=conv.tier,
-                source=conv.source
-            ))
-        
-        # Sort by date
-        trends.sort(key=lambda x: x.date)
-        
-        return trends
     
-    def _identify_trigger_patterns(
-        self,
-        db: Session,
-        user_id: int,
-        week_start: datetime,
-        week_end: datetime
-    ) -> List[TriggerPattern]:
-        """Identify stress trigger patterns from conversations and journal entries."""
+    def _identify_trigger_patterns(self, activity: WeekActivity) -> List[TriggerPattern]:
+        """Identify stress trigger patterns from the week's conversation sources."""
         triggers = []
         
-        # Get stress sources from conversations
-        conversations = (
-            db.query(Conversation)
-            .filter(
-                Conversation.user_id == user_id,
-                Conversation.created_at >= week_start,
-                Conversation.created_at <= week_end,
-                Conversation.source.isnot(None)
-            )
-            .all()
-        )
-        
-        # Count trigger frequencies
-        trigger_counts = Counter()
-        trigger_tiers = {}  # Track tier associated with each trigger
-        
-        for conv in conversations:
-            trigger = conv.source
-            trigger_counts[trigger] += 1
-            # Track highest tier for this trigger
-            if trigger not in trigger_tiers:
-                trigger_tiers[trigger] = []
-            trigger_tiers[trigger].append(conv.tier)
-        
-        # Build trigger patterns
-        for trigger, frequency in trigger_counts.most_common():
-            # Determine severity based on associated tiers
-            tiers = trigger_tiers[trigger]
-            if "Red" in tiers:
-                severity = "high"
-            elif "Yellow" in tiers:
-                severity = "medium"
-            else:
-                severity = "low"
+        for stats in activity.source_stats:
+            # Determine severity based on the most severe associated tier
+            severity = SEVERITY_BY_RANK.get(stats.max_tier_rank, "low")
+            frequency = stats.frequency
             
             # Generate description
             description = f"Appeared {frequency} time{'s' if frequency > 1 else ''} this week"
@@ -211,7 +232,7 @@ class WellbeingAnalyzer:
                 description += " with moderate concern levels"
             
             triggers.append(TriggerPattern(
-                trigger=trigger,
+                trigger=stats.source,
                 frequency=frequency,
                 severity=severity,
                 description=description
@@ -219,18 +240,12 @@ class WellbeingAnalyzer:
         
         return triggers
     
-    def _calculate_progress(
-        self,
-        db: Session,
-        user_id: int,
-        week_start: datetime,
-        week_end: datetime
-    ) -> List[ProgressIndicator]:
+    def _calculate_progress(self, activity: WeekActivity) -> List[ProgressIndicator]:
         """Calculate progress indicators for the week."""
         indicators = []
         
         # Journal entries progress
-        journal_count = self._count_journal_entries(db, user_id, week_start, week_end)
+        journal_count = activity.journal_count
         if journal_count > 0:
             indicators.append(ProgressIndicator(
                 category="journaling",
@@ -240,7 +255,7 @@ class WellbeingAnalyzer:
             ))
         
         # Chat sessions progress
-        chat_count = self._count_chat_sessions(db, user_id, week_start, week_end)
+        chat_count = activity.chat_count
         if chat_count > 0:
             indicators.append(ProgressIndicator(
                 category="chat_sessions",
@@ -250,7 +265,7 @@ class WellbeingAnalyzer:
             ))
         
         # Hearts earned progress
-        hearts = self._calculate_hearts_earned(db, user_id, week_start, week_end)
+        hearts = activity.hearts_earned
         if hearts > 0:
             indicators.append(ProgressIndicator(
                 category="hearts_earned",
@@ -332,63 +347,6 @@ class WellbeingAnalyzer:
         else:
             return "This week has been part of your journey. Remember that seeking support and reflecting on your experiences are signs of strength."
     
-    def _count_journal_entries(
-        self,
-        db: Session,
-        user_id: int,
-        week_start: datetime,
-        week_end: datetime
-    ) -> int:
-        """Count journal entries in the week."""
-        return (
-            db.query(JournalEntry)
-            .filter(
-                JournalEntry.user_id == user_id,
-                JournalEntry.created_at >= week_start,
-                JournalEntry.created_at <= week_end
-            )
-            .count()
-        )
-    
-    def _count_chat_sessions(
-        self,
-        db: Session,
-        user_id: int,
-        week_start: datetime,
-        week_end: datetime
-    ) -> int:
-        """Count chat sessions in the week."""
-        return (
-            db.query(Conversation)
-            .filter(
-                Conversation.user_id == user_id,
-                Conversation.created_at >= week_start,
-                Conversation.created_at <= week_end
-            )
-            .count()
-        )
-    
-    def _calculate_hearts_earned(
-        self,
-        db: Session,
-        user_id: int,
-        week_start: datetime,
-        week_end: datetime
-    ) -> int:
-        """Calculate hearts earned in the week."""
-        transactions = (
-            db.query(HeartsTransaction)
-            .filter(
-                HeartsTransaction.user_id == user_id,
-                HeartsTransaction.created_at >= week_start,
-                HeartsTransaction.created_at <= week_end,
-                HeartsTransaction.amount > 0  # Only count earnings
-            )
-            .all()
-        )
-        
-        return sum(tx.amount for tx in transactions)
-    
     def _get_most_common_mood(self, mood_trends: List[MoodTrend]) -> Optional[str]:
         """Get most common mood from trends."""
         if not mood_trends:
@@ -0,0 +1,189 @@
+"""
+XP awards applied as atomic SQL increments.
+
+Every award is a single `UPDATE user_states SET xp = xp + :n, level = ...
+RETURNING xp, level`, so concurrent requests for the same user never lose
+updates and no prior SELECT is needed. Awards run inside the caller's
+transaction; the caller commits.
+
+High-frequency sources (chat messages) can go through `xp_accumulator`
+instead: when XP_FLUSH_INTERVAL_SECONDS > 0, amounts are summed in process
+and written as one increment per user on each flush.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.user import UserState
+
+logger = logging.getLogger(__name__)
+
+XP_PER_LEVEL = 200
+
+
+@dataclass(frozen=True)
+class XPTotals:
+    xp: int
+    level: int
+
+
+def calculate_level(xp: int) -> int:
+    """
+    Calculate user level from XP.
+    Formula: floor(xp / 200) + 1
+    """
+    return math.floor(xp / XP_PER_LEVEL) + 1
+
+
+def award_xp(db: Session, user_id: int, amount: int) -> XPTotals:
+    """
+    Atomically add XP to a user and recompute their level.
+
+    Creates a default UserState if the user has none yet. The change is not
+    committed here.
+
+    Args:
+        db: Database session
+        user_id: User ID
+        amount: XP amount to add
+
+    Returns:
+        XPTotals with the new XP and level
+    """
+    new_xp = func.coalesce(UserState.xp, 0) + amount
+    row = db.execute(
+        update(UserState)
+        .where(UserState.user_id == user_id)
+        .values(xp=new_xp, level=new_xp // XP_PER_LEVEL + 1)
+        .returning(UserState.xp, UserState.level)
+    ).first()
+    if row is not None:
+        return XPTotals(xp=row.xp, level=row.level)
+
+    user_state = UserState(
+        user_id=user_id,
+        mood="Grounded",
+        risk_tier="Green",
+        xp=amount,
+        level=calculate_level(amount),
+        steps=0,
+        sleep_hours=0,
+        pomo_sessions=0,
+    )
+    db.add(user_state)
+    db.flush()
+    return XPTotals(xp=user_state.xp, level=user_state.level)
+
+
+class XPAccumulator:
+    """
+    In-process buffer that coalesces many small awards into one increment per user.
+
+    Pending XP is lost if the process dies between flushes, so only use it for
+    sources where that is acceptable (per-message XP), and keep the interval short.
+    """
+
+    def __init__(self, flush_interval_seconds: float, session_factory: Optional[Callable[[], Session]] = None):
+        self.flush_interval_seconds = flush_interval_seconds
+        self._session_factory = session_factory
+        self._pending: Dict[int, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stats = {"awards_buffered": 0, "flushes": 0, "rows_written": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.flush_interval_seconds > 0
+
+    def add(self, user_id: int, amount: int) -> None:
+        with self._lock:
+            self._pending[user_id] += amount
+            self._stats["awards_buffered"] += 1
+
+    def pending(self, user_id: int) -> int:
+        """XP buffered for a user and not yet written."""
+        with self._lock:
+            return self._pending.get(user_id, 0)
+
+    def flush(self, db: Optional[Session] = None) -> int:
+        """
+        Write all pending XP, one increment per user, in one transaction.
+
+        On failure the drained amounts are put back so the next flush retries.
+
+        Returns:
+            Number of users updated
+        """
+        with self._lock:
+            batch, self._pending = dict(self._pending), defaultdict(int)
+        if not batch:
+            return 0
+
+        owns_session = db is None
+        if owns_session:
+            db = self._new_session()
+        try:
+            for user_id, amount in batch.items():
+                award_xp(db, user_id, amount)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                for user_id, amount in batch.items():
+                    self._pending[user_id] += amount
+            raise
+        finally:
+            if owns_session:
+                db.close()
+
+        with self._lock:
+            self._stats["flushes"] += 1
+            self._stats["rows_written"] += len(batch)
+        return len(batch)
+
+    async def run(self) -> None:
+        """Flush periodically until cancelled, then flush what is left."""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval_seconds)
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception as e:
+                    logger.error(f"XP flush failed: {e}")
+        finally:
+            await asyncio.to_thread(self.flush)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "pending_users": len(self._pending)}
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from app.core.database import SessionLocal
+            return SessionLocal()
+        return self._session_factory()
+
+
+xp_accumulator = XPAccumulator(flush_interval_seconds=settings.XP_FLUSH_INTERVAL_SECONDS)
+
+
+def award_xp_buffered(db: Session, user_id: int, amount: int) -> Optional[XPTotals]:
+    """
+    Award XP from a high-frequency source.
+
+    Buffers the amount when the accumulator is enabled (returns None), and
+    otherwise applies it immediately like `award_xp`.
+    """
+    if xp_accumulator.enabled:
+        xp_accumulator.add(user_id, amount)
+        return None
+    return award_xp(db, user_id, amount)
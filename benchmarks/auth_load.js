@@ -1,7 +1,11 @@
 /**
- * Benchmark: POST /api/auth/login-json
+ * Benchmark: POST /api/auth/login-json, plus an authenticated GET /api/journal/prompts
  * KPI target (Section 5): P95 < 700 ms, error rate < 1%
  *
+ * The authenticated request measures token → principal resolution. Teardown
+ * prints the principal cache stats from /debug/auth-cache: every cache hit is
+ * a request that did not query the users table.
+ *
  * Run:
  *   k6 run benchmarks/auth_load.js
  *   BASE_URL=http://your-ec2:8000 LOAD_PROFILE=peak k6 run benchmarks/auth_load.js
@@ -9,7 +13,7 @@
 import http from 'k6/http';
 import { check, sleep } from 'k6';
 import { BASE_URL, TEST_EMAIL, TEST_PASSWORD, KPI, ACTIVE_STAGES } from './config.js';
-import { registerBenchmarkUser } from './helpers.js';
+import { registerBenchmarkUser, loginBenchmarkUser, authGetHeaders } from './helpers.js';
 
 export const options = {
   stages: ACTIVE_STAGES,
@@ -18,6 +22,8 @@ export const options = {
     'http_req_duration{name:auth}': [`p(95)<${KPI.auth.p95_ms}`],
     // KPI: error rate < 1%
     'http_req_failed{name:auth}': [`rate<${KPI.errorRate}`],
+    'http_req_duration{name:auth_request}': [`p(95)<${KPI.authRequest.p95_ms}`],
+    'http_req_failed{name:auth_request}':   [`rate<${KPI.errorRate}`],
   },
   summaryTrendStats: ['avg', 'min', 'med', 'max', 'p(50)', 'p(95)', 'p(99)'],
 };
@@ -27,9 +33,10 @@ export function setup() {
   // Ensure benchmark user exists
   registerBenchmarkUser();
   console.log(`[setup] Benchmark user ready: ${TEST_EMAIL}`);
+  return { token: loginBenchmarkUser() };
 }
 
-export default function () {
+export default function (data) {
   const payload = JSON.stringify({
     email:    TEST_EMAIL,
     password: TEST_PASSWORD,
@@ -46,5 +53,29 @@ export default function () {
     'POST /api/auth/login-json → p95 <700ms': (r) => r.timings.duration < 700,
   });
 
+  const authed = http.get(`${BASE_URL}/api/journal/prompts`, {
+    headers: authGetHeaders(data.token),
+    tags:    { name: 'auth_request' },
+  });
+
+  check(authed, {
+    'GET /api/journal/prompts → 200': (r) => r.status === 200,
+  });
+
   sleep(1);
 }
+
+export function teardown() {
+  const res = http.get(`${BASE_URL}/debug/auth-cache`);
+  if (res.status !== 200) {
+    console.log(`[teardown] /debug/auth-cache unavailable: HTTP ${res.status}`);
+    return;
+  }
+  const stats = res.json();
+  const lookups = stats.hits + stats.misses;
+  const hitRate = lookups ? ((stats.hits / lookups) * 100).toFixed(1) : '0.0';
+  console.log(
+    `[teardown] principal cache: ${stats.hits} hits / ${stats.misses} misses ` +
+    `(${hitRate}% of authenticated requests skipped the users lookup)`
+  );
+}
@@ -0,0 +1,90 @@
+/**
+ * Benchmark: POST /api/chat/conversations/{id}/messages/stream
+ * KPI target: time-to-first-token P95 < 1500 ms, full stream P95 < 3500 ms, error rate < 1%
+ *
+ * k6 buffers the whole SSE body, so time-to-first-token is read from the
+ * server-measured `ttft_ms` field of the final `done` event and recorded as the
+ * custom `chat_stream_ttft` trend, next to the `chat_load.js` latency KPI.
+ *
+ * Run:
+ *   k6 run benchmarks/chat_stream_load.js
+ *   BASE_URL=http://your-ec2:8000 LOAD_PROFILE=smoke k6 run benchmarks/chat_stream_load.js
+ */
+import http from 'k6/http';
+import { check, sleep } from 'k6';
+import { Trend } from 'k6/metrics';
+import { BASE_URL, KPI, ACTIVE_STAGES } from './config.js';
+import { setupBenchmark, authHeaders } from './helpers.js';
+
+const ttft = new Trend('chat_stream_ttft', true);
+
+export const options = {
+  stages: ACTIVE_STAGES,
+  thresholds: {
+    // KPI: time-to-first-token P95 < 1500 ms
+    'chat_stream_ttft': [`p(95)<${KPI.chatStream.ttft_p95_ms}`],
+    // KPI: full stream P95 < 3500 ms
+    'http_req_duration{name:chat_stream}': [`p(95)<${KPI.chatStream.p95_ms}`],
+    // KPI: error rate < 1%
+    'http_req_failed{name:chat_stream}': [`rate<${KPI.errorRate}`],
+  },
+  summaryTrendStats: ['avg', 'min', 'med', 'max', 'p(50)', 'p(95)', 'p(99)'],
+};
+
+const TEST_MESSAGES = [
+  'I have been feeling overwhelmed with my studies lately.',
+  'I am struggling to find balance between work and personal life.',
+  'I had a difficult conversation with my roommate today.',
+  'I feel like I am not making enough progress on my goals.',
+  'I am anxious about an upcoming presentation at university.',
+];
+
+/**
+ * Return the parsed data of the final `done` SSE event, or null.
+ */
+function parseDoneEvent(body) {
+  const frames = (body || '').trim().split('\n\n');
+  for (let i = frames.length - 1; i >= 0; i--) {
+    const lines = frames[i].split('\n');
+    if (lines[0] === 'event: done' && lines[1] && lines[1].startsWith('data: ')) {
+      try { return JSON.parse(lines[1].slice(6)); } catch { return null; }
+    }
+  }
+  return null;
+}
+
+export function setup() {
+  return setupBenchmark();
+}
+
+export default function (data) {
+  const { token, conversationId } = data;
+
+  const msgIndex = (__ITER % TEST_MESSAGES.length);
+  const payload = JSON.stringify({
+    role:    'user',
+    content: TEST_MESSAGES[msgIndex],
+  });
+
+  const res = http.post(
+    `${BASE_URL}/api/chat/conversations/${conversationId}/messages/stream`,
+    payload,
+    {
+      headers: authHeaders(token),
+      tags:    { name: 'chat_stream' },
+      timeout: '15s',
+    }
+  );
+
+  const done = parseDoneEvent(res.body);
+  if (done && done.ttft_ms !== null && done.ttft_ms !== undefined) {
+    ttft.add(done.ttft_ms);
+  }
+
+  check(res, {
+    'POST .../messages/stream → 200':        (r) => r.status === 200,
+    'POST .../messages/stream → done event': () => done !== null && done.message !== undefined,
+  });
+
+  sleep(2);
+}
@@ -16,9 +16,12 @@ export const TEST_PASSWORD = __ENV.TEST_PASSWORD || 'BenchTest99!';
 export const KPI = {
   health:   { p95_ms: 150  },
   auth:     { p95_ms: 700  },
+  authRequest: { p95_ms: 200 },  // trivial authenticated read (token → principal resolution)
   chat:     { p95_ms: 3500 },
+  chatStream: { ttft_p95_ms: 1500, p95_ms: 3500 },  // time-to-first-token for the SSE variant
   voice:    { p95_ms: 7000 },
   history:  { p95_ms: 1000 },   // not explicitly in report; conservative
+  historyPage: { p95_ms: 300 }, // one keyset page; deep pages should match the first page
   insights: { p95_ms: 2000 },   // read endpoint; conservative
   errorRate: 0.01,              // < 1 %
 };
@@ -2,26 +2,95 @@
  * Benchmark: GET /api/chat/conversations/{id}/messages
  * KPI target (Section 5): P95 < 1000 ms (read path; conservative), error rate < 1%
  *
+ * Besides the full-history read, each iteration walks the conversation
+ * backwards with keyset cursors (?limit=&before=) and records first-page and
+ * deep-page latency separately. With the (conversation_id, created_at, id)
+ * index both should stay flat regardless of depth.
+ *
+ * Setup seeds HISTORY_SEED_TURNS chat turns (each is one LLM call), or reuses
+ * an existing conversation via HISTORY_CONVERSATION_ID.
+ *
  * Run:
  *   k6 run benchmarks/history_load.js
  *   BASE_URL=http://your-ec2:8000 LOAD_PROFILE=peak k6 run benchmarks/history_load.js
+ *   HISTORY_CONVERSATION_ID=42 HISTORY_PAGE_SIZE=20 k6 run benchmarks/history_load.js
  */
 import http from 'k6/http';
 import { check, sleep } from 'k6';
+import { Trend } from 'k6/metrics';
 import { BASE_URL, KPI, ACTIVE_STAGES } from './config.js';
-import { setupBenchmark, authGetHeaders } from './helpers.js';
+import {
+  authGetHeaders,
+  authHeaders,
+  createBenchmarkConversation,
+  loginBenchmarkUser,
+  registerBenchmarkUser,
+} from './helpers.js';
+
+const PAGE_SIZE  = parseInt(__ENV.HISTORY_PAGE_SIZE  || '10', 10);
+const SEED_TURNS = parseInt(__ENV.HISTORY_SEED_TURNS || '30', 10);
+// Pages walked per iteration; pages past the first count as "deep"
+const MAX_PAGES  = parseInt(__ENV.HISTORY_MAX_PAGES  || '6', 10);
+
+const firstPageDuration = new Trend('history_first_page_duration', true);
+const deepPageDuration  = new Trend('history_deep_page_duration', true);
 
 export const options = {
   stages: ACTIVE_STAGES,
   thresholds: {
-    'http_req_duration{name:chat_history}': [`p(95)<${KPI.history.p95_ms}`],
-    'http_req_failed{name:chat_history}':   [`rate<${KPI.errorRate}`],
+    'http_req_duration{name:chat_history}':      [`p(95)<${KPI.history.p95_ms}`],
+    'http_req_failed{name:chat_history}':        [`rate<${KPI.errorRate}`],
+    'http_req_failed{name:chat_history_page}':   [`rate<${KPI.errorRate}`],
+    history_first_page_duration:                 [`p(95)<${KPI.historyPage.p95_ms}`],
+    history_deep_page_duration:                  [`p(95)<${KPI.historyPage.p95_ms}`],
   },
   summaryTrendStats: ['avg', 'min', 'med', 'max', 'p(50)', 'p(95)', 'p(99)'],
 };
 
 export function setup() {
-  return setupBenchmark();
+  registerBenchmarkUser();
+  const token = loginBenchmarkUser();
+
+  if (__ENV.HISTORY_CONVERSATION_ID) {
+    return { token, conversationId: __ENV.HISTORY_CONVERSATION_ID };
+  }
+
+  const conversationId = createBenchmarkConversation(token);
+  for (let i = 0; i < SEED_TURNS; i++) {
+    http.post(
+      `${BASE_URL}/api/chat/conversations/${conversationId}/messages`,
+      JSON.stringify({ role: 'user', content: `History benchmark message ${i}` }),
+      { headers: authHeaders(token), timeout: '30s' }
+    );
+  }
+  console.log(`[setup] Seeded ${SEED_TURNS} turns — conversationId=${conversationId}`);
+  return { token, conversationId };
+}
+
+function walkPages(token, conversationId) {
+  let before = null;
+  for (let depth = 0; depth < MAX_PAGES; depth++) {
+    const cursor = before ? `&before=${before}` : '';
+    const res = http.get(
+      `${BASE_URL}/api/chat/conversations/${conversationId}/messages?limit=${PAGE_SIZE}${cursor}`,
+      {
+        headers: authGetHeaders(token),
+        tags:    { name: 'chat_history_page', depth: depth === 0 ? 'first' : 'deep' },
+      }
+    );
+
+    const ok = check(res, {
+      'GET .../messages?limit → 200':       (r) => r.status === 200,
+      'GET .../messages?limit → page size': (r) => {
+        try { return r.json('messages').length <= PAGE_SIZE; } catch { return false; }
+      },
+    });
+    if (!ok) return;
+
+    (depth === 0 ? firstPageDuration : deepPageDuration).add(res.timings.duration);
+    if (!res.json('has_more')) return;
+    before = res.json('before_cursor');
+  }
 }
 
 export default function (data) {
@@ -43,5 +112,7 @@ export default function (data) {
     'GET .../messages → p95 <1000ms':  (r) => r.timings.duration < 1000,
   });
 
+  walkPages(token, conversationId);
+
   sleep(0.5);
 }
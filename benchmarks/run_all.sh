@@ -93,6 +93,7 @@ run_benchmark() {
 run_benchmark "$SCRIPTS_DIR/health_load.js"   "01_health"
 run_benchmark "$SCRIPTS_DIR/auth_load.js"     "02_auth"
 run_benchmark "$SCRIPTS_DIR/chat_load.js"     "03_chat_messages"
+run_benchmark "$SCRIPTS_DIR/chat_stream_load.js" "03b_chat_stream"
 run_benchmark "$SCRIPTS_DIR/history_load.js"  "04_chat_history"
 run_benchmark "$SCRIPTS_DIR/insights_load.js" "05_insights_weekly"
 
@@ -113,4 +114,5 @@ echo "  values in each *_summary.json file:"
 echo "    http_req_duration → avg, p(95), p(99)"
 echo "    http_reqs         → count / test duration = RPS"
 echo "    http_req_failed   → rate (multiply by 100 for %)"
+echo "    chat_stream_ttft  → p(95) time-to-first-token (03b_chat_stream)"
 echo "============================================================"
@@ -0,0 +1,114 @@
+"""
+Micro-benchmark for the safety gate phrase matcher.
+
+Measures scan time per character across message lengths and lexicon sizes,
+and compares against the previous approach (one `re.search` per pattern).
+For a linear-time matcher, ns/char stays flat as messages grow and does not
+depend on lexicon size.
+
+Usage:
+    python benchmarks/safety_matcher_bench.py
+    python benchmarks/safety_matcher_bench.py --check   # exit 1 if scaling is not linear
+
+Requirements: run from the repository root (imports app.services.phrase_matcher).
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.phrase_matcher import PhraseMatcher  # noqa: E402
+from app.services.safety import SafetyService  # noqa: E402
+
+MESSAGE_LENGTHS = [256, 1024, 4096, 16384, 65536]
+LEXICON_SIZES = [len(SafetyService.HIGH_RISK_PATTERNS) + len(SafetyService.MEDIUM_RISK_PATTERNS), 1000, 5000]
+# Allowed growth of ns/char between the shortest and longest message
+LINEARITY_TOLERANCE = 2.0
+
+random.seed(42)
+VOCAB = [
+    "i", "feel", "today", "class", "tired", "friends", "really", "want", "to", "sleep",
+    "exam", "stressed", "point", "myself", "life", "home", "work", "hope", "talk", "maybe",
+]
+
+
+def synthetic_lexicon(size: int) -> dict:
+    """Base lexicon padded with random 2-4 word phrases."""
+    high = list(SafetyService.HIGH_RISK_PATTERNS)
+    medium = list(SafetyService.MEDIUM_RISK_PATTERNS)
+    while len(high) + len(medium) < size:
+        words = random.sample(VOCAB, random.randint(2, 4)) + [f"w{len(medium)}"]
+        medium.append(r"\b" + " ".join(words) + r"\b")
+    return {"high": high, "medium": medium}
+
+
+def synthetic_message(length: int) -> str:
+    words = []
+    total = 0
+    while total < length:
+        word = random.choice(VOCAB)
+        words.append(word)
+        total += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def time_per_char(func, text: str, min_seconds: float = 0.2) -> float:
+    """Return ns per character for func(text), repeating until min_seconds elapsed."""
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        func(text)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / runs / len(text) * 1e9
+
+
+def legacy_scan(lexicon: dict):
+    patterns = [p for level in lexicon.values() for p in level]
+
+    def scan(text: str):
+        normalized = text.lower().strip()
+        return [p for p in patterns if re.search(p, normalized)]
+
+    return scan
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--check", action="store_true", help="fail if ns/char grows non-linearly")
+    parser.add_argument("--skip-legacy", action="store_true", help="only time the compiled matcher")
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'lexicon':>8} {'chars':>7} {'matcher ns/char':>16} {'legacy ns/char':>15}")
+    for size in LEXICON_SIZES:
+        lexicon = synthetic_lexicon(size)
+        matcher = PhraseMatcher(lexicon)
+        legacy = legacy_scan(lexicon)
+        per_char = []
+        for length in MESSAGE_LENGTHS:
+            text = synthetic_message(length)
+            matcher_ns = time_per_char(matcher.match, text)
+            per_char.append(matcher_ns)
+            legacy_ns = "-" if args.skip_legacy or size > 1000 else f"{time_per_char(legacy, text):.1f}"
+            print(f"{size:>8} {length:>7} {matcher_ns:>16.1f} {legacy_ns:>15}")
+
+        growth = per_char[-1] / per_char[0]
+        print(f"{'':>8} ns/char growth {MESSAGE_LENGTHS[0]}->{MESSAGE_LENGTHS[-1]} chars: {growth:.2f}x")
+        if growth > LINEARITY_TOLERANCE:
+            ok = False
+
+    if args.check and not ok:
+        print(f"FAIL: per-character cost grew more than {LINEARITY_TOLERANCE}x")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
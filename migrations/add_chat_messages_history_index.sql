@@ -0,0 +1,13 @@
+-- Composite index for keyset-paginated chat history.
+-- GET /api/chat/conversations/{id}/messages?limit=&before=&after= seeks on
+-- (conversation_id, created_at, id), so every page is a single index range
+-- scan no matter how deep into the conversation it is.
+--
+-- SQLite:
+--   sqlite3 meghan.db < migrations/add_chat_messages_history_index.sql
+--
+-- PostgreSQL (use CONCURRENTLY on a live database, outside a transaction):
+--   psql "$DATABASE_URL" -f migrations/add_chat_messages_history_index.sql
+
+CREATE INDEX IF NOT EXISTS ix_chat_messages_conversation_created_id
+ON chat_messages (conversation_id, created_at, id);
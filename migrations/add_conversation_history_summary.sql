@@ -0,0 +1,15 @@
+-- Add rolling history summary to conversations.
+-- Older turns are folded into history_summary so chat prompts stay bounded;
+-- summary_through_message_id marks the last chat_messages.id already folded.
+--
+-- SQLite:
+--   sqlite3 meghan.db < migrations/add_conversation_history_summary.sql
+--
+-- PostgreSQL:
+--   psql "$DATABASE_URL" -f migrations/add_conversation_history_summary.sql
+
+ALTER TABLE conversations
+ADD COLUMN history_summary TEXT;
+
+ALTER TABLE conversations
+ADD COLUMN summary_through_message_id INTEGER;
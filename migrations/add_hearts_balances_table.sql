@@ -0,0 +1,30 @@
+-- Per-user hearts summary row, updated in the same transaction as every
+-- hearts_transactions append, so GET /api/hearts/balance is a primary-key read.
+-- The INSERT backfills existing users from the ledger; verify afterwards with
+--   python -m app.services.hearts_reconcile         (report drift)
+--   python -m app.services.hearts_reconcile --fix   (repair drift)
+--
+-- SQLite:
+--   sqlite3 meghan.db < migrations/add_hearts_balances_table.sql
+--
+-- PostgreSQL:
+--   psql "$DATABASE_URL" -f migrations/add_hearts_balances_table.sql
+
+CREATE TABLE IF NOT EXISTS hearts_balances (
+    user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    balance INTEGER NOT NULL DEFAULT 0,
+    total_earned INTEGER NOT NULL DEFAULT 0,
+    total_redeemed INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO hearts_balances (user_id, balance, total_earned, total_redeemed)
+SELECT
+    user_id,
+    SUM(amount),
+    SUM(CASE WHEN amount > 0 THEN amount ELSE 0 END),
+    SUM(CASE WHEN amount < 0 THEN -amount ELSE 0 END)
+FROM hearts_transactions
+WHERE user_id IS NOT NULL
+GROUP BY user_id
+ON CONFLICT (user_id) DO NOTHING;
@@ -0,0 +1,27 @@
+-- Composite indexes for per-user time-range scans.
+-- Weekly insights, journal listing, the hearts ledger, the conversation list
+-- and crisis lookups all filter on user_id plus a created_at range/order.
+-- Before this only standalone created_at indexes existed, so these queries
+-- scanned every user's rows.
+--
+-- chat_messages is covered by ix_chat_messages_conversation_created_id
+-- (conversation_id, created_at, id) from add_chat_messages_history_index.sql,
+-- which also serves (conversation_id, created_at) lookups.
+--
+-- SQLite:
+--   sqlite3 meghan.db < migrations/add_user_created_at_indexes.sql
+--
+-- PostgreSQL (use CREATE INDEX CONCURRENTLY on a live database, one statement at a time):
+--   psql "$DATABASE_URL" -f migrations/add_user_created_at_indexes.sql
+
+CREATE INDEX IF NOT EXISTS ix_conversations_user_created
+ON conversations (user_id, created_at);
+
+CREATE INDEX IF NOT EXISTS ix_journal_entries_user_created
+ON journal_entries (user_id, created_at);
+
+CREATE INDEX IF NOT EXISTS ix_hearts_transactions_user_created
+ON hearts_transactions (user_id, created_at);
+
+CREATE INDEX IF NOT EXISTS ix_crisis_events_user_created
+ON crisis_events (user_id, created_at);
@@ -0,0 +1,16 @@
+-- Record which users failed inside a checkpointed weekly insights chunk.
+-- A resumed run skips finished chunks except for these users, and the job
+-- clears a week's checkpoints once a run has covered every target, so later
+-- runs are not filtered by ranges from an earlier one.
+--
+-- SQLite:
+--   sqlite3 meghan.db < migrations/add_weekly_insights_job_chunks_failed_ids.sql
+--
+-- PostgreSQL:
+--   psql "$DATABASE_URL" -f migrations/add_weekly_insights_job_chunks_failed_ids.sql
+
+ALTER TABLE weekly_insights_job_chunks
+ADD COLUMN failed_user_ids TEXT;
+
+-- Checkpoints left by earlier completed runs would hide users from new runs
+DELETE FROM weekly_insights_job_chunks;
@@ -0,0 +1,22 @@
+-- Checkpoints for the weekly insights job.
+-- Each finished chunk of user ids is recorded per week_start, so a run that
+-- hits the Lambda timeout can be re-invoked and skip the chunks already done.
+--
+-- SQLite:
+--   sqlite3 meghan.db < migrations/add_weekly_insights_job_chunks_table.sql
+--
+-- PostgreSQL:
+--   psql "$DATABASE_URL" -f migrations/add_weekly_insights_job_chunks_table.sql
+
+CREATE TABLE IF NOT EXISTS weekly_insights_job_chunks (
+    id SERIAL PRIMARY KEY,
+    week_start DATE NOT NULL,
+    first_user_id INTEGER NOT NULL,
+    last_user_id INTEGER NOT NULL,
+    processed_users INTEGER NOT NULL DEFAULT 0,
+    failed_users INTEGER NOT NULL DEFAULT 0,
+    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_weekly_insights_job_chunks_week_start
+    ON weekly_insights_job_chunks(week_start);
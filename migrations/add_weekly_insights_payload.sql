@@ -0,0 +1,19 @@
+-- Persist the full weekly insights payload next to the Lambda's summary.
+-- insights_json holds WeeklyInsightsResponse as compact JSON; activity_stamp
+-- fingerprints the week's journal/conversation/hearts rows so the API only
+-- rebuilds the current week after new activity. Closed weeks are served as is.
+--
+-- SQLite:
+--   sqlite3 meghan.db < migrations/add_weekly_insights_payload.sql
+--
+-- PostgreSQL:
+--   psql "$DATABASE_URL" -f migrations/add_weekly_insights_payload.sql
+
+ALTER TABLE weekly_wellbeing_insights
+ADD COLUMN insights_json TEXT;
+
+ALTER TABLE weekly_wellbeing_insights
+ADD COLUMN activity_stamp VARCHAR;
+
+ALTER TABLE weekly_wellbeing_insights
+ADD COLUMN updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,14 @@
+-- Track when a weekly insights snapshot was built or last re-verified.
+-- Closed weeks are served without an activity check only when this is after
+-- the week ended; updated_at also moves on summary-only writes, so it cannot
+-- tell a mid-week snapshot from one built after the week closed. Existing
+-- rows stay NULL and get one activity check on their next read.
+--
+-- SQLite:
+--   sqlite3 meghan.db < migrations/add_weekly_insights_snapshot_verified_at.sql
+--
+-- PostgreSQL:
+--   psql "$DATABASE_URL" -f migrations/add_weekly_insights_snapshot_verified_at.sql
+
+ALTER TABLE weekly_wellbeing_insights
+ADD COLUMN snapshot_verified_at TIMESTAMP;
@@ -0,0 +1,19 @@
+-- One weekly_wellbeing_insights row per (user_id, week_start).
+-- The weekly job and /api/insights/weekly write with
+-- INSERT ... ON CONFLICT (user_id, week_start) DO UPDATE, which needs this
+-- unique index as its conflict target. Older per-row writes could leave
+-- duplicates, so keep only the newest row for each user and week first.
+--
+-- SQLite:
+--   sqlite3 meghan.db < migrations/add_weekly_insights_unique_user_week.sql
+--
+-- PostgreSQL:
+--   psql "$DATABASE_URL" -f migrations/add_weekly_insights_unique_user_week.sql
+
+DELETE FROM weekly_wellbeing_insights
+WHERE id NOT IN (
+    SELECT MAX(id) FROM weekly_wellbeing_insights GROUP BY user_id, week_start
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_weekly_wellbeing_insights_user_week
+ON weekly_wellbeing_insights (user_id, week_start);
@@ -1,35 +1,62 @@
 """
 Pytest configuration and fixtures for testing.
 """
+import os
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.core.database import get_db
+from app.core.database import get_async_db, get_db
 from app.models.user import Base
 from app.models.user import User
 from app.core.security import get_password_hash
+from app.core.principal import principal_cache
+from app.services.history_cache import history_cache
+from app.services.safety import safety_service
 
-# Use in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# File-backed SQLite so the sync test session and the async (aiosqlite) app
+# sessions see the same database
+_db_dir = tempfile.mkdtemp(prefix="meghan-tests-")
+SQLALCHEMY_DATABASE_PATH = os.path.join(_db_dir, "test.db")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{SQLALCHEMY_DATABASE_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={
         "check_same_thread": False,
+        "timeout": 30,
     },
-    poolclass=StaticPool,
+)
+# TestClient runs each request on its own event loop, so async connections are not pooled
+async_engine = create_async_engine(
+    f"sqlite+aiosqlite:///{SQLALCHEMY_DATABASE_PATH}",
+    connect_args={"timeout": 30},
+    poolclass=NullPool,
 )
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@event.listens_for(engine, "connect")
+def _enable_wal(dbapi_connection, connection_record):
+    # Readers in the test session must not block app writes (and vice versa)
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
 
 
 @pytest.fixture(scope="function")
 def db_session():
     """Create a fresh database for each test."""
     Base.metadata.create_all(bind=engine)
+    # IDs restart with every fresh database, so per-process caches must not leak across tests
+    history_cache.clear()
+    principal_cache.clear()
+    safety_service.clear_assessment_cache()
     db = TestingSessionLocal()
     try:
         yield db
@@ -38,6 +65,12 @@ def db_session():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def app_engine():
+    """Sync view of the engine behind the app's async sessions (for statement/commit listeners)."""
+    return async_engine.sync_engine
+
+
 @pytest.fixture(scope="function")
 def client(db_session):
     """Create a test client with database override."""
@@ -47,7 +80,12 @@ def client(db_session):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
     yield TestClient(app)
     app.dependency_overrides.clear()
 
@@ -0,0 +1,83 @@
+"""
+Tests for the cached authenticated principal used by get_current_user.
+"""
+import time
+
+from fastapi import status
+from sqlalchemy import event
+
+from app.core.principal import AuthenticatedPrincipal, principal_cache, remember_principal
+from app.core.security import create_access_token, decode_access_token
+
+
+def _user_selects(app_engine, request):
+    """Run request() and return the SELECTs it issued against the users table."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        normalized = " ".join(statement.split()).upper()
+        if normalized.startswith("SELECT") and "FROM USERS" in normalized:
+            statements.append(statement)
+
+    event.listen(app_engine, "before_cursor_execute", record)
+    try:
+        response = request()
+    finally:
+        event.remove(app_engine, "before_cursor_execute", record)
+    return response, statements
+
+
+class TestPrincipalCache:
+    def test_token_carries_uid_and_role(self, auth_token, test_user):
+        payload = decode_access_token(auth_token)
+        assert payload["sub"] == "test@example.com"
+        assert payload["uid"] == test_user.id
+        assert payload["role"] == "user"
+
+    def test_repeat_requests_skip_users_lookup(self, client, auth_headers, app_engine):
+        first, first_selects = _user_selects(
+            app_engine, lambda: client.get("/api/journal/prompts", headers=auth_headers)
+        )
+        second, second_selects = _user_selects(
+            app_engine, lambda: client.get("/api/journal/prompts", headers=auth_headers)
+        )
+
+        assert first.status_code == status.HTTP_200_OK
+        assert second.status_code == status.HTTP_200_OK
+        assert len(first_selects) == 1
+        assert second_selects == []
+
+    def test_role_change_evicts_cached_principal(self, client, auth_headers, db_session, test_user):
+        assert client.get("/api/therapist/crisis-events", headers=auth_headers).status_code == status.HTTP_403_FORBIDDEN
+
+        test_user.role = "therapist"
+        db_session.commit()
+
+        response = client.get("/api/therapist/crisis-events", headers=auth_headers)
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_deleted_user_is_rejected(self, client, auth_headers, db_session, test_user):
+        assert client.get("/api/journal/prompts", headers=auth_headers).status_code == status.HTTP_200_OK
+
+        db_session.delete(test_user)
+        db_session.commit()
+
+        response = client.get("/api/journal/prompts", headers=auth_headers)
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_legacy_token_without_uid_still_authenticates(self, client, test_user):
+        token = create_access_token(data={"sub": "test@example.com"})
+        response = client.get("/api/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["id"] == test_user.id
+
+    def test_cache_entry_never_outlives_token(self):
+        principal = AuthenticatedPrincipal(id=99, email="gone@example.com")
+
+        remember_principal(principal, {"exp": time.time() - 1})
+        assert principal_cache.get(99) is None
+
+        remember_principal(principal, {"exp": time.time() + 60})
+        assert principal_cache.get(99) == principal
+        principal_cache.invalidate(99)
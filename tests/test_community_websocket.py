@@ -5,12 +5,18 @@ Verifies:
 - WebSocket connection with valid JWT and community membership
 - Sending messages and receiving broadcast
 - Error handling (no token, invalid JSON, empty content)
+- Cross-worker fan-out through the backplane (fake in-process broker)
+- Per-connection send queues and slow-consumer dropping
 """
 
+import asyncio
 import json
 import pytest
+from fastapi import status
+from fastapi.websockets import WebSocketState
 
 from app.routers import community_ws
+from app.services.community_backplane import InMemoryBackplane, RedisBackplane
 from app.services.communities import ensure_default_communities
 from app.models.user import ProblemCommunity, CommunityMembership
 
@@ -147,3 +153,196 @@ class TestCommunityWebSocket:
                 assert "empty" in data.get("detail", "").lower()
         finally:
             community_ws.SessionLocal = original_session_local
+
+
+class FakeRedisBroker:
+    """In-process stand-in for Redis pub/sub shared by several 'workers'."""
+
+    def __init__(self):
+        self.subscribers = []
+        self.published = []
+
+    async def publish(self, channel, data):
+        self.published.append(channel)
+        for pattern, queue in list(self.subscribers):
+            if channel.startswith(pattern.rstrip("*")):
+                await queue.put({"type": "pmessage", "pattern": pattern, "channel": channel.encode(), "data": data.encode()})
+        return len(self.subscribers)
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+
+class FakePubSub:
+    def __init__(self, broker):
+        self.broker = broker
+        self.queue = asyncio.Queue()
+        self.entry = None
+
+    async def psubscribe(self, pattern):
+        self.entry = (pattern, self.queue)
+        self.broker.subscribers.append(self.entry)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        if self.entry in self.broker.subscribers:
+            self.broker.subscribers.remove(self.entry)
+
+
+class FakeSocket:
+    client_state = WebSocketState.CONNECTED
+
+    def __init__(self):
+        self.raw = []
+        self.close_code = None
+
+    @property
+    def received(self):
+        return [json.loads(data) for data in self.raw]
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, data):
+        self.raw.append(data)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+class StalledSocket(FakeSocket):
+    """A client on a bad network: sends never complete."""
+
+    async def send_text(self, data):
+        await asyncio.Event().wait()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class TestCommunityBackplane:
+    """Broadcast fan-out across ConnectionManagers (one per worker process)."""
+
+    def test_in_memory_backplane_delivers_locally(self):
+        async def run():
+            manager = community_ws.ConnectionManager(InMemoryBackplane())
+            a, b, other = FakeSocket(), FakeSocket(), FakeSocket()
+            await manager.connect(1, a)
+            await manager.connect(1, b)
+            await manager.connect(2, other)
+
+            await manager.broadcast(1, {"type": "message", "content": "hi"})
+            await _settle()
+
+            assert a.received == b.received == [{"type": "message", "content": "hi"}]
+            assert other.received == []
+            await manager.stop()
+
+        asyncio.run(run())
+
+    def test_redis_backplane_reaches_members_on_other_workers(self):
+        async def run():
+            broker = FakeRedisBroker()
+            worker_1 = community_ws.ConnectionManager(RedisBackplane(url="redis://unused", client=broker))
+            worker_2 = community_ws.ConnectionManager(RedisBackplane(url="redis://unused", client=broker))
+            alice, bob, elsewhere = FakeSocket(), FakeSocket(), FakeSocket()
+            await worker_1.connect(7, alice)
+            await worker_2.connect(7, bob)
+            await worker_2.connect(8, elsewhere)
+
+            await worker_1.broadcast(7, {"type": "message", "content": "across workers"})
+            await _settle()
+
+            # Published once; each worker (the sender's included) delivers exactly once
+            assert broker.published == ["community:ws:7"]
+            assert alice.received == [{"type": "message", "content": "across workers"}]
+            assert bob.received == [{"type": "message", "content": "across workers"}]
+            assert elsewhere.received == []
+
+            await worker_1.stop()
+            await worker_2.stop()
+            assert broker.subscribers == []
+
+        asyncio.run(run())
+
+    def test_publish_failure_still_delivers_locally(self):
+        class DownBroker(FakeRedisBroker):
+            async def publish(self, channel, data):
+                raise ConnectionError("redis down")
+
+        async def run():
+            backplane = RedisBackplane(url="redis://unused", client=DownBroker())
+            manager = community_ws.ConnectionManager(backplane)
+            socket = FakeSocket()
+            await manager.connect(3, socket)
+
+            await manager.broadcast(3, {"type": "message", "content": "local only"})
+            await _settle()
+
+            assert socket.received == [{"type": "message", "content": "local only"}]
+            assert backplane.get_stats()["errors"] == 1
+            await manager.stop()
+
+        asyncio.run(run())
+
+
+class TestBroadcastSendQueues:
+    """Per-connection send queues keep slow clients from stalling a community."""
+
+    def test_payload_is_serialized_once_for_all_recipients(self):
+        async def run():
+            manager = community_ws.ConnectionManager(InMemoryBackplane())
+            sockets = [FakeSocket() for _ in range(3)]
+            for socket in sockets:
+                await manager.connect(1, socket)
+
+            await manager.broadcast(1, {"type": "message", "content": "once"})
+            await _settle()
+
+            assert all(len(socket.raw) == 1 for socket in sockets)
+            assert sockets[0].raw[0] is sockets[1].raw[0] is sockets[2].raw[0]
+            await manager.stop()
+
+        asyncio.run(run())
+
+    def test_slow_consumer_is_dropped_without_delaying_others(self):
+        async def run():
+            manager = community_ws.ConnectionManager(InMemoryBackplane(), max_queue=2, send_timeout_seconds=30)
+            fast, slow = FakeSocket(), StalledSocket()
+            await manager.connect(1, fast)
+            await manager.connect(1, slow)
+
+            for n in range(5):
+                await asyncio.wait_for(manager.broadcast(1, {"n": n}), timeout=1)
+                await _settle()
+
+            assert fast.received == [{"n": n} for n in range(5)]
+            # One payload in flight plus two queued; the next one overflows the queue
+            assert slow.close_code == status.WS_1013_TRY_AGAIN_LATER
+            assert slow not in manager.active_connections[1]
+            stats = manager.get_stats()
+            assert (stats["connections"], stats["slow_consumers_dropped"]) == (1, 1)
+            await manager.stop()
+
+        asyncio.run(run())
+
+    def test_stalled_send_times_out_and_drops_connection(self):
+        async def run():
+            manager = community_ws.ConnectionManager(InMemoryBackplane(), max_queue=8, send_timeout_seconds=0.05)
+            slow = StalledSocket()
+            await manager.connect(1, slow)
+
+            await manager.broadcast(1, {"type": "message", "content": "hello?"})
+            await asyncio.sleep(0.1)
+            await _settle()
+
+            assert manager.active_connections[1] == {}
+            assert slow.close_code == status.WS_1013_TRY_AGAIN_LATER
+            await manager.stop()
+
+        asyncio.run(run())
@@ -80,6 +80,267 @@ class TestCrisisDetect:
         assert isinstance(data.get("safe_reply"), str) and data["safe_reply"]
 
 
+class TestSafetyPhraseMatcher:
+    """Tests for the compiled single-pass safety lexicon matcher."""
+
+    def test_single_scan_returns_high_and_medium_matches(self):
+        from app.services.phrase_matcher import PhraseMatcher
+        from app.services.safety import SafetyService
+
+        matcher = PhraseMatcher({
+            "high": SafetyService.HIGH_RISK_PATTERNS,
+            "medium": SafetyService.MEDIUM_RISK_PATTERNS,
+        })
+        found = matcher.match("I feel hopeless, there's no point. I want to die.")
+
+        assert found["high"] == [r"\bwant to die\b"]
+        assert found["medium"] == [r"\bhopeless\b", r"\bno point\b"]
+
+    def test_matches_whole_words_across_punctuation(self):
+        from app.services.phrase_matcher import PhraseMatcher
+
+        matcher = PhraseMatcher({"high": [r"\bself harm\b", r"\bdon't want to live\b"]})
+
+        assert matcher.match("thinking about self-harm again")["high"] == [r"\bself harm\b"]
+        assert matcher.match("I DON’T want to live")["high"] == [r"\bdon't want to live\b"]
+        assert matcher.match("selfharm")["high"] == []
+        assert matcher.match("I want to live")["high"] == []
+
+    def test_quoted_and_possessive_phrases_match(self):
+        from app.services.phrase_matcher import PhraseMatcher
+        from app.services.safety import SafetyService
+
+        matcher = PhraseMatcher({
+            "high": SafetyService.HIGH_RISK_PATTERNS,
+            "medium": SafetyService.MEDIUM_RISK_PATTERNS,
+        })
+
+        assert r"\bkill myself\b" in matcher.match("I just want to 'kill myself'")["high"]
+        assert r"\bsuicide\b" in matcher.match("'suicide'")["high"]
+        assert r"\bsuicide\b" in matcher.match("suicide's pull")["high"]
+        assert r"\bhopeless\b" in matcher.match("i feel hopeless'")["medium"]
+        assert r"\bcan't go on\b" in matcher.match("I can’t go on")["medium"]
+
+    def test_overlapping_phrases_are_all_reported(self):
+        from app.services.phrase_matcher import PhraseMatcher
+
+        matcher = PhraseMatcher({"medium": ["no point", "point in trying", "trying"]})
+
+        assert matcher.match("there is no point in trying")["medium"] == [
+            "no point", "point in trying", "trying",
+        ]
+
+    def test_rejects_regex_only_lexicon_entries(self):
+        from app.services.phrase_matcher import PhraseMatcher
+
+        with pytest.raises(ValueError):
+            PhraseMatcher({"high": [r"\bkill (myself|me)\b"]})
+
+    def test_assess_user_message_reports_pattern_order(self):
+        result = safety_service.assess_user_message("I might hurt myself or just kill myself")
+
+        assert result.risk_level == "high"
+        assert result.allowed is False
+        assert result.matched_phrases == [r"\bkill myself\b", r"\bhurt myself\b"]
+
+
+class TestAsyncLLMAssessment:
+    """Tests for the async, cached and timeout-bounded LLM risk assessment."""
+
+    class FakeLLMService:
+        def __init__(self, verdict="medium", delay=0.0):
+            self.verdict = verdict
+            self.delay = delay
+            self.calls = 0
+
+        def get_llm(self, **kwargs):
+            return self
+
+        async def ainvoke(self, messages):
+            import asyncio
+            from langchain_core.messages import AIMessage
+
+            self.calls += 1
+            await asyncio.sleep(self.delay)
+            return AIMessage(content=f'{{"risk_level": "{self.verdict}"}}')
+
+    def test_verdicts_are_cached_on_normalized_text(self):
+        import asyncio
+        from app.services.safety import SafetyService
+
+        fake_llm = self.FakeLLMService(verdict="medium")
+        service = SafetyService(llm_service=fake_llm)
+
+        first = asyncio.run(service.aassess_user_message("There's no point."))
+        second = asyncio.run(service.aassess_user_message("there's   NO point"))
+
+        assert first.risk_level == second.risk_level == "medium"
+        assert first.allowed is False
+        assert fake_llm.calls == 1
+
+    def test_timeout_falls_back_to_keyword_verdict_without_caching(self, monkeypatch):
+        import asyncio
+        from app.core.config import settings
+        from app.services.safety import SafetyService
+
+        monkeypatch.setattr(settings, "SAFETY_LLM_TIMEOUT_SECONDS", 0.01)
+        fake_llm = self.FakeLLMService(verdict="high", delay=0.5)
+        service = SafetyService(llm_service=fake_llm)
+
+        result = asyncio.run(service.aassess_user_message("I feel hopeless"))
+        asyncio.run(service.aassess_user_message("I feel hopeless"))
+
+        assert result.allowed is True
+        assert result.risk_level == "low"
+        assert fake_llm.calls == 2
+
+    def test_chat_reply_starts_while_assessment_runs(self, client, auth_headers, monkeypatch):
+        """A blocking verdict discards the speculative reply and returns the safe reply."""
+        from app.services.chat import chat_service
+        from app.services.chat_contract import ChatResult
+
+        events = []
+
+        class Provider:
+            async def agenerate_chat_response(self, prompt):
+                events.append("generation_started")
+                return ChatResult(success=True, content="Speculative reply")
+
+        fake_llm = self.FakeLLMService(verdict="medium", delay=0.05)
+        original_ainvoke = fake_llm.ainvoke
+
+        async def recording_ainvoke(messages):
+            response = await original_ainvoke(messages)
+            events.append("verdict")
+            return response
+
+        fake_llm.ainvoke = recording_ainvoke
+        monkeypatch.setattr(chat_service, "provider", Provider())
+        monkeypatch.setattr(safety_service, "llm_service", fake_llm)
+
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+        response = client.post(
+            f"/api/chat/conversations/{conv_id}/messages",
+            headers=auth_headers,
+            json={"role": "user", "content": "Everything feels hopeless"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["content"] != "Speculative reply"
+        assert events == ["generation_started", "verdict"]
+
+    def test_speculative_reply_never_uses_request_session(self, client, auth_headers, app_engine, monkeypatch):
+        """The speculative task is cancelled mid-call on a block; it must not have touched the session."""
+        import asyncio
+
+        from sqlalchemy import event
+
+        from app.services.chat import chat_service
+        from app.services.chat_contract import ChatResult
+
+        generation_tasks, statement_tasks = [], []
+
+        class SlowProvider:
+            async def agenerate_chat_response(self, prompt):
+                generation_tasks.append(asyncio.current_task())
+                await asyncio.sleep(5)
+                return ChatResult(success=True, content="Speculative reply")
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            try:
+                statement_tasks.append(asyncio.current_task())
+            except RuntimeError:
+                pass
+
+        monkeypatch.setattr(chat_service, "provider", SlowProvider())
+        monkeypatch.setattr(safety_service, "llm_service", self.FakeLLMService(verdict="high", delay=0.05))
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+
+        event.listen(app_engine, "before_cursor_execute", record)
+        try:
+            response = client.post(
+                f"/api/chat/conversations/{conv_id}/messages",
+                headers=auth_headers,
+                json={"role": "user", "content": "Everything feels hopeless"},
+            )
+        finally:
+            event.remove(app_engine, "before_cursor_execute", record)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["content"] != "Speculative reply"
+        assert len(generation_tasks) == 1
+        assert generation_tasks[0].cancelled()
+        assert statement_tasks and generation_tasks[0] not in statement_tasks
+        history = client.get(f"/api/chat/conversations/{conv_id}/messages", headers=auth_headers).json()
+        assert [m["role"] for m in history["messages"]] == ["user", "model"]
+
+
+class TestBulkRescore:
+    """Tests for SafetyService.assess_many and the bulk rescore endpoint."""
+
+    def test_assess_many_matches_single_assessment(self):
+        from app.services.safety import SafetyService
+
+        service = SafetyService(llm_service=None)
+        texts = ["I want to kill myself", "just a normal day", "I want to kill myself", "feeling hopeless"]
+
+        results = service.assess_many(texts)
+
+        assert [r.risk_level for r in results] == ["high", "low", "high", "low"]
+        for text, result in zip(texts, results):
+            single = service.assess_user_message(text)
+            assert (result.allowed, result.matched_phrases) == (single.allowed, single.matched_phrases)
+
+    def test_rescore_creates_events_once(self, client, auth_headers, db_session, test_user):
+        from app.models.user import ChatMessage, Conversation, CrisisEvent, JournalEntry
+
+        test_user.role = "therapist"
+        conversation = Conversation(user_id=test_user.id, tier="Green", mood="Grounded", source="Family")
+        db_session.add(conversation)
+        db_session.commit()
+        db_session.add_all([
+            ChatMessage(conversation_id=conversation.id, role="user", content="I want to end my life"),
+            ChatMessage(conversation_id=conversation.id, role="model", content="suicide hotline info"),
+            ChatMessage(conversation_id=conversation.id, role="user", content="Hello"),
+            JournalEntry(user_id=test_user.id, content="Thinking about self harm"),
+            JournalEntry(user_id=test_user.id, content="Good day at class"),
+        ])
+        db_session.commit()
+
+        response = client.post(
+            "/api/therapist/crisis-events/rescore",
+            headers=auth_headers,
+            json={"sources": ["chat", "journal"], "chunk_size": 2},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["rows_scanned"] == 4  # model replies are not rescored
+        assert data["events_created"] == 2
+        assert data["sources"]["chat"]["chunks"] == 1
+        assert data["sources"]["journal"]["flagged"] == 1
+        assert data["rows_per_second"] >= 0
+        events = db_session.query(CrisisEvent).order_by(CrisisEvent.id).all()
+        assert [(e.source, e.risk_level) for e in events] == [("chat", "high"), ("journal", "high")]
+
+        rerun = client.post(
+            "/api/therapist/crisis-events/rescore",
+            headers=auth_headers,
+            json={"sources": ["chat", "journal"]},
+        ).json()
+        assert rerun["events_created"] == 0
+        assert rerun["sources"]["chat"]["skipped_existing"] == 1
+        assert db_session.query(CrisisEvent).count() == 2
+
+    def test_rescore_requires_therapist(self, client, auth_headers):
+        response = client.post(
+            "/api/therapist/crisis-events/rescore",
+            headers=auth_headers,
+            json={"dry_run": True},
+        )
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
 class TestCrisisResources:
     """Tests for /api/crisis/resources."""
 
@@ -0,0 +1,174 @@
+"""
+Tests for the hearts ledger, its per-user balance summary and reconciliation.
+"""
+import threading
+
+from fastapi import status
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import Base, HeartsBalanceSummary, HeartsTransaction, User
+from app.schemas.hearts import HeartsTransactionCreate
+from app.services.hearts import HeartsAward, append_hearts, award_hearts, get_hearts_balance
+from app.services.hearts_reconcile import reconcile_hearts_balances
+
+
+def _award(db, user_id, amount, kind="earn"):
+    return award_hearts(db, user_id, HeartsTransactionCreate(amount=amount, type=kind, description="test"))
+
+
+class TestHeartsBalanceSummary:
+    def test_awards_keep_summary_and_ledger_in_step(self, db_session, test_user):
+        first = _award(db_session, test_user.id, 10)
+        second = _award(db_session, test_user.id, 7)
+        spent = _award(db_session, test_user.id, -4, kind="redeem")
+
+        assert [first.balance_after, second.balance_after, spent.balance_after] == [10, 17, 13]
+        summary = db_session.get(HeartsBalanceSummary, test_user.id)
+        assert (summary.balance, summary.total_earned, summary.total_redeemed) == (13, 17, 4)
+
+    def test_first_award_seeds_summary_from_existing_ledger(self, db_session, test_user):
+        db_session.execute(insert(HeartsTransaction), [
+            {"user_id": test_user.id, "amount": 20, "type": "earn", "description": "legacy", "balance_after": 20},
+            {"user_id": test_user.id, "amount": -5, "type": "redeem", "description": "legacy", "balance_after": 15},
+        ])
+        db_session.commit()
+
+        assert get_hearts_balance(db_session, test_user.id).balance == 15
+        assert _award(db_session, test_user.id, 5).balance_after == 20
+        balance = get_hearts_balance(db_session, test_user.id)
+        assert (balance.balance, balance.total_earned, balance.total_redeemed) == (20, 25, 5)
+
+    def test_balance_endpoint_is_a_primary_key_read(self, client, auth_headers, app_engine):
+        client.post("/api/hearts/earn", headers=auth_headers, json={"amount": 3, "type": "earn", "description": "x"})
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "hearts" in statement:
+                statements.append(" ".join(statement.split()))
+
+        event.listen(app_engine, "before_cursor_execute", record)
+        try:
+            response = client.get("/api/hearts/balance", headers=auth_headers)
+        finally:
+            event.remove(app_engine, "before_cursor_execute", record)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"balance": 3, "total_earned": 3, "total_redeemed": 0}
+        assert len(statements) == 1
+        assert "FROM hearts_balances WHERE hearts_balances.user_id = ?" in statements[0]
+
+
+class TestReconcileHeartsBalances:
+    def test_clean_ledger_reports_no_drift(self, db_session, test_user):
+        _award(db_session, test_user.id, 10)
+
+        report = reconcile_hearts_balances(db_session)
+        assert report.users_checked == 1
+        assert report.mismatched == []
+
+    def test_drift_is_reported_and_repaired(self, db_session, test_user):
+        _award(db_session, test_user.id, 10)
+        db_session.execute(insert(HeartsTransaction), [
+            {"user_id": test_user.id, "amount": 6, "type": "earn", "description": "manual", "balance_after": 16},
+        ])
+        db_session.commit()
+
+        report = reconcile_hearts_balances(db_session)
+        assert report.mismatched == [{"user_id": test_user.id, "expected": (16, 16, 0), "actual": (10, 10, 0)}]
+        assert report.repaired == 0
+
+        report = reconcile_hearts_balances(db_session, fix=True)
+        assert report.repaired == 1
+        db_session.expire_all()
+        summary = db_session.get(HeartsBalanceSummary, test_user.id)
+        assert (summary.balance, summary.total_earned) == (16, 16)
+        assert reconcile_hearts_balances(db_session).mismatched == []
+
+
+class TestAppendHearts:
+    def test_batch_is_one_insert_with_running_balances(self, db_session, test_user):
+        other = User(email="other@example.com", password_hash="x")
+        db_session.add(other)
+        db_session.commit()
+        _award(db_session, test_user.id, 10)
+
+        inserts = []
+        bind = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("INSERT INTO HEARTS_TRANSACTIONS"):
+                inserts.append(statement)
+
+        event.listen(bind, "before_cursor_execute", record)
+        try:
+            rows = append_hearts(db_session, [
+                HeartsAward(user_id=test_user.id, amount=5, type="earn", description="a"),
+                HeartsAward(user_id=other.id, amount=3, type="earn", description="b"),
+                HeartsAward(user_id=test_user.id, amount=-2, type="redeem", description="c"),
+            ])
+        finally:
+            event.remove(bind, "before_cursor_execute", record)
+        db_session.commit()
+
+        assert len(inserts) == 1
+        assert [(r.user_id, r.balance_after) for r in rows] == [(test_user.id, 15), (other.id, 3), (test_user.id, 13)]
+        assert get_hearts_balance(db_session, test_user.id).balance == 13
+        assert get_hearts_balance(db_session, other.id).balance == 3
+
+    def test_append_does_not_commit(self, db_session, test_user):
+        append_hearts(db_session, [HeartsAward(user_id=test_user.id, amount=5, type="earn", description="a")])
+        db_session.rollback()
+
+        assert db_session.query(HeartsTransaction).count() == 0
+        assert get_hearts_balance(db_session, test_user.id).balance == 0
+
+    def test_parallel_awards_get_distinct_balances(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'hearts.db'}",
+            connect_args={"check_same_thread": False, "timeout": 30},
+        )
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with factory() as db:
+            db.add(User(id=1, email="h@example.com", password_hash="x"))
+            db.commit()
+        errors = []
+
+        def worker():
+            db = factory()
+            try:
+                for _ in range(10):
+                    _award(db, 1, 1)
+            except Exception as e:  # pragma: no cover - surfaced by the assert below
+                errors.append(e)
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with factory() as db:
+            balances = sorted(db.scalars(select(HeartsTransaction.balance_after)))
+        engine.dispose()
+        assert errors == []
+        assert balances == list(range(1, 61))
+
+    def test_journal_entry_and_award_commit_together(self, client, auth_headers, app_engine):
+        commits = []
+
+        def record(conn):
+            commits.append(conn)
+
+        event.listen(app_engine, "commit", record)
+        try:
+            response = client.post("/api/journal/entries", headers=auth_headers, json={"content": "A calm day"})
+        finally:
+            event.remove(app_engine, "commit", record)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(commits) == 1
+        assert client.get("/api/hearts/balance", headers=auth_headers).json()["total_earned"] > 0
@@ -0,0 +1,160 @@
+"""
+Tests for the per-conversation chat history cache.
+"""
+from sqlalchemy import event
+from fastapi import status
+
+from app.services.history_cache import InMemoryHistoryCache
+
+
+def _message(message_id, content="hello", role="user"):
+    return {"id": message_id, "role": role, "content": content}
+
+
+class TestInMemoryHistoryCache:
+    """Unit tests for the in-process LRU backend."""
+
+    def test_stamp_mismatch_is_a_miss(self):
+        cache = InMemoryHistoryCache(max_conversations=10, max_bytes=10_000, max_messages=10)
+        cache.set(1, "stamp-a", [_message(1)])
+
+        assert cache.get(1, "stamp-a") == [_message(1)]
+        assert cache.get(1, "stamp-b") is None
+
+    def test_append_extends_warm_entries_only(self):
+        cache = InMemoryHistoryCache(max_conversations=10, max_bytes=10_000, max_messages=2)
+        cache.append(1, "s0", "s1", _message(1))
+        assert cache.get(1, "s1") is None
+
+        cache.set(1, "s1", [_message(1)])
+        cache.append(1, "s1", "s2", _message(2))
+        cache.append(1, "s2", "s3", _message(3))
+
+        # Bounded to max_messages, keeping the newest
+        assert [m["id"] for m in cache.get(1, "s3")] == [2, 3]
+
+    def test_out_of_order_append_invalidates(self):
+        cache = InMemoryHistoryCache(max_conversations=10, max_bytes=10_000, max_messages=10)
+        cache.set(1, "s1", [_message(1), _message(3)])
+        cache.append(1, "s1", "s2", _message(2))
+
+        assert cache.get(1, "s2") is None
+        assert cache.get_stats()["invalidations"] == 1
+
+    def test_append_after_another_writer_drops_entry(self):
+        """Two workers write in turn; the second only saw the stamp before the first write."""
+        worker_cache = InMemoryHistoryCache(max_conversations=10, max_bytes=10_000, max_messages=10)
+        worker_cache.set(1, "s1", [_message(1)])
+
+        # Another worker commits message 2 (s1 -> s2) without touching this cache,
+        # then this worker commits message 3 over s2 (s2 -> s3)
+        worker_cache.append(1, "s2", "s3", _message(3))
+
+        assert worker_cache.get(1, "s3") is None
+        assert worker_cache.get_stats()["invalidations"] == 1
+
+    def test_evicts_least_recently_used_by_size(self):
+        cache = InMemoryHistoryCache(max_conversations=10, max_bytes=1_000, max_messages=10)
+        cache.set(1, "s", [_message(1, "a" * 300)])
+        cache.set(2, "s", [_message(2, "b" * 300)])
+        cache.get(1, "s")  # conversation 1 is now most recently used
+        cache.set(3, "s", [_message(3, "c" * 300)])
+
+        assert cache.get(2, "s") is None
+        assert cache.get(1, "s") is not None
+        assert cache.get(3, "s") is not None
+        stats = cache.get_stats()
+        assert stats["evictions"] == 1
+        assert stats["bytes"] <= 1_000
+
+
+class TestSendPathUsesCache:
+    """The send path should not re-query chat history once the cache is warm."""
+
+    def test_second_message_skips_history_query(self, client, auth_headers, app_engine, monkeypatch):
+        from app.services.chat import chat_service
+        from app.services.chat_contract import ChatResult
+
+        class Provider:
+            def __init__(self):
+                self.prompts = []
+
+            async def agenerate_chat_response(self, prompt):
+                self.prompts.append(prompt)
+                return ChatResult(success=True, content=f"Reply {len(self.prompts)}")
+
+        provider = Provider()
+        monkeypatch.setattr(chat_service, "provider", provider)
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+
+        first = client.post(
+            f"/api/chat/conversations/{conv_id}/messages",
+            headers=auth_headers,
+            json={"role": "user", "content": "First message"},
+        )
+        assert first.status_code == status.HTTP_200_OK
+
+        history_selects = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            normalized = " ".join(statement.split()).upper()
+            # Row refreshes by primary key are fine; history loads filter by conversation
+            if normalized.startswith("SELECT") and "CHAT_MESSAGES.CONVERSATION_ID =" in normalized:
+                history_selects.append(statement)
+
+        bind = app_engine
+        event.listen(bind, "before_cursor_execute", record)
+        try:
+            second = client.post(
+                f"/api/chat/conversations/{conv_id}/messages",
+                headers=auth_headers,
+                json={"role": "user", "content": "Second message"},
+            )
+        finally:
+            event.remove(bind, "before_cursor_execute", record)
+
+        assert second.status_code == status.HTTP_200_OK
+        assert history_selects == []
+        last_prompt = provider.prompts[-1].user_message
+        assert "user: First message" in last_prompt
+        assert "model: Reply 1" in last_prompt
+
+    def test_write_from_another_worker_is_not_lost(self, client, auth_headers, db_session, monkeypatch):
+        from datetime import datetime, timedelta, timezone
+
+        from app.models.user import ChatMessage, Conversation
+        from app.services.chat import chat_service
+        from app.services.chat_contract import ChatResult
+
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+
+        def other_worker_writes():
+            # Commits a message and bumps the stamp; this process's cache never hears about it
+            written_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+            db_session.add(ChatMessage(conversation_id=conv_id, role="user", content="From worker two", created_at=written_at))
+            db_session.get(Conversation, conv_id).updated_at = written_at
+            db_session.commit()
+
+        class Provider:
+            def __init__(self):
+                self.prompts = []
+
+            async def agenerate_chat_response(self, prompt):
+                self.prompts.append(prompt)
+                if len(self.prompts) == 2:
+                    # Lands between this turn's history load and its commit
+                    other_worker_writes()
+                return ChatResult(success=True, content=f"Reply {len(self.prompts)}")
+
+        provider = Provider()
+        monkeypatch.setattr(chat_service, "provider", provider)
+
+        for content in ("First message", "Second message", "Third message"):
+            response = client.post(
+                f"/api/chat/conversations/{conv_id}/messages",
+                headers=auth_headers,
+                json={"role": "user", "content": content},
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        assert "user: From worker two" in provider.prompts[-1].user_message
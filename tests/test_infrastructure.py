@@ -99,4 +99,116 @@ class TestConfigurationProperties:
             assert len(origins) > 0
             for origin in origins:
                 assert isinstance(origin, str)
-                assert len(origin) > 0
\ No newline at end of file
+                assert len(origin) > 0
+
+class TestLLMClientPool:
+    """Test pooled Gemini client reuse in LLMService."""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        import app.services.llm as llm_module
+
+        class FakeLLM:
+            def __init__(self, **kwargs):
+                self.kwargs = kwargs
+
+        monkeypatch.setattr(llm_module, "ChatGoogleGenerativeAI", FakeLLM)
+        monkeypatch.setattr(llm_module.settings, "LLM_CLIENT_POOL_SIZE", 2)
+        service = llm_module.LLMService()
+        service.api_key = "test-key"
+        return service
+
+    def test_same_config_reuses_client(self, service):
+        """Repeated calls with the same parameters return the same instance."""
+        first = service.get_llm(temperature=0.1)
+        second = service.get_llm(temperature=0.1)
+
+        assert first is second
+        stats = service.get_pool_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["size"] == 1
+
+    def test_distinct_configs_are_pooled_separately(self, service):
+        """Each (model, temperature, top_p, max_output_tokens) gets its own client."""
+        chat = service.get_llm(temperature=0.7)
+        safety = service.get_llm(temperature=0.1, max_output_tokens=200)
+
+        assert chat is not safety
+        assert safety.kwargs["max_output_tokens"] == 200
+
+    def test_least_recently_used_client_is_evicted(self, service):
+        """Pool is bounded and evicts the least recently used configuration."""
+        a = service.get_llm(temperature=0.1)
+        service.get_llm(temperature=0.2)
+        service.get_llm(temperature=0.1)  # refresh a
+        service.get_llm(temperature=0.3)  # evicts 0.2
+
+        assert service.get_llm(temperature=0.1) is a
+        stats = service.get_pool_stats()
+        assert stats["evictions"] == 1
+        assert stats["size"] == 2
+
+
+class TestDatabasePool:
+    """Connection pool configuration and metrics."""
+
+    def test_checkout_waits_and_timeouts_are_recorded(self, tmp_path):
+        from sqlalchemy import create_engine, exc
+        from app.core.database import TimedQueuePool, _pool_status
+
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=TimedQueuePool,
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.05,
+        )
+        held = engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        status = _pool_status(engine.pool)
+        held.close()
+        engine.dispose()
+
+        assert status["checked_out"] == 1
+        assert status["wait"]["checkouts"] == 1
+        assert status["wait"]["timeouts"] == 1
+        assert status["wait"]["max_wait_ms"] >= 50
+
+    def test_pool_options_come_from_settings(self, monkeypatch):
+        from app.core.database import TimedQueuePool, _pool_options
+
+        monkeypatch.setattr(settings, "DB_POOL_SIZE", 3)
+        monkeypatch.setattr(settings, "DB_POOL_RECYCLE_SECONDS", 60)
+        options = _pool_options("postgresql://u:p@db:5432/app", TimedQueuePool)
+
+        assert options["pool_size"] == 3
+        assert options["pool_recycle"] == 60
+        assert options["pool_pre_ping"] is settings.DB_POOL_PRE_PING
+        assert _pool_options("sqlite:///./local.db", TimedQueuePool) == {}
+
+    def test_transaction_pooler_disables_prepared_statement_caches(self, monkeypatch):
+        from app.core.database import _async_connect_args
+
+        pooler_url = "postgresql://u:p@aws-0-eu.pooler.supabase.com:6543/postgres"
+        monkeypatch.setattr(settings, "DB_TRANSACTION_POOLER", None)
+        args = _async_connect_args(pooler_url)
+        assert args["statement_cache_size"] == 0
+        assert args["prepared_statement_cache_size"] == 0
+        assert args["prepared_statement_name_func"]() != args["prepared_statement_name_func"]()
+
+        # Session pooler port keeps statement caching
+        assert "statement_cache_size" not in _async_connect_args(pooler_url.replace(":6543", ":5432"))
+
+        monkeypatch.setattr(settings, "DB_TRANSACTION_POOLER", True)
+        assert _async_connect_args("postgresql://u:p@pgbouncer:6432/app")["statement_cache_size"] == 0
+
+    def test_pool_status_endpoint(self):
+        client = TestClient(app)
+        response = client.get("/debug/db-pool")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {"transaction_pooler", "sync", "async"}
+        assert "class" in data["sync"]
@@ -0,0 +1,129 @@
+"""
+Tests for the bounded bcrypt worker pool and rehash-on-login.
+"""
+import asyncio
+import threading
+
+import bcrypt
+import pytest
+from fastapi import status
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import (
+    PasswordHasherPool,
+    PasswordPoolSaturated,
+    get_password_hash,
+    password_needs_rehash,
+    verify_password,
+)
+from app.models.user import User
+from app.routers import auth as auth_router
+
+
+class TestPasswordHasherPool:
+    def test_runs_off_the_event_loop(self):
+        pool = PasswordHasherPool(max_workers=2, max_queue=2)
+
+        async def run():
+            return await pool.run(threading.current_thread)
+
+        worker = asyncio.run(run())
+        assert worker is not threading.current_thread()
+        stats = pool.get_stats()
+        assert stats["completed"] == 1
+        assert stats["queue_depth"] == 0 and stats["in_flight"] == 0
+
+    def test_rejects_when_saturated(self):
+        pool = PasswordHasherPool(max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        async def run():
+            blocked = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+            await asyncio.sleep(0.05)
+            assert pool.get_stats()["queue_depth"] == 1
+            with pytest.raises(PasswordPoolSaturated):
+                await pool.run(release.wait)
+            release.set()
+            await asyncio.gather(*blocked)
+
+        asyncio.run(run())
+        stats = pool.get_stats()
+        assert stats["rejected"] == 1
+        assert stats["completed"] == 2
+
+    def test_needs_rehash_compares_cost(self, monkeypatch):
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        assert password_needs_rehash(bcrypt.hashpw(b"x", bcrypt.gensalt(rounds=4)).decode())
+        assert not password_needs_rehash(bcrypt.hashpw(b"x", bcrypt.gensalt(rounds=5)).decode())
+        assert not password_needs_rehash("not-a-bcrypt-hash")
+
+
+class TestAuthWithPasswordPool:
+    def test_login_returns_503_when_pool_is_full(self, client, test_user, monkeypatch):
+        pool = PasswordHasherPool(max_workers=1, max_queue=0)
+        monkeypatch.setattr(security, "password_pool", pool)
+        pool._pending = 1  # the only slot is taken by another request
+
+        response = client.post(
+            "/api/auth/login-json",
+            json={"email": "test@example.com", "password": "testpass123"},
+        )
+
+        assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert response.headers["Retry-After"] == "1"
+        assert pool.get_stats()["rejected"] == 1
+
+    def test_login_upgrades_hash_cost(self, client, db_session, test_user, monkeypatch):
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+        test_user.password_hash = get_password_hash("testpass123")
+        db_session.commit()
+
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+        response = client.post(
+            "/api/auth/login-json",
+            json={"email": "test@example.com", "password": "testpass123"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+
+        db_session.expire_all()
+        stored = db_session.get(User, test_user.id).password_hash
+        assert stored.startswith("$2b$05$")
+        assert verify_password("testpass123", stored)
+
+    def test_saturated_pool_during_rehash_still_logs_in(self, client, db_session, test_user, monkeypatch):
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 4)
+        old_hash = get_password_hash("testpass123")
+        test_user.password_hash = old_hash
+        db_session.commit()
+        monkeypatch.setattr(settings, "BCRYPT_ROUNDS", 5)
+
+        original_hash = security.aget_password_hash
+
+        async def saturated_hash(password):
+            raise PasswordPoolSaturated()
+
+        # Verification goes through; only the upgrade finds the pool full
+        monkeypatch.setattr(auth_router, "aget_password_hash", saturated_hash)
+        response = client.post(
+            "/api/auth/login-json",
+            json={"email": "test@example.com", "password": "testpass123"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        db_session.expire_all()
+        assert db_session.get(User, test_user.id).password_hash == old_hash
+
+        # The next login retries the upgrade
+        monkeypatch.setattr(auth_router, "aget_password_hash", original_hash)
+        response = client.post(
+            "/api/auth/login-json",
+            json={"email": "test@example.com", "password": "testpass123"},
+        )
+        assert response.status_code == status.HTTP_200_OK
+        db_session.expire_all()
+        assert db_session.get(User, test_user.id).password_hash.startswith("$2b$05$")
+
+    def test_debug_endpoint_reports_pool(self, client):
+        response = client.get("/debug/password-pool")
+        assert response.status_code == status.HTTP_200_OK
+        assert {"queue_depth", "in_flight", "rejected", "avg_wait_ms"} <= set(response.json())
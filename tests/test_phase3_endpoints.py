@@ -3,6 +3,7 @@ Integration tests for Phase 3 endpoints:
 - Task 3.1: Chat Endpoints
 - Task 3.2: User State Management Endpoints
 """
+import json
 import pytest
 from fastapi import status
 
@@ -632,6 +633,325 @@ class TestChatEndpoints:
         # Endpoint should still provide safe user-facing content.
         assert "technical difficulties" in data["content"].lower()
 
+    def test_send_message_prefers_async_provider_method(self, client, auth_headers, monkeypatch):
+        """Providers exposing agenerate_chat_response should be awaited instead of the sync path."""
+        from app.services.chat import chat_service
+        from app.services.chat_contract import ChatResult
+
+        class AsyncProvider:
+            def __init__(self):
+                self.async_calls = 0
+
+            def generate_chat_response(self, prompt):
+                raise AssertionError("sync path should not be used")
+
+            async def agenerate_chat_response(self, prompt):
+                self.async_calls += 1
+                return ChatResult(success=True, content="Async reply")
+
+        provider = AsyncProvider()
+        monkeypatch.setattr(chat_service, "provider", provider)
+
+        conv_response = client.post("/api/chat/conversations", headers=auth_headers, json={})
+        conv_id = conv_response.json()["id"]
+
+        response = client.post(
+            f"/api/chat/conversations/{conv_id}/messages",
+            headers=auth_headers,
+            json={"role": "user", "content": "Hello there"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["content"] == "Async reply"
+        assert provider.async_calls == 1
+
+    def test_send_message_runs_sync_provider_off_event_loop(self, client, auth_headers, monkeypatch):
+        """Sync-only providers should run on the bounded executor, not the event loop thread."""
+        import threading
+        from app.services.chat import chat_service
+        from app.services.chat_contract import ChatResult
+
+        class SyncProvider:
+            def __init__(self):
+                self.thread_names = []
+
+            def generate_chat_response(self, prompt):
+                self.thread_names.append(threading.current_thread().name)
+                return ChatResult(success=True, content="Sync reply")
+
+        provider = SyncProvider()
+        monkeypatch.setattr(chat_service, "provider", provider)
+
+        conv_response = client.post("/api/chat/conversations", headers=auth_headers, json={})
+        conv_id = conv_response.json()["id"]
+
+        response = client.post(
+            f"/api/chat/conversations/{conv_id}/messages",
+            headers=auth_headers,
+            json={"role": "user", "content": "Hello there"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["content"] == "Sync reply"
+        assert provider.thread_names and provider.thread_names[0].startswith("llm-sync")
+
+    @staticmethod
+    def _parse_sse(body: str):
+        events = []
+        for frame in body.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in frame.splitlines())
+            events.append((lines["event"], json.loads(lines["data"])))
+        return events
+
+    def test_send_message_stream_emits_tokens_and_persists_reply(self, client, auth_headers, monkeypatch):
+        """Streaming endpoint should emit token events, then persist the joined reply and award XP."""
+        from app.services.chat import chat_service
+
+        class StreamingProvider:
+            async def astream_chat_response(self, prompt):
+                for chunk in ["Hel", "lo ", "there"]:
+                    yield chunk
+
+        monkeypatch.setattr(chat_service, "provider", StreamingProvider())
+
+        initial_xp = client.get("/api/users/me/state", headers=auth_headers).json()["xp"]
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+
+        response = client.post(
+            f"/api/chat/conversations/{conv_id}/messages/stream",
+            headers=auth_headers,
+            json={"role": "user", "content": "Hi"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = self._parse_sse(response.text)
+        assert [e for e, _ in events] == ["token", "token", "token", "done"]
+        assert "".join(data["content"] for e, data in events if e == "token") == "Hello there"
+        done = events[-1][1]
+        assert done["message"]["role"] == "model"
+        assert done["message"]["content"] == "Hello there"
+        assert done["ttft_ms"] is not None
+
+        messages = client.get(
+            f"/api/chat/conversations/{conv_id}/messages", headers=auth_headers
+        ).json()["messages"]
+        assert [m["role"] for m in messages] == ["user", "model"]
+        assert messages[-1]["content"] == "Hello there"
+
+        new_xp = client.get("/api/users/me/state", headers=auth_headers).json()["xp"]
+        assert new_xp == initial_xp + 5
+
+    def test_send_message_stream_safety_gate_blocks_before_streaming(self, client, auth_headers, monkeypatch):
+        """High-risk messages should get the safe reply as the only event and no XP."""
+        from app.services.chat import chat_service
+
+        class StreamingProvider:
+            async def astream_chat_response(self, prompt):
+                raise AssertionError("provider should not be called when safety gate blocks")
+                yield  # pragma: no cover
+
+        monkeypatch.setattr(chat_service, "provider", StreamingProvider())
+
+        initial_xp = client.get("/api/users/me/state", headers=auth_headers).json()["xp"]
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+
+        response = client.post(
+            f"/api/chat/conversations/{conv_id}/messages/stream",
+            headers=auth_headers,
+            json={"role": "user", "content": "I want to kill myself"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        events = self._parse_sse(response.text)
+        assert [e for e, _ in events] == ["done"]
+        assert events[0][1]["message"]["role"] == "model"
+        assert events[0][1]["message"]["content"]
+
+        new_xp = client.get("/api/users/me/state", headers=auth_headers).json()["xp"]
+        assert new_xp == initial_xp
+
+    def test_long_conversation_folds_older_turns_into_summary(self, client, auth_headers, db_session, monkeypatch):
+        """Turns beyond the token window are summarised once and not re-sent or re-summarised."""
+        from app.core.config import settings
+        from app.models.user import Conversation
+        from app.services.chat import chat_service
+        from app.services.chat_contract import ChatResult
+
+        class RecordingProvider:
+            def __init__(self):
+                self.chat_prompts = []
+                self.summary_prompts = []
+
+            async def agenerate_chat_response(self, prompt):
+                if "running summary" in (prompt.system_prompt or ""):
+                    self.summary_prompts.append(prompt)
+                    return ChatResult(success=True, content=f"summary v{len(self.summary_prompts)}")
+                self.chat_prompts.append(prompt)
+                return ChatResult(success=True, content="Reply " + "x" * 40)
+
+        provider = RecordingProvider()
+        monkeypatch.setattr(chat_service, "provider", provider)
+        monkeypatch.setattr(settings, "CHAT_HISTORY_TOKEN_BUDGET", 60)
+        monkeypatch.setattr(settings, "CHAT_SUMMARY_FOLD_MIN_MESSAGES", 4)
+
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+        for turn in range(8):
+            response = client.post(
+                f"/api/chat/conversations/{conv_id}/messages",
+                headers=auth_headers,
+                json={"role": "user", "content": f"Turn {turn} " + "y" * 40},
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        assert provider.summary_prompts
+        first_summary_input = provider.summary_prompts[0].user_message
+        assert "Turn 0" in first_summary_input
+        # Later folds only see turns newer than the previous fold
+        for later in provider.summary_prompts[1:]:
+            assert "Turn 0" not in later.user_message
+
+        last_prompt = provider.chat_prompts[-1].user_message
+        assert "Summary of earlier conversation:" in last_prompt
+        assert "Turn 0" not in last_prompt
+        assert "Turn 6" in last_prompt
+
+        conversation = db_session.query(Conversation).filter(Conversation.id == conv_id).first()
+        assert conversation.history_summary == f"summary v{len(provider.summary_prompts)}"
+        assert conversation.summary_through_message_id is not None
+
+    def test_send_message_commits_turn_once(self, client, auth_headers, app_engine, monkeypatch):
+        """User message, reply, conversation timestamp and XP are persisted in one commit."""
+        from sqlalchemy import event
+        from app.services.chat import chat_service
+        from app.services.chat_contract import ChatResult
+
+        class FakeProvider:
+            async def agenerate_chat_response(self, prompt):
+                return ChatResult(success=True, content="One transaction reply")
+
+        monkeypatch.setattr(chat_service, "provider", FakeProvider())
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+        initial_xp = client.get("/api/users/me/state", headers=auth_headers).json()["xp"]
+
+        commits = []
+        bind = app_engine
+
+        def record(conn):
+            commits.append(conn)
+
+        event.listen(bind, "commit", record)
+        try:
+            response = client.post(
+                f"/api/chat/conversations/{conv_id}/messages",
+                headers=auth_headers,
+                json={"role": "user", "content": "Count my commits"},
+            )
+        finally:
+            event.remove(bind, "commit", record)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(commits) == 1
+
+        messages = client.get(
+            f"/api/chat/conversations/{conv_id}/messages", headers=auth_headers
+        ).json()["messages"]
+        assert [(m["role"], m["content"]) for m in messages] == [
+            ("user", "Count my commits"),
+            ("model", "One transaction reply"),
+        ]
+        new_xp = client.get("/api/users/me/state", headers=auth_headers).json()["xp"]
+        assert new_xp == initial_xp + 5
+
+
+class TestChatHistoryPagination:
+    """Test cursor-based pagination of GET .../messages."""
+
+    @pytest.fixture
+    def long_conversation(self, client, auth_headers, db_session):
+        """Conversation with 25 messages; pairs share a created_at to exercise the id tie-break."""
+        from datetime import datetime, timedelta
+        from app.models.user import ChatMessage
+
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+        start = datetime(2026, 1, 5, 9, 0, 0)
+        for i in range(25):
+            db_session.add(ChatMessage(
+                conversation_id=conv_id,
+                role="user" if i % 2 == 0 else "model",
+                content=f"m{i}",
+                created_at=start + timedelta(seconds=i // 2),
+            ))
+        db_session.commit()
+        return conv_id
+
+    def _page(self, client, auth_headers, conv_id, **params):
+        response = client.get(
+            f"/api/chat/conversations/{conv_id}/messages", headers=auth_headers, params=params
+        )
+        assert response.status_code == status.HTTP_200_OK
+        return response.json()
+
+    def test_unpaged_request_returns_full_history(self, client, auth_headers, long_conversation):
+        data = self._page(client, auth_headers, long_conversation)
+        assert [m["content"] for m in data["messages"]] == [f"m{i}" for i in range(25)]
+        assert data["has_more"] is False
+        assert data["before_cursor"] is None
+
+    def test_walk_back_with_before_cursor(self, client, auth_headers, long_conversation):
+        seen = []
+        data = self._page(client, auth_headers, long_conversation, limit=10)
+        pages = [data]
+        while data["has_more"]:
+            data = self._page(client, auth_headers, long_conversation, limit=10, before=data["before_cursor"])
+            pages.append(data)
+
+        for page in pages:
+            seen = [m["content"] for m in page["messages"]] + seen
+        assert [len(page["messages"]) for page in pages] == [10, 10, 5]
+        assert seen == [f"m{i}" for i in range(25)]
+
+    def test_after_cursor_returns_newer_messages(self, client, auth_headers, long_conversation):
+        first = self._page(client, auth_headers, long_conversation, limit=10)
+        oldest = self._page(client, auth_headers, long_conversation, limit=5, before=first["before_cursor"])
+
+        newer = self._page(client, auth_headers, long_conversation, limit=4, after=oldest["after_cursor"])
+        assert [m["content"] for m in newer["messages"]] == ["m15", "m16", "m17", "m18"]
+        assert newer["has_more"] is True
+
+        caught_up = self._page(client, auth_headers, long_conversation, after=first["after_cursor"])
+        assert caught_up["messages"] == []
+        assert caught_up["has_more"] is False
+        assert caught_up["after_cursor"] == first["after_cursor"]
+
+    def test_deep_page_is_one_bounded_query(self, client, auth_headers, long_conversation, app_engine):
+        from sqlalchemy import event
+
+        first = self._page(client, auth_headers, long_conversation, limit=5)
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "FROM chat_messages" in statement:
+                statements.append(" ".join(statement.split()).upper())
+
+        event.listen(app_engine, "before_cursor_execute", record)
+        try:
+            self._page(client, auth_headers, long_conversation, limit=5, before=first["before_cursor"])
+        finally:
+            event.remove(app_engine, "before_cursor_execute", record)
+
+        assert len(statements) == 1
+        assert "(CHAT_MESSAGES.CREATED_AT, CHAT_MESSAGES.ID) <" in statements[0]
+        assert "LIMIT" in statements[0]
+
+    def test_invalid_cursor_and_both_cursors_rejected(self, client, auth_headers, long_conversation):
+        url = f"/api/chat/conversations/{long_conversation}/messages"
+        cursor = self._page(client, auth_headers, long_conversation, limit=1)["before_cursor"]
+
+        assert client.get(url, headers=auth_headers, params={"before": "not-a-cursor"}).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get(url, headers=auth_headers, params={"before": cursor, "after": cursor}).status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get(url, headers=auth_headers, params={"limit": 0}).status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
 
 class TestAuthentication:
     """Test authentication requirements for endpoints."""
@@ -0,0 +1,144 @@
+"""
+EXPLAIN-based regression tests: hot per-user queries must be index searches.
+
+The statements are captured from the real code paths (weekly insights, list
+endpoints, ledger writes) against a benchmark-shaped dataset, then replayed
+through `EXPLAIN QUERY PLAN`. A plan step that scans one of the per-user
+tables end to end means a (user_id, created_at) / (conversation_id, ...)
+index is missing or no longer usable.
+"""
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from app.models.user import ChatMessage, Conversation, CrisisEvent, HeartsTransaction, JournalEntry, User
+from app.services.safety_rescore import _existing_event_keys
+from app.services.wellbeing import wellbeing_analyzer
+
+HOT_TABLES = ("conversations", "chat_messages", "journal_entries", "hearts_transactions", "crisis_events")
+
+SEED_USERS = 20
+ROWS_PER_USER = 40
+WEEK_START = date(2026, 3, 2)
+
+
+@pytest.fixture
+def seeded_dataset(db_session, test_user):
+    """Several users with a few weeks of history each, plus planner statistics."""
+    other_ids = []
+    for i in range(SEED_USERS - 1):
+        user = User(email=f"bench{i}@example.com", password_hash="x")
+        db_session.add(user)
+        db_session.flush()
+        other_ids.append(user.id)
+    user_ids = [test_user.id, *other_ids]
+
+    start = datetime(2026, 2, 16)
+    conversations, journal, hearts, crisis = [], [], [], []
+    for user_id in user_ids:
+        for n in range(ROWS_PER_USER):
+            at = start + timedelta(hours=12 * n)
+            conversations.append({
+                "user_id": user_id, "tier": "Green", "mood": "Grounded", "source": "Family",
+                "created_at": at, "updated_at": at,
+            })
+            journal.append({
+                "user_id": user_id, "content": f"entry {n}", "mood_at_time": "Pulse",
+                "tier_at_time": "Green", "created_at": at,
+            })
+            hearts.append({
+                "user_id": user_id, "amount": 5, "type": "earn", "description": "seed",
+                "balance_after": 5 * (n + 1), "created_at": at,
+            })
+        crisis.append({
+            "user_id": user_id, "source": "chat", "message_excerpt": "seed",
+            "risk_level": "high", "matched_phrases": "[]", "created_at": start,
+        })
+    db_session.execute(insert(Conversation), conversations)
+    db_session.execute(insert(JournalEntry), journal)
+    db_session.execute(insert(HeartsTransaction), hearts)
+    db_session.execute(insert(CrisisEvent), crisis)
+
+    conversation_ids = db_session.scalars(
+        Conversation.__table__.select().with_only_columns(Conversation.id)
+    ).all()
+    db_session.execute(insert(ChatMessage), [
+        {"conversation_id": conv_id, "role": "user", "content": f"m{n}", "created_at": start + timedelta(minutes=n)}
+        for conv_id in conversation_ids
+        for n in range(4)
+    ])
+    db_session.commit()
+    db_session.execute(text("ANALYZE"))
+    db_session.commit()
+    return test_user
+
+
+@contextmanager
+def captured_statements(*engines):
+    """Collect (statement, parameters) for every SELECT/UPDATE issued on the given engines."""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE")):
+            captured.append((statement, parameters))
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield captured
+    finally:
+        for engine in engines:
+            event.remove(engine, "before_cursor_execute", record)
+
+
+def full_scans(db_session, statements):
+    """Return 'statement -> plan step' for every plan step that scans a hot table."""
+    problems = []
+    connection = db_session.connection()
+    for statement, parameters in statements:
+        plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        for row in plan:
+            detail = row[-1]
+            words = detail.split()
+            if words[:1] == ["SCAN"] and words[1] in HOT_TABLES:
+                problems.append(f"{' '.join(statement.split())} -> {detail}")
+    return problems
+
+
+class TestHotQueryPlans:
+    def test_weekly_insights_queries_use_indexes(self, seeded_dataset, db_session):
+        with captured_statements(db_session.get_bind()) as statements:
+            wellbeing_analyzer.generate_weekly_insights(db_session, user_id=seeded_dataset.id, week_start=WEEK_START)
+
+        assert any("journal_entries" in s for s, _ in statements)
+        assert full_scans(db_session, statements) == []
+
+    def test_list_endpoints_use_indexes(self, seeded_dataset, client, auth_headers, app_engine, db_session):
+        conversations = client.get("/api/chat/conversations", headers=auth_headers).json()["conversations"]
+        conv_id = conversations[0]["id"]
+
+        with captured_statements(app_engine) as statements:
+            assert client.get("/api/chat/conversations", headers=auth_headers).status_code == 200
+            assert client.get("/api/journal/entries", headers=auth_headers).status_code == 200
+            assert client.get("/api/hearts/balance", headers=auth_headers).status_code == 200
+            assert client.get(
+                f"/api/chat/conversations/{conv_id}/messages", headers=auth_headers, params={"limit": 2}
+            ).status_code == 200
+
+        tables = {table for table in HOT_TABLES for s, _ in statements if table in s}
+        assert {"conversations", "journal_entries", "hearts_transactions", "chat_messages"} <= tables
+        assert full_scans(db_session, statements) == []
+
+    def test_ledger_and_crisis_lookups_use_indexes(self, seeded_dataset, client, auth_headers, app_engine, db_session):
+        with captured_statements(app_engine, db_session.get_bind()) as statements:
+            response = client.post(
+                "/api/hearts/earn", headers=auth_headers,
+                json={"amount": 5, "type": "earn", "description": "plan check"},
+            )
+            assert response.status_code == 201
+            _existing_event_keys(db_session, "chat", {seeded_dataset.id})
+
+        assert any("crisis_events" in s for s, _ in statements)
+        assert full_scans(db_session, statements) == []
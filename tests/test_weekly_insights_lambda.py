@@ -5,10 +5,10 @@ These tests are intentionally introduced before implementation so we can lock
 the expected behavior of the Lambda handler.
 """
 
-from datetime import date
+from datetime import date, datetime
 
 from app.core.security import get_password_hash
-from app.models.user import User, WeeklyWellbeingInsight
+from app.models.user import Conversation, HeartsTransaction, JournalEntry, User, WeeklyWellbeingInsight
 
 
 def test_lambda_handler_persists_weekly_insight(monkeypatch):
@@ -28,7 +28,7 @@ def test_lambda_handler_persists_weekly_insight(monkeypatch):
     }
 
     class StubRepo:
-        def get_target_user_ids(self):
+        def get_target_user_ids(self, week_start, week_end):
             calls["target_users"] += 1
             return [101]
 
@@ -70,7 +70,7 @@ def test_lambda_handler_counts_user_level_failure_and_continues():
         def __init__(self):
             self.persisted = []
 
-        def get_target_user_ids(self):
+        def get_target_user_ids(self, week_start, week_end):
             return [101, 202]
 
         def upsert_weekly_insight(self, user_id, week_start, week_end, summary_text, risk_tier):
@@ -100,7 +100,7 @@ def test_aws_lambda_handler_parses_week_start_and_returns_200():
     from app.lambda_functions.weekly_insights import lambda_handler
 
     class StubRepo:
-        def get_target_user_ids(self):
+        def get_target_user_ids(self, week_start, week_end):
             return []
 
         def upsert_weekly_insight(self, user_id, week_start, week_end, summary_text, risk_tier):
@@ -185,6 +185,9 @@ def test_lambda_handler_uses_default_sqlalchemy_wiring(db_session, monkeypatch):
     db_session.commit()
     db_session.refresh(user)
     user_id = user.id
+    # Only users with activity in the week are targeted
+    db_session.add(JournalEntry(user_id=user_id, content="entry", created_at=datetime(2026, 3, 3, 9, 0)))
+    db_session.commit()
 
     monkeypatch.setattr(
         lambda_pkg.weekly_insights,
@@ -205,3 +208,440 @@ def test_lambda_handler_uses_default_sqlalchemy_wiring(db_session, monkeypatch):
     )
     assert len(persisted) == 1
     assert persisted[0].week_start.isoformat() == "2026-03-02"
+
+
+class _RecordingRepo:
+    def __init__(self, user_ids):
+        self.user_ids = user_ids
+        self.persisted = []
+
+    def get_target_user_ids(self, week_start, week_end):
+        return list(self.user_ids)
+
+    def upsert_weekly_insight(self, user_id, week_start, week_end, summary_text, risk_tier):
+        self.persisted.append(user_id)
+
+
+class _StaticSummaryService:
+    def build_weekly_summary(self, user_id, week_start, week_end):
+        return f"summary {user_id}", "Green"
+
+
+def test_chunks_run_concurrently_with_one_worker_context_each():
+    """Each chunk gets its own repo/service context and chunks overlap in time."""
+    import threading
+    from contextlib import contextmanager
+
+    from app.lambda_functions.weekly_insights import run_weekly_insights_job
+
+    target = _RecordingRepo(range(1, 11))
+    contexts = []
+    barrier = threading.Barrier(2, timeout=5)
+
+    @contextmanager
+    def worker_factory():
+        repo = _RecordingRepo([])
+        contexts.append(repo)
+        barrier.wait()  # Deadlocks (times out) unless two chunks run at once
+        yield repo, _StaticSummaryService()
+
+    result = run_weekly_insights_job(
+        week_start=date(2026, 3, 2),
+        repo=target,
+        worker_factory=worker_factory,
+        chunk_size=5,
+        max_workers=2,
+    )
+
+    assert result["processed_users"] == 10
+    assert result["chunks"] == 2
+    assert result["chunks_completed"] == 2
+    assert result["complete"] is True
+    assert sorted(len(c.persisted) for c in contexts) == [5, 5]
+    assert sorted(user_id for c in contexts for user_id in c.persisted) == list(range(1, 11))
+    assert set(result["chunk_latency_ms"]) == {"avg", "p95", "max"}
+    assert result["users_per_second"] > 0
+
+
+def test_timed_out_run_resumes_from_checkpoints(monkeypatch):
+    """Chunks finished before the deadline are skipped when the run is re-invoked."""
+    import time
+    from types import SimpleNamespace
+
+    from app.lambda_functions import weekly_insights
+    from app.lambda_functions.weekly_insights import InMemoryCheckpointStore, run_weekly_insights_job
+
+    # The deadline passes right after the first chunk is started
+    clock = iter([0.0] + [100.0] * 10)
+    monkeypatch.setattr(
+        weekly_insights, "time", SimpleNamespace(monotonic=lambda: next(clock), perf_counter=time.perf_counter)
+    )
+    checkpoints = InMemoryCheckpointStore()
+
+    first = run_weekly_insights_job(
+        week_start=date(2026, 3, 2),
+        repo=_RecordingRepo(range(1, 8)),
+        summary_service=_StaticSummaryService(),
+        checkpoints=checkpoints,
+        chunk_size=3,
+        deadline=50.0,
+    )
+    assert first["processed_users"] == 3
+    assert first["complete"] is False
+    assert first["remaining_users"] == 4
+
+    second_repo = _RecordingRepo(range(1, 8))
+    second = run_weekly_insights_job(
+        week_start=date(2026, 3, 2),
+        repo=second_repo,
+        summary_service=_StaticSummaryService(),
+        checkpoints=checkpoints,
+        chunk_size=3,
+    )
+    assert second["skipped_users"] == 3
+    assert second["processed_users"] == 4
+    assert second["complete"] is True
+    assert second_repo.persisted == [4, 5, 6, 7]
+
+
+def test_sqlalchemy_checkpoint_store_round_trip(db_session):
+    from app.lambda_functions.weekly_insights import ChunkCheckpoint, SQLAlchemyCheckpointStore, UserChunk
+
+    store = SQLAlchemyCheckpointStore(lambda: db_session)
+    store.mark_completed(date(2026, 3, 2), UserChunk(index=0, user_ids=[3, 5, 9], processed_users=3))
+    store.mark_completed(
+        date(2026, 3, 2), UserChunk(index=1, user_ids=[10, 12], processed_users=1, failed_user_ids=[12])
+    )
+
+    assert store.completed_chunks(date(2026, 3, 2)) == [
+        ChunkCheckpoint(3, 9), ChunkCheckpoint(10, 12, frozenset({12})),
+    ]
+    assert store.completed_chunks(date(2026, 3, 9)) == []
+
+    store.clear(date(2026, 3, 2))
+    assert store.completed_chunks(date(2026, 3, 2)) == []
+
+
+def test_completed_run_does_not_filter_later_runs():
+    from app.lambda_functions.weekly_insights import InMemoryCheckpointStore, run_weekly_insights_job
+
+    checkpoints = InMemoryCheckpointStore()
+    first = run_weekly_insights_job(
+        week_start=date(2026, 3, 2),
+        repo=_RecordingRepo(range(1, 6)),
+        summary_service=_StaticSummaryService(),
+        checkpoints=checkpoints,
+        chunk_size=5,
+    )
+    assert first["complete"] is True
+    assert checkpoints.completed_chunks(date(2026, 3, 2)) == []
+
+    later_repo = _RecordingRepo([3, 7])
+    later = run_weekly_insights_job(
+        week_start=date(2026, 3, 2),
+        repo=later_repo,
+        summary_service=_StaticSummaryService(),
+        checkpoints=checkpoints,
+        chunk_size=5,
+    )
+    assert (later["processed_users"], later["skipped_users"]) == (2, 0)
+    assert later_repo.persisted == [3, 7]
+
+
+def test_failed_users_are_retried_when_run_resumes(monkeypatch):
+    import time
+    from types import SimpleNamespace
+
+    from app.lambda_functions import weekly_insights
+    from app.lambda_functions.weekly_insights import InMemoryCheckpointStore, run_weekly_insights_job
+
+    class FlakyRepo(_RecordingRepo):
+        def __init__(self, user_ids, failing):
+            super().__init__(user_ids)
+            self.failing = set(failing)
+
+        def upsert_weekly_insight(self, user_id, week_start, week_end, summary_text, risk_tier):
+            if user_id in self.failing:
+                raise RuntimeError("write failed")
+            super().upsert_weekly_insight(user_id, week_start, week_end, summary_text, risk_tier)
+
+    # Only the first chunk starts before the deadline
+    clock = iter([0.0] + [100.0] * 10)
+    monkeypatch.setattr(
+        weekly_insights, "time", SimpleNamespace(monotonic=lambda: next(clock), perf_counter=time.perf_counter)
+    )
+    checkpoints = InMemoryCheckpointStore()
+    first = run_weekly_insights_job(
+        week_start=date(2026, 3, 2),
+        repo=FlakyRepo(range(1, 7), failing=[2]),
+        summary_service=_StaticSummaryService(),
+        checkpoints=checkpoints,
+        chunk_size=3,
+        deadline=50.0,
+    )
+    assert (first["processed_users"], first["failed_users"], first["complete"]) == (2, 1, False)
+    assert [c.failed_user_ids for c in checkpoints.completed_chunks(date(2026, 3, 2))] == [frozenset({2})]
+
+    second_repo = FlakyRepo(range(1, 7), failing=[])
+    second = run_weekly_insights_job(
+        week_start=date(2026, 3, 2),
+        repo=second_repo,
+        summary_service=_StaticSummaryService(),
+        checkpoints=checkpoints,
+        chunk_size=3,
+    )
+    assert second_repo.persisted == [2, 4, 5, 6]
+    assert (second["skipped_users"], second["complete"]) == (2, True)
+
+
+def test_targets_only_changed_active_users(db_session):
+    """Targeting skips inactive users and users whose summary is up to date."""
+    from app.lambda_functions.weekly_insights import SQLAlchemyWeeklyInsightsRepo, WellbeingAnalyzerSummaryService
+    from app.services.insights_cache import activity_stamp
+
+    week_start, week_end = date(2026, 3, 2), date(2026, 3, 8)
+    users = [User(email=f"t{i}@example.com", password_hash="x") for i in range(4)]
+    db_session.add_all(users)
+    db_session.commit()
+    journaler, chatter, earner, inactive = (user.id for user in users)
+    db_session.add_all([
+        JournalEntry(user_id=journaler, content="j", created_at=datetime(2026, 3, 3, 9, 0)),
+        Conversation(user_id=chatter, tier="Green", mood="Grounded", source="Family", created_at=datetime(2026, 3, 4, 9, 0)),
+        HeartsTransaction(user_id=earner, amount=5, type="earn", description="x", balance_after=5, created_at=datetime(2026, 3, 8, 23, 0)),
+        # Outside the week
+        JournalEntry(user_id=inactive, content="old", created_at=datetime(2026, 2, 20, 9, 0)),
+    ])
+    db_session.commit()
+
+    repo = SQLAlchemyWeeklyInsightsRepo(db_session)
+    assert repo.get_target_user_ids(week_start, week_end) == [journaler, chatter, earner]
+
+    # Summarising writes the stamp; the grouped targeting query must agree with it
+    summary_service = WellbeingAnalyzerSummaryService(db_session)
+    repo.upsert_weekly_insights([
+        summary_service.build_weekly_record(user_id, week_start, week_end) for user_id in (journaler, chatter)
+    ])
+    row = db_session.query(WeeklyWellbeingInsight).filter(WeeklyWellbeingInsight.user_id == chatter).one()
+    assert row.activity_stamp == activity_stamp(db_session, chatter, week_start)
+    assert repo.get_target_user_ids(week_start, week_end) == [earner]
+
+    db_session.add(JournalEntry(user_id=journaler, content="later", created_at=datetime(2026, 3, 5, 9, 0)))
+    db_session.commit()
+    assert repo.get_target_user_ids(week_start, week_end) == [journaler, earner]
+
+
+def test_targeting_is_a_single_query(db_session):
+    from sqlalchemy import event
+
+    from app.lambda_functions.weekly_insights import SQLAlchemyWeeklyInsightsRepo
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    bind = db_session.get_bind()
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        SQLAlchemyWeeklyInsightsRepo(db_session).get_target_user_ids(date(2026, 3, 2), date(2026, 3, 8))
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+    assert len(statements) == 1
+
+
+def test_bulk_upsert_writes_one_statement_per_batch(db_session):
+    """Rows go out as multi-row INSERT ... ON CONFLICT statements of batch_size rows."""
+    from sqlalchemy import event
+
+    from app.lambda_functions.weekly_insights import SQLAlchemyWeeklyInsightsRepo
+    from app.services.insights_cache import WeeklyInsightRecord
+
+    week_start, week_end = date(2026, 3, 2), date(2026, 3, 8)
+    users = [User(email=f"bulk{i}@example.com", password_hash="x") for i in range(25)]
+    db_session.add_all(users)
+    db_session.commit()
+    repo = SQLAlchemyWeeklyInsightsRepo(db_session, batch_size=10)
+
+    def records(text):
+        return [
+            WeeklyInsightRecord(user_id=user.id, week_start=week_start, week_end=week_end, summary_text=text)
+            for user in users
+        ]
+
+    inserts = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO WEEKLY_WELLBEING_INSIGHTS"):
+            inserts.append(statement)
+
+    bind = db_session.get_bind()
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        repo.upsert_weekly_insights(records("first"))
+        repo.upsert_weekly_insights(records("second"))
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+    assert len(inserts) == 6
+    assert all("ON CONFLICT (user_id, week_start) DO UPDATE" in statement for statement in inserts)
+    rows = db_session.query(WeeklyWellbeingInsight).all()
+    assert len(rows) == 25
+    assert {row.summary_text for row in rows} == {"second"}
+
+
+def test_summary_only_upsert_keeps_stored_snapshot(db_session):
+    from app.lambda_functions.weekly_insights import SQLAlchemyWeeklyInsightsRepo, WellbeingAnalyzerSummaryService
+
+    week_start, week_end = date(2026, 3, 2), date(2026, 3, 8)
+    user = User(email="snapshot@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+    db_session.add(JournalEntry(user_id=user.id, content="j", created_at=datetime(2026, 3, 3, 9, 0)))
+    db_session.commit()
+
+    repo = SQLAlchemyWeeklyInsightsRepo(db_session)
+    full = WellbeingAnalyzerSummaryService(db_session).build_weekly_record(user.id, week_start, week_end)
+    repo.upsert_weekly_insights([full])
+    repo.upsert_weekly_insight(user.id, week_start, week_end, summary_text="Edited", risk_tier="Green")
+
+    row = db_session.query(WeeklyWellbeingInsight).filter(WeeklyWellbeingInsight.user_id == user.id).one()
+    assert (row.summary_text, row.risk_tier) == ("Edited", "Green")
+    assert row.insights_json == full.insights_json
+    assert row.activity_stamp == full.activity_stamp
+
+
+def test_summary_only_upsert_after_close_keeps_mid_week_snapshot_unverified(db_session, monkeypatch):
+    """A Tuesday snapshot is still stamp-checked after close, even if the job rewrote the summary."""
+    from app.lambda_functions.weekly_insights import SQLAlchemyWeeklyInsightsRepo, WellbeingAnalyzerSummaryService
+    from app.services import insights_cache
+    from app.services.insights_cache import get_weekly_insights
+
+    week_start, week_end = date(2026, 3, 2), date(2026, 3, 8)
+    user = User(email="late-summary@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+    user_id = user.id
+    db_session.add(JournalEntry(user_id=user_id, content="tue", created_at=datetime(2026, 3, 3, 9, 0)))
+    db_session.commit()
+
+    repo = SQLAlchemyWeeklyInsightsRepo(db_session)
+    repo.upsert_weekly_insights([
+        WellbeingAnalyzerSummaryService(db_session).build_weekly_record(user_id, week_start, week_end)
+    ])
+    row = db_session.query(WeeklyWellbeingInsight).filter(WeeklyWellbeingInsight.user_id == user_id).one()
+    row.snapshot_verified_at = datetime(2026, 3, 3, 10, 0)
+    for day in (4, 5, 6):
+        db_session.add(JournalEntry(user_id=user_id, content="later", created_at=datetime(2026, 3, day, 9, 0)))
+    db_session.commit()
+
+    repo.upsert_weekly_insight(user_id, week_start, week_end, summary_text="Edited", risk_tier="Green")
+    monkeypatch.setattr(insights_cache, "_ON_CONFLICT_INSERTS", {})
+    repo.upsert_weekly_insight(user_id, week_start, week_end, summary_text="Edited", risk_tier="Green")
+
+    assert get_weekly_insights(db_session, user_id, week_start).total_journal_entries == 4
+
+
+def test_summary_only_service_stamps_users_so_they_are_not_retargeted(db_session):
+    from app.lambda_functions.weekly_insights import (
+        SQLAlchemyWeeklyInsightsRepo,
+        WellbeingAnalyzerSummaryService,
+        run_weekly_insights_job,
+    )
+    from app.services.insights_cache import get_weekly_insights
+
+    week_start, week_end = date(2026, 3, 2), date(2026, 3, 8)
+    user = User(email="summary-only@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+    user_id = user.id
+    db_session.add(JournalEntry(user_id=user_id, content="tue", created_at=datetime(2026, 3, 3, 9, 0)))
+    db_session.commit()
+    repo = SQLAlchemyWeeklyInsightsRepo(db_session)
+    repo.upsert_weekly_insights([
+        WellbeingAnalyzerSummaryService(db_session).build_weekly_record(user_id, week_start, week_end)
+    ])
+    db_session.add(JournalEntry(user_id=user_id, content="thu", created_at=datetime(2026, 3, 5, 9, 0)))
+    db_session.commit()
+
+    first = run_weekly_insights_job(week_start=week_start, repo=repo, summary_service=_StaticSummaryService())
+    second = run_weekly_insights_job(week_start=week_start, repo=repo, summary_service=_StaticSummaryService())
+
+    assert (first["processed_users"], second["processed_users"]) == (1, 0)
+    # The old report was not kept under the new stamp
+    assert get_weekly_insights(db_session, user_id, week_start).total_journal_entries == 2
+
+
+def test_stamp_targeting_repo_ignores_range_checkpoints():
+    """A user whose activity changed after their chunk finished is summarised again."""
+    from app.lambda_functions.weekly_insights import InMemoryCheckpointStore, UserChunk, run_weekly_insights_job
+
+    class StampTargetingRepo(_RecordingRepo):
+        targets_stale_users_only = True
+
+    checkpoints = InMemoryCheckpointStore()
+    checkpoints.mark_completed(date(2026, 3, 2), UserChunk(index=0, user_ids=[1, 5], processed_users=2))
+
+    repo = StampTargetingRepo([3])
+    result = run_weekly_insights_job(
+        week_start=date(2026, 3, 2),
+        repo=repo,
+        summary_service=_StaticSummaryService(),
+        checkpoints=checkpoints,
+    )
+
+    assert (result["processed_users"], result["skipped_users"]) == (1, 0)
+    assert repo.persisted == [3]
+
+
+def test_failed_batch_write_is_retried_per_user():
+    """One bad record fails alone instead of taking its whole chunk with it."""
+    from app.lambda_functions.weekly_insights import run_weekly_insights_job
+
+    class BatchRepo(_RecordingRepo):
+        def __init__(self, user_ids, bad):
+            super().__init__(user_ids)
+            self.bad = set(bad)
+            self.batches = []
+
+        def upsert_weekly_insights(self, records):
+            ids = [record.user_id for record in records]
+            self.batches.append(ids)
+            if self.bad & set(ids):
+                raise RuntimeError("constraint violation")
+            self.persisted.extend(ids)
+
+    repo = BatchRepo(range(1, 6), bad=[3])
+    result = run_weekly_insights_job(
+        week_start=date(2026, 3, 2),
+        repo=repo,
+        summary_service=_StaticSummaryService(),
+        chunk_size=5,
+    )
+
+    assert (result["processed_users"], result["failed_users"]) == (4, 1)
+    assert repo.persisted == [1, 2, 4, 5]
+    assert repo.batches[0] == [1, 2, 3, 4, 5]
+
+
+def test_upsert_falls_back_to_row_by_row_without_on_conflict(db_session, monkeypatch):
+    from app.lambda_functions.weekly_insights import SQLAlchemyWeeklyInsightsRepo
+    from app.services import insights_cache
+    from app.services.insights_cache import WeeklyInsightRecord
+
+    monkeypatch.setattr(insights_cache, "_ON_CONFLICT_INSERTS", {})
+    week_start, week_end = date(2026, 3, 2), date(2026, 3, 8)
+    user = User(email="portable@example.com", password_hash="x")
+    db_session.add(user)
+    db_session.commit()
+    repo = SQLAlchemyWeeklyInsightsRepo(db_session)
+
+    repo.upsert_weekly_insights([WeeklyInsightRecord(
+        user_id=user.id, week_start=week_start, week_end=week_end, summary_text="First",
+        risk_tier="Yellow", insights_json="{}", activity_stamp="stamp",
+    )])
+    repo.upsert_weekly_insight(user.id, week_start, week_end, summary_text="Second", risk_tier="Green")
+
+    row = db_session.query(WeeklyWellbeingInsight).filter(WeeklyWellbeingInsight.user_id == user.id).one()
+    assert (row.summary_text, row.risk_tier) == ("Second", "Green")
+    assert (row.insights_json, row.activity_stamp) == ("{}", "stamp")
@@ -0,0 +1,156 @@
+"""
+Tests for atomic XP awards and buffered accumulation.
+"""
+import threading
+
+import pytest
+from fastapi import status
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import Base, User, UserState
+from app.services.xp import XPAccumulator, award_xp
+
+
+@pytest.fixture
+def file_session_factory(tmp_path):
+    """Sessions on a file database so each thread gets its own connection."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'xp.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    db.add(User(id=1, email="xp@example.com", password_hash="x"))
+    db.add(UserState(user_id=1, mood="Grounded", risk_tier="Green", xp=0, level=1))
+    db.commit()
+    db.close()
+    yield factory
+    engine.dispose()
+
+
+class TestAtomicXP:
+    def test_award_returns_new_totals(self, db_session, test_user):
+        first = award_xp(db_session, test_user.id, 150)
+        second = award_xp(db_session, test_user.id, 100)
+        db_session.commit()
+
+        assert (first.xp, first.level) == (150, 1)
+        assert (second.xp, second.level) == (250, 2)
+        state = db_session.query(UserState).filter(UserState.user_id == test_user.id).one()
+        assert (state.xp, state.level) == (250, 2)
+
+    def test_award_creates_missing_state(self, db_session, test_user):
+        totals = award_xp(db_session, test_user.id, 420)
+        db_session.commit()
+
+        assert (totals.xp, totals.level) == (420, 3)
+        assert db_session.query(UserState).filter(UserState.user_id == test_user.id).count() == 1
+
+    def test_award_is_a_single_update(self, db_session, test_user):
+        user_id = test_user.id
+        award_xp(db_session, user_id, 1)
+        db_session.commit()
+
+        statements = []
+        bind = db_session.get_bind()
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(" ".join(statement.split()).upper())
+
+        event.listen(bind, "before_cursor_execute", record)
+        try:
+            award_xp(db_session, user_id, 5)
+        finally:
+            event.remove(bind, "before_cursor_execute", record)
+
+        assert len(statements) == 1
+        assert statements[0].startswith("UPDATE USER_STATES SET XP=")
+        assert "RETURNING" in statements[0]
+
+    def test_parallel_awards_lose_no_xp(self, file_session_factory):
+        threads_count, awards_per_thread, amount = 8, 25, 5
+        errors = []
+
+        def worker():
+            db = file_session_factory()
+            try:
+                for _ in range(awards_per_thread):
+                    award_xp(db, 1, amount)
+                    db.commit()
+            except Exception as e:  # pragma: no cover - surfaced by the assert below
+                errors.append(e)
+            finally:
+                db.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        db = file_session_factory()
+        state = db.query(UserState).filter(UserState.user_id == 1).one()
+        db.close()
+        expected = threads_count * awards_per_thread * amount
+        assert state.xp == expected
+        assert state.level == expected // 200 + 1
+
+    def test_add_xp_endpoint_uses_atomic_award(self, client, auth_headers):
+        response = client.post("/api/users/me/state/xp", headers=auth_headers, json={"amount": 210})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"xp": 210, "level": 2}
+
+
+class TestXPAccumulator:
+    def test_flush_coalesces_awards_per_user(self, file_session_factory):
+        accumulator = XPAccumulator(flush_interval_seconds=1, session_factory=file_session_factory)
+        for _ in range(40):
+            accumulator.add(1, 5)
+        assert accumulator.pending(1) == 200
+
+        assert accumulator.flush() == 1
+        assert accumulator.pending(1) == 0
+        assert accumulator.flush() == 0
+
+        db = file_session_factory()
+        state = db.query(UserState).filter(UserState.user_id == 1).one()
+        db.close()
+        assert (state.xp, state.level) == (200, 2)
+        stats = accumulator.get_stats()
+        assert stats["awards_buffered"] == 40
+        assert stats["rows_written"] == 1
+
+    def test_failed_flush_keeps_pending_xp(self, file_session_factory, monkeypatch):
+        accumulator = XPAccumulator(flush_interval_seconds=1, session_factory=file_session_factory)
+        accumulator.add(1, 5)
+
+        def fail(db, user_id, amount):
+            raise RuntimeError("database unavailable")
+
+        monkeypatch.setattr("app.services.xp.award_xp", fail)
+        with pytest.raises(RuntimeError):
+            accumulator.flush()
+        accumulator.add(1, 5)
+        assert accumulator.pending(1) == 10
+
+    def test_chat_xp_is_buffered_when_enabled(self, client, auth_headers, test_user, monkeypatch):
+        from app.services import xp as xp_module
+
+        accumulator = XPAccumulator(flush_interval_seconds=60)
+        monkeypatch.setattr(xp_module, "xp_accumulator", accumulator)
+        conv_id = client.post("/api/chat/conversations", headers=auth_headers, json={}).json()["id"]
+        initial_xp = client.get("/api/users/me/state", headers=auth_headers).json()["xp"]
+
+        for content in ("one", "two"):
+            response = client.post(
+                f"/api/chat/conversations/{conv_id}/messages",
+                headers=auth_headers,
+                json={"role": "user", "content": content},
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        assert client.get("/api/users/me/state", headers=auth_headers).json()["xp"] == initial_xp
+        assert accumulator.pending(test_user.id) == 10